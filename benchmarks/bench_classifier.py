@@ -0,0 +1,97 @@
+"""
+行の種別判定のマイクロベンチマーク。
+
+Usage:
+    python benchmarks/bench_classifier.py [--cases N] [--repeat N]
+
+各行に5つの正規表現を順に当てる従来の方法と、LineClassifier.classify による行頭振り分け（1行につき1回）を比較し、
+1秒あたりの処理行数を表示します。
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from md_test_case_to_excel.classifier import LineClassifier
+from md_test_case_to_excel.config_loader import load_config
+
+
+def make_lines(cases: int) -> list[str]:
+    """ベンチマーク用のMarkdown行を作成します。"""
+    lines = ["# 試験"]
+    for n in range(cases):
+        if n % 100 == 0:
+            lines += [f"## 大分類{n // 100}", ""]
+        if n % 10 == 0:
+            lines += [f"### 中分類{n // 10}", ""]
+        lines += [
+            f"#### テストケース{n}",
+            "",
+            "1. アプリを立ち上げる",
+            "2. メイン画面でボタンをクリックする",
+            "* [ ] アプリでエラーが表示されないこと",
+            "画面の表示が更新されていること",
+            "",
+        ]
+    return lines
+
+
+def run_naive(lines: list[str], config) -> int:
+    columns = config.columns
+    patterns = [re.compile(getattr(columns, kind).md_pattern, re.MULTILINE)
+                for kind in ("section", "subsection", "testcase", "step", "expectation")]
+    hits = 0
+    for line in lines:
+        for pattern in patterns:
+            if pattern.match(line):
+                hits += 1
+    return hits
+
+
+def run_classifier(lines: list[str], config) -> int:
+    classifier = LineClassifier(config)
+    hits = 0
+    classify = classifier.classify
+    for line in lines:
+        heading_kind, _, body_kind, _ = classify(line)
+        if heading_kind:
+            hits += 1
+        if body_kind:
+            hits += 1
+    return hits
+
+
+def measure(func, lines, config, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(lines, config)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="行の種別判定のマイクロベンチマーク")
+    parser.add_argument("--cases", type=int, default=20000, help="テストケース数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数（最良値を採用）")
+    args = parser.parse_args()
+
+    config = load_config(Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml")
+    lines = make_lines(args.cases)
+
+    # 判定結果が一致することを確認してから計測する
+    assert run_naive(lines, config) == run_classifier(lines, config)
+
+    naive = measure(run_naive, lines, config, args.repeat)
+    classified = measure(run_classifier, lines, config, args.repeat)
+    print(f"lines: {len(lines)}")
+    print(f"regex x5       : {naive:12,.0f} lines/s")
+    print(f"LineClassifier : {classified:12,.0f} lines/s  ({classified / naive:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+設定ファイルの読み込みのベンチマーク。
+
+Usage:
+    python benchmarks/bench_config.py [--repeat N]
+
+設定ファイルを毎回YAMLとして解析・検証する方法と、検証済みのスナップショットから読み込む方法、
+プロセス内で読み込み済みの設定情報を使う方法を比較します。あわせて find_package_root の時間を計測します。
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from md_test_case_to_excel import config_loader
+from md_test_case_to_excel import converter
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+
+
+def measure(func, repeat: int) -> float:
+    """1回あたりの時間の最良値（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="設定ファイルの読み込みのベンチマーク")
+    parser.add_argument("--repeat", type=int, default=50, help="計測回数（最良値を採用）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["MD2EXCEL_CACHE_DIR"] = directory
+
+        # YAMLモジュールの読み込みは初回のみのため、計測から除く
+        start = time.perf_counter()
+        config_loader.load_config(CONFIG_PATH, use_snapshot=False)
+        first = time.perf_counter() - start
+
+        parse = measure(lambda: config_loader.load_config(CONFIG_PATH, use_snapshot=False), args.repeat)
+
+        def from_snapshot():
+            config_loader._loaded.clear()
+            config_loader.load_config(CONFIG_PATH)
+
+        from_snapshot()  # スナップショットを作成する
+        snapshot = measure(from_snapshot, args.repeat)
+        loaded = measure(lambda: config_loader.load_config(CONFIG_PATH), args.repeat)
+
+    def find_root_uncached():
+        converter._package_roots.clear()
+        converter.find_package_root()
+
+    root_uncached = measure(find_root_uncached, args.repeat)
+    root_cached = measure(converter.find_package_root, args.repeat)
+
+    print(f"yaml + validate (first, with import) : {first * 1000:8.3f} ms")
+    print(f"yaml + validate                      : {parse * 1000:8.3f} ms")
+    print(f"validated snapshot                   : {snapshot * 1000:8.3f} ms  ({parse / snapshot:.1f}x)")
+    print(f"already loaded in process            : {loaded * 1000:8.3f} ms  ({parse / loaded:.1f}x)")
+    print(f"find_package_root                    : {root_uncached * 1000:8.3f} ms")
+    print(f"find_package_root (resolved)         : {root_cached * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
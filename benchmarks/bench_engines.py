@@ -0,0 +1,121 @@
+"""
+出力エンジンごとのエクセルファイル書き出しのベンチマーク。
+
+Usage:
+    python benchmarks/bench_engines.py [--sizes N ...] [--repeat N]
+
+specgen で作成したテスト仕様書（既定では 1,000 / 10,000 / 50,000 ケース）を解析した結果について、
+出力エンジン（openpyxl / write_only / raw）ごとに、メモリ上のストリームへの書き出しから保存までの時間
+（--repeat 回のうちの最良値）と、そのときのメモリ使用量のピークを計測します。
+あわせて、raw の出力が write_only の出力と同じ値・書式・マージ範囲・列幅・行高になることを確認します
+（確認事項のないテストケースや、試験内容・確認事項が空のテストケースを含む）。
+"""
+
+import argparse
+import gc
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from specgen import generate_spec
+
+from md_test_case_to_excel.config_loader import load_config
+from md_test_case_to_excel.converter import conversion_engines
+from md_test_case_to_excel.excel import ENGINES, ExcelWriter
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+
+# 試験内容・確認事項が空のテストケース（出力の比較に使う。空のセルは値を書き込まない）
+EMPTY_FIELDS_SPEC = """
+## 空の項目
+### 試験内容・確認事項なし
+#### [正常] [--] 試験内容のないケース
+* [ ] 画面が表示されること
+
+#### [異常] [--] 確認事項のないケース
+1. アプリを立ち上げる
+
+#### [準正常] [--] 試験内容も確認事項もないケース
+
+"""
+
+
+def write(writer: ExcelWriter, engine: str) -> bytes:
+    output = io.BytesIO()
+    ExcelWriter.write_sheets(output, {"test": writer}, engine=engine)
+    return output.getvalue()
+
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(func) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def sheet_snapshot(content: bytes):
+    """比較用に、シートのセルの値・書式とマージ範囲・列幅・行高を取り出します。"""
+    from openpyxl import load_workbook
+
+    worksheet = load_workbook(io.BytesIO(content)).active
+    cells = [(cell.coordinate, cell.value, cell.font.name, cell.font.b, cell.font.color and cell.font.color.rgb,
+              cell.fill.fgColor.rgb, cell.alignment.horizontal, cell.alignment.vertical, cell.alignment.wrap_text,
+              cell.border.left.style, cell.border.top.style, cell.border.bottom.style)
+             for row in worksheet.iter_rows() for cell in row]
+    widths = {key: dimension.width for key, dimension in worksheet.column_dimensions.items()}
+    heights = {key: dimension.height for key, dimension in worksheet.row_dimensions.items() if dimension.height}
+    return cells, sorted(map(str, worksheet.merged_cells.ranges)), widths, heights
+
+
+def main():
+    parser = argparse.ArgumentParser(description="出力エンジンごとのエクセルファイル書き出しのベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000], help="テストケース数（複数指定可）")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数（最良値を採用）")
+    args = parser.parse_args()
+
+    config = load_config(CONFIG_PATH)
+    markdown_parser, excel_writer = conversion_engines(config)
+
+    # raw の出力が write_only と同じになることを確認する（openpyxl の読み込みも計測から除く）
+    text = generate_spec(300, expectations=(0, 2)) + EMPTY_FIELDS_SPEC
+    writer = excel_writer.bind(markdown_parser.parse_records(text))
+    if sheet_snapshot(write(writer, "raw")) != sheet_snapshot(write(writer, "write_only")):
+        print("error: raw engine output differs from write_only")
+        sys.exit(1)
+
+    for cases in args.sizes:
+        writer = excel_writer.bind(markdown_parser.parse_records(generate_spec(cases)))
+        results = {}
+        for engine in ENGINES:
+            size = len(write(writer, engine))
+            elapsed = best_of(lambda: write(writer, engine), args.repeat)
+            peak = peak_memory(lambda: write(writer, engine))
+            results[engine] = (elapsed, peak, size)
+
+        baseline = results["openpyxl"][0]
+        print(f"cases: {cases}")
+        print(f"  {'engine':<12} {'write':>10} {'peak mem':>10} {'size':>10} {'speedup':>8}")
+        for engine, (elapsed, peak, size) in results.items():
+            print(f"  {engine:<12} {elapsed * 1000:8.1f}ms {peak / 2 ** 20:7.1f}MiB {size / 1024:7.0f}KiB "
+                  f"{baseline / elapsed:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+出力形式ごとの書き出しのベンチマーク。
+
+Usage:
+    python benchmarks/bench_formats.py [--sizes N ...] [--repeat N]
+
+specgen で作成したテスト仕様書（既定では 1,000 / 10,000 ケース）について、出力形式ごとに次の時間を計測します
+（--repeat 回のうちの最良値。出力先はメモリ上のストリーム）。
+
+    write   解析済みのテストケース（RecordStore）を書き出す時間
+    total   Markdownの文字列から解析して書き出すまでの時間（xlsx は convert_markdown、それ以外は export_markdown）
+
+xlsx は openpyxl（通常）と write_only の両方を計測します。parquet / feather は pyarrow がない場合は省略します。
+"""
+
+import argparse
+import gc
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from specgen import generate_spec
+
+from md_test_case_to_excel.config_loader import load_column_names, load_config
+from md_test_case_to_excel.converter import conversion_engines, convert_markdown, export_markdown
+from md_test_case_to_excel.excel import ExcelWriter
+from md_test_case_to_excel.export import get_writer, table_formats
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+EXCEL_ENGINES = ("openpyxl", "write_only")
+
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def available_formats(column_names: list[str]) -> list[str]:
+    formats = []
+    for name in table_formats():
+        try:
+            get_writer(name, column_names).write([], io.BytesIO())
+        except ImportError:
+            print(f"skip {name}: pyarrow is not installed")
+            continue
+        formats.append(name)
+    return formats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="出力形式ごとの書き出しのベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="テストケース数（複数指定可）")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数（最良値を採用）")
+    args = parser.parse_args()
+
+    config = load_config(CONFIG_PATH)
+    column_names = load_column_names(config)
+    markdown_parser, excel_writer = conversion_engines(config)
+    formats = available_formats(column_names)
+
+    for cases in args.sizes:
+        text = generate_spec(cases)
+        records = markdown_parser.parse_records(text)
+        results = {}
+        for engine in EXCEL_ENGINES:
+            writer = excel_writer.bind(records)
+            size = len(convert_markdown(text, engine=engine, config=config))
+            write = best_of(lambda: ExcelWriter.write_sheets(io.BytesIO(), {"test": writer}, engine=engine),
+                            args.repeat)
+            total = best_of(lambda: convert_markdown(text, engine=engine, config=config), args.repeat)
+            results[f"xlsx/{engine}"] = (write, total, size)
+        for name in formats:
+            writer = get_writer(name, column_names)
+            size = len(export_markdown(text, name, config=config))
+            write = best_of(lambda: writer.write(records, io.BytesIO()), args.repeat)
+            total = best_of(lambda: export_markdown(text, name, config=config), args.repeat)
+            results[name] = (write, total, size)
+
+        baseline = results["xlsx/openpyxl"][1]
+        print(f"cases: {cases}")
+        print(f"  {'format':<16} {'write':>10} {'total':>10} {'size':>10} {'vs xlsx':>8}")
+        for name, (write, total, size) in results.items():
+            print(f"  {name:<16} {write * 1000:8.1f}ms {total * 1000:8.1f}ms {size / 1024:7.0f}KiB "
+                  f"{baseline / total:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+起動時のインポート時間のベンチマーク。
+
+Usage:
+    python benchmarks/bench_import.py [--repeat N] [--check]
+
+`python -X importtime` で各シナリオを別プロセスとして実行し、インポートにかかった時間と
+読み込まれた重い依存関係（pandas, openpyxl, pydantic, yaml, pkg_resources）を表示します。
+--check を指定すると、ヘルプ表示の経路で重い依存関係が読み込まれた場合に終了コード1で終了します。
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("pandas", "openpyxl", "pydantic", "yaml", "pkg_resources")
+
+# (シナリオ名, pythonに渡す引数, 重い依存関係を読み込んではいけないかどうか)
+SCENARIOS = [
+    ("import converter", ["-c", "import md_test_case_to_excel.converter"], True),
+    ("md2excel -h", ["-m", "md_test_case_to_excel.converter", "-h"], True),
+    ("import markdown", ["-c", "import md_test_case_to_excel.markdown"], True),
+    ("import excel", ["-c", "import md_test_case_to_excel.excel"], False),
+]
+
+
+def run_importtime(args: list[str]) -> tuple[int, set[str]]:
+    """importtimeの出力から、合計時間（マイクロ秒）と読み込まれたトップレベルのモジュールを返します。"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    result = subprocess.run([sys.executable, "-X", "importtime", *args],
+                            capture_output=True, text=True, env=env, cwd=ROOT)
+    total = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # 見出し行
+        modules.add(name.strip().split(".")[0])
+        # インデントのないモジュールがトップレベルのインポート
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="起動時のインポート時間のベンチマーク")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数（最良値を採用）")
+    parser.add_argument("--check", action="store_true", help="重い依存関係が読み込まれた場合に失敗とする")
+    args = parser.parse_args()
+
+    failed = False
+    for name, python_args, must_be_light in SCENARIOS:
+        best = min(run_importtime(python_args)[0] for _ in range(args.repeat))
+        heavy = sorted(set(HEAVY_MODULES) & run_importtime(python_args)[1])
+        print(f"{name:20s} {best / 1000:8.1f} ms  heavy: {', '.join(heavy) or '-'}")
+        if must_be_light and heavy:
+            failed = True
+
+    if args.check and failed:
+        print("重い依存関係が読み込まれています")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
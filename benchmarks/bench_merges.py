@@ -0,0 +1,109 @@
+"""
+マージ処理のベンチマーク。
+
+Usage:
+    python benchmarks/bench_merges.py [--sections N] [--subsections N] [--cases N] [--repeat N]
+
+ワークシートのセルを1つずつ読み直して隣の行と比較する従来の方法と、
+解析結果から plan_merges でマージ範囲を求めて apply_merges で設定する方法を比較します。
+どちらも範囲ごとに worksheet.merge_cells を呼び出すため、差はセルを読み直すかどうかのみです。
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from md_test_case_to_excel.config_loader import load_config
+from md_test_case_to_excel.layout import LayoutPlan
+from md_test_case_to_excel.merges import apply_merges, plan_merges
+from md_test_case_to_excel.records import RecordStore
+
+
+def make_records(sections: int, subsections: int, cases: int) -> RecordStore:
+    """大分類 x 中分類 x 小分類 の階層を持つテストケースを作成します。"""
+    records = RecordStore()
+    for s in range(sections):
+        for t in range(subsections):
+            for c in range(cases):
+                # 中分類の名称は大分類ごとに繰り返す（大分類をまたいだマージが起きやすい構成）
+                records.append((f"{s + 1}-{t + 1}-{c + 1}", f"大分類{s}", f"中分類{t}", f"テストケース{c}",
+                                "1. アプリを立ち上げる", "* [ ] エラーが表示されないこと"))
+    return records
+
+
+def make_sheet(records: RecordStore, layout: LayoutPlan):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    worksheet = workbook.active
+    styles = layout.bind(workbook)
+    for i, row in enumerate(records):
+        for (column, style), value in zip(zip(layout.columns, styles.body), row):
+            style.apply(worksheet.cell(row=i + 2, column=column.index, value=value))
+    return worksheet, styles
+
+
+def run_legacy(records: RecordStore, layout: LayoutPlan, worksheet, styles):
+    """従来の処理: ワークシートから値を読み直し、列ごとに隣の行と比較してマージする"""
+    first_row = 2
+    for column in layout.multi_idx_columns:
+        current_value = None
+        start_row = first_row
+        row_count = len(records)
+        for i in range(row_count):
+            row_idx = first_row + i
+            value = worksheet[f"{column.letter}{row_idx}"].value
+            if value != current_value or i == row_count - 1:
+                if current_value is not None and row_idx - start_row > 1:
+                    end_row = row_idx - 1 if value != current_value else row_idx
+                    worksheet.merge_cells(f"{column.letter}{start_row}:{column.letter}{end_row}")
+                current_value = value
+                start_row = row_idx
+
+
+def run_planner(records: RecordStore, layout: LayoutPlan, worksheet, styles):
+    apply_merges(worksheet, plan_merges(records.columns, layout.multi_idx_columns), 2)
+
+
+def measure(func, records, layout, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    merged = 0
+    for _ in range(repeat):
+        worksheet, styles = make_sheet(records, layout)
+        start = time.perf_counter()
+        func(records, layout, worksheet, styles)
+        best = min(best, time.perf_counter() - start)
+        merged = len(worksheet.merged_cells.ranges)
+    return best, merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="マージ処理のベンチマーク")
+    parser.add_argument("--sections", type=int, default=50, help="大分類の数")
+    parser.add_argument("--subsections", type=int, default=40, help="大分類あたりの中分類の数")
+    parser.add_argument("--cases", type=int, default=3, help="中分類あたりのテストケース数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数（最良値を採用）")
+    args = parser.parse_args()
+
+    layout = LayoutPlan(load_config(Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"))
+    records = make_records(args.sections, args.subsections, args.cases)
+    groups = args.sections * args.subsections
+
+    # 計画のみの時間（ワークシートへの反映を除く）
+    start = time.perf_counter()
+    ranges = plan_merges(records.columns, layout.multi_idx_columns)
+    planning = time.perf_counter() - start
+
+    legacy, legacy_merged = measure(run_legacy, records, layout, args.repeat)
+    planner, planner_merged = measure(run_planner, records, layout, args.repeat)
+    print(f"rows: {len(records)}, groups: {groups}")
+    print(f"plan_merges only : {planning * 1000:9.1f} ms  ({len(ranges)} ranges)")
+    print(f"worksheet scan   : {legacy * 1000:9.1f} ms  ({legacy_merged} ranges)")
+    print(f"planner + merge  : {planner * 1000:9.1f} ms  ({planner_merged} ranges, {legacy / planner:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+列幅・行高の計算のマイクロベンチマーク。
+
+Usage:
+    python benchmarks/bench_metrics.py [--cases N] [--repeat N]
+
+セルごとに正規表現をコンパイルして全角文字を数える従来の方法と、
+metrics.measure_records による列単位の一括計算を比較し、1秒あたりの処理セル数を表示します。
+"""
+
+import argparse
+import math
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_classifier import make_lines
+from md_test_case_to_excel.config_loader import load_column_names, load_config
+from md_test_case_to_excel.markdown import MarkdownTestParser
+from md_test_case_to_excel.metrics import measure_records, text_metrics
+
+
+def legacy_column_width(text, font_size=11, min_width=8, max_width=100):
+    """従来の estimate_column_width"""
+    if not text:
+        return min_width
+    widths = []
+    for line in str(text).split('\n'):
+        fullwidth_pattern = re.compile(r'[^\x00-\xff]')
+        fullwidth_count = len(fullwidth_pattern.findall(line))
+        halfwidth_count = len(line) - fullwidth_count
+        widths.append((fullwidth_count * 2 + halfwidth_count) * (font_size / 11) * 1.5)
+    return max(min_width, min(max(widths), max_width))
+
+
+def legacy_row_height(row_data, font_size=11, min_height=15, line_height_factor=1.5):
+    """従来の estimate_row_height"""
+    max_lines = 1
+    for value in row_data:
+        if value is None:
+            continue
+        wrapped_line_count = 0
+        for line in str(value).split('\n'):
+            fullwidth_pattern = re.compile(r'[^\x00-\xff]')
+            fullwidth_count = len(fullwidth_pattern.findall(line))
+            halfwidth_count = len(line) - fullwidth_count
+            wrapped_line_count += max(1, (fullwidth_count * 2 + halfwidth_count) / 40)
+        max_lines = max(max_lines, wrapped_line_count)
+    return max(min_height, math.ceil(max_lines) * font_size * line_height_factor)
+
+
+def run_legacy(records, headers):
+    widths = []
+    for header, values in zip(headers, records.columns):
+        max_width = legacy_column_width(header)
+        for value in values:
+            if value:
+                max_width = max(max_width, legacy_column_width(value))
+        widths.append(max_width)
+    return widths, [legacy_row_height(row) for row in records]
+
+
+def run_metrics(records, headers):
+    # キャッシュの効果は1回の計測の中だけで評価する
+    text_metrics.cache_clear()
+    metrics = measure_records(records.columns, headers)
+    return metrics.column_widths, metrics.row_heights
+
+
+def measure(func, records, headers, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(records, headers)
+        best = min(best, time.perf_counter() - start)
+    return len(records) * len(headers) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列幅・行高の計算のマイクロベンチマーク")
+    parser.add_argument("--cases", type=int, default=20000, help="テストケース数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測回数（最良値を採用）")
+    args = parser.parse_args()
+
+    config_path = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+    config = load_config(config_path)
+    headers = load_column_names(config)
+    records = MarkdownTestParser(None, config).parse_records(make_lines(args.cases))
+
+    # 計算結果が一致することを確認してから計測する
+    assert run_legacy(records, headers) == run_metrics(records, headers)
+
+    legacy = measure(run_legacy, records, headers, args.repeat)
+    batched = measure(run_metrics, records, headers, args.repeat)
+    print(f"cells: {len(records) * len(headers)}")
+    print(f"per-cell regex  : {legacy:12,.0f} cells/s")
+    print(f"measure_records : {batched:12,.0f} cells/s  ({batched / legacy:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+解析結果の保持方法によるメモリ使用量のベンチマーク。
+
+Usage:
+    python benchmarks/bench_records_memory.py [--cases N]
+
+従来の保持方法（行データのリスト + DataFrame + ExcelWriterでの2回のcopy()）と、
+RecordStoreを解析・書き込みで共有する方法について、tracemallocでピークメモリを比較します。
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_classifier import make_lines
+from md_test_case_to_excel.config_loader import load_column_names, load_config
+from md_test_case_to_excel.markdown import MarkdownTestParser
+
+
+def legacy_path(text: str, config):
+    import pandas as pd
+
+    parser = MarkdownTestParser(text, config)
+    data = [list(record) for record in parser.iter_records(text.split("\n"))]
+    df = pd.DataFrame(data, columns=parser.columns)
+    writer_df = df.copy()                              # ExcelWriter.__init__
+    sheet_df = writer_df.copy()                        # __write_test_specification_sheet
+    sheet_df.columns = load_column_names(config)
+    return data, df, writer_df, sheet_df
+
+
+def record_store_path(text: str, config):
+    parser = MarkdownTestParser(text, config)
+    return parser.parse_records()
+
+
+def measure(func, text: str, config) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = func(text, config)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解析結果の保持方法によるメモリ使用量のベンチマーク")
+    parser.add_argument("--cases", type=int, default=20000, help="テストケース数")
+    args = parser.parse_args()
+
+    config = load_config(Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml")
+    text = "\n".join(make_lines(args.cases))
+
+    # pandasの読み込み自体は計測に含めない
+    import pandas  # noqa: F401
+
+    legacy = measure(legacy_path, text, config)
+    store = measure(record_store_path, text, config)
+    print(f"cases: {args.cases}")
+    print(f"list + DataFrame x3 : {legacy / 1024 / 1024:8.1f} MiB")
+    print(f"RecordStore         : {store / 1024 / 1024:8.1f} MiB  ({store / legacy:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+解析器・書き込み器の使い回しのベンチマーク。
+
+Usage:
+    python benchmarks/bench_reuse.py [--documents N] [--cases N] [--threads N] [--repeat N]
+
+specgen で作成した小さなテスト仕様書を N 件変換する場合について、文書ごとに MarkdownTestParser / ExcelWriter を
+作成する方法と、conversion_engines の同じインスタンスを使い回す方法（ExcelWriter は bind）のスループットを比較します。
+それぞれ1スレッドと --threads スレッドで、解析のみ（parse）と解析からメモリ上への保存まで（convert）を計測します。
+あわせて、使い回したインスタンスで複数のスレッドから同時に解析した結果が、1件ずつ解析した結果と一致することを確認します。
+"""
+
+import argparse
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from specgen import generate_spec
+
+from md_test_case_to_excel.config_loader import load_config
+from md_test_case_to_excel.converter import conversion_engines
+from md_test_case_to_excel.excel import ExcelWriter
+from md_test_case_to_excel.markdown import MarkdownTestParser
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+
+
+def parse_fresh(text: str, config):
+    return MarkdownTestParser(None, config).parse_records(text)
+
+
+def parse_reused(text: str, config):
+    parser, _ = conversion_engines(config)
+    return parser.parse_records(text)
+
+
+def convert_fresh(text: str, config):
+    records = MarkdownTestParser(None, config).parse_records(text)
+    ExcelWriter.write_sheets(io.BytesIO(), {"test": ExcelWriter(records, config)})
+    return records
+
+
+def convert_reused(text: str, config):
+    parser, writer = conversion_engines(config)
+    records = parser.parse_records(text)
+    ExcelWriter.write_sheets(io.BytesIO(), {"test": writer.bind(records)})
+    return records
+
+
+def throughput(func, documents: list[str], config, threads: int, repeat: int) -> float:
+    """1秒あたりに処理した文書数（repeat 回のうちの最良値）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if threads == 1:
+            for text in documents:
+                func(text, config)
+        else:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                list(executor.map(lambda text: func(text, config), documents))
+        best = min(best, time.perf_counter() - start)
+    return len(documents) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解析器・書き込み器の使い回しのベンチマーク")
+    parser.add_argument("--documents", type=int, default=200, help="変換する文書の数")
+    parser.add_argument("--cases", type=int, default=20, help="1文書あたりのテストケース数")
+    parser.add_argument("--threads", type=int, default=4, help="並列に変換するスレッド数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数（最良値を採用）")
+    args = parser.parse_args()
+
+    config = load_config(CONFIG_PATH)
+    documents = [generate_spec(args.cases, seed=seed) for seed in range(args.documents)]
+
+    # 使い回したインスタンスで同時に解析しても、結果が混ざったり重複したりしないことを確認する
+    expected = [list(parse_fresh(text, config)) for text in documents]
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        actual = [list(records) for records in executor.map(lambda text: parse_reused(text, config), documents)]
+    if actual != expected:
+        print("error: concurrent parse with a shared parser differs from sequential parse")
+        sys.exit(1)
+
+    convert_reused(documents[0], config)  # openpyxl の読み込みは計測から除く
+
+    print(f"documents: {args.documents} x {args.cases} cases, threads: {args.threads}")
+    print(f"{'phase':<8} {'threads':>7} {'fresh':>12} {'reused':>12} {'speedup':>8}")
+    for phase, fresh, reused in (("parse", parse_fresh, parse_reused), ("convert", convert_fresh, convert_reused)):
+        for threads in sorted({1, args.threads}):
+            fresh_rate = throughput(fresh, documents, config, threads, args.repeat)
+            reused_rate = throughput(reused, documents, config, threads, args.repeat)
+            print(f"{phase:<8} {threads:>7} {fresh_rate:>8.0f}/s {reused_rate:>8.0f}/s {reused_rate / fresh_rate:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+読み込みから保存までの処理ごとのベンチマーク（規模別）。
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes N ...] [--repeat N] [--output results.json]
+                                     [--baseline baseline.json] [--threshold RATIO] [--min-delta SEC]
+
+specgen で作成したテスト仕様書（既定では 1,000 / 10,000 ケース。--sizes 1000 10000 100000 で 10万ケースも計測）について、
+次の処理の時間を個別に計測します（--repeat 回のうちの最良値）。
+
+    read            read_markdown_file
+    parse           MarkdownTestParser.parse（DataFrame）
+    parse_records   MarkdownTestParser.parse_records（RecordStore）
+    measure         列幅・行高の計算（ExcelWriter.measure）
+    merge_plan      マージ範囲の計算（ExcelWriter.plan_merges）
+    merge_apply     マージの設定（apply_merges）
+    write_new       ExcelWriter の新規作成（保存を除く）
+    save_new        新規作成したワークブックの workbook.save
+    write_template  ExcelWriter のテンプレートへの書き込み（保存を除く）
+    save_template   テンプレートのワークブックの workbook.save
+
+--output で結果をJSONに書き出し、--baseline で指定した過去の結果と比較します。
+計測の前に小さなテスト仕様書で一通りの処理を行い、初回のインポートなどは計測に含めません。
+いずれかの処理が基準より threshold（既定 0.2 = 20%）を超えて遅くなり、かつ差が min-delta 秒以上の場合は終了コード1で終了します。
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_merges import make_sheet
+from specgen import write_spec
+
+from md_test_case_to_excel import __version__
+from md_test_case_to_excel.config_loader import load_config
+from md_test_case_to_excel.excel import ExcelWriter
+from md_test_case_to_excel.markdown import MarkdownTestParser, read_markdown_file
+from md_test_case_to_excel.merges import apply_merges
+from md_test_case_to_excel.metrics import text_metrics
+from md_test_case_to_excel.template import template_cache
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "md_test_case_to_excel"
+TEMPLATE_PATH = PACKAGE_DIR / "assets" / "ARMDXP_単体・結合試験_DAS-M_テンプレート_md.xlsx"
+PHASES = ("read", "parse", "parse_records", "measure", "merge_plan", "merge_apply",
+          "write_new", "save_new", "write_template", "save_template")
+
+
+@contextlib.contextmanager
+def timed_save(timings: list):
+    """Workbook.save の所要時間を timings に記録します（ExcelWriter の書き込みと保存を分けて計測するため）"""
+    from openpyxl.workbook.workbook import Workbook
+
+    save = Workbook.save
+
+    def timed(workbook, filename):
+        start = time.perf_counter()
+        save(workbook, filename)
+        timings.append(time.perf_counter() - start)
+
+    Workbook.save = timed
+    try:
+        yield
+    finally:
+        Workbook.save = save
+
+
+def best_of(func, repeat: int, setup=None) -> float:
+    """repeat 回のうちの最良値（秒）。setup の戻り値を func に渡し、setup の時間は含めない"""
+    best = float("inf")
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        gc.collect()  # 前の計測で作成したオブジェクトの回収を計測に含めない
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def write_and_save(writer: ExcelWriter, output_path: Path, repeat: int, **options) -> tuple[float, float]:
+    """ExcelWriter の書き込み（保存を除く）と保存の時間をそれぞれ最良値で返します。"""
+    write = save = float("inf")
+    for _ in range(repeat):
+        saves = []
+        output_path.unlink(missing_ok=True)
+        gc.collect()
+        with timed_save(saves):
+            start = time.perf_counter()
+            writer(output_path, **options)
+            elapsed = time.perf_counter() - start
+        write = min(write, elapsed - sum(saves))
+        save = min(save, sum(saves))
+    return write, save
+
+
+def warm_up(directory: Path, config):
+    """計測の前に、小さなテスト仕様書で一通りの処理を行います（計測しない）。
+
+    pandas / openpyxl などの初回のインポートや、初回の呼び出し時のみの処理を最初の計測に含めないため。
+    """
+    import openpyxl  # noqa: F401
+    import pandas  # noqa: F401
+
+    text = read_markdown_file(write_spec(directory / "warm_up.md", 20))
+    MarkdownTestParser(text, config).parse()
+    writer = ExcelWriter(MarkdownTestParser(text, config).parse_records(), config)
+    writer.measure()
+    writer(directory / "warm_up.xlsx")
+    text_metrics.cache_clear()
+
+
+def run_size(cases: int, directory: Path, config, repeat: int) -> dict:
+    """1つの規模について全ての処理を計測します。"""
+    markdown_path = write_spec(directory / f"spec_{cases}.md", cases)
+    result = {"cases": cases, "bytes": markdown_path.stat().st_size}
+
+    text = read_markdown_file(markdown_path)
+    result["read"] = best_of(lambda: read_markdown_file(markdown_path), repeat)
+    result["parse"] = best_of(lambda: MarkdownTestParser(text, config).parse(), repeat)
+    result["parse_records"] = best_of(lambda: MarkdownTestParser(text, config).parse_records(), repeat)
+
+    records = MarkdownTestParser(text, config).parse_records()
+    writer = ExcelWriter(records, config)
+    # text_metrics の計算結果のキャッシュを使い回さないよう、毎回空にしてから計測する（実際の変換と同じ条件）
+    result["measure"] = best_of(lambda _: writer.measure(), repeat, setup=text_metrics.cache_clear)
+    result["merge_plan"] = best_of(writer.plan_merges, repeat)
+    ranges = writer.plan_merges()
+    result["merge_apply"] = best_of(lambda sheet: apply_merges(sheet[0], ranges, 2), repeat,
+                                    setup=lambda: make_sheet(records, writer.layout))
+
+    output_path = directory / f"spec_{cases}.xlsx"
+    result["write_new"], result["save_new"] = write_and_save(writer, output_path, repeat)
+    template_cache.load(TEMPLATE_PATH)  # テンプレートの初回の読み込みは計測から除く
+    result["write_template"], result["save_template"] = write_and_save(
+        writer, output_path, repeat, template_path=TEMPLATE_PATH, preserve_additional_columns=True, test_type="ut")
+    result["rows_per_second"] = cases / sum(result[phase] for phase in ("read", "parse_records", "write_new", "save_new"))
+    return result
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float) -> list[str]:
+    """基準の結果と比較して表を表示し、遅くなった処理（"規模/処理"）の一覧を返します。"""
+    regressions = []
+    print()
+    print(f"{'cases':>8} {'phase':<15} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for size, current in results["results"].items():
+        base = baseline.get("results", {}).get(size)
+        if base is None:
+            continue
+        for phase in PHASES:
+            if phase not in base or phase not in current:
+                continue
+            ratio = current[phase] / base[phase] if base[phase] else float("inf")
+            regressed = ratio > 1 + threshold and current[phase] - base[phase] >= min_delta
+            mark = "  << regression" if regressed else ""
+            print(f"{size:>8} {phase:<15} {base[phase] * 1000:8.1f}ms {current[phase] * 1000:8.1f}ms {ratio:6.2f}x{mark}")
+            if regressed:
+                regressions.append(f"{size}/{phase}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="読み込みから保存までの処理ごとのベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="テストケース数（複数指定可）")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数（最良値を採用）")
+    parser.add_argument("--output", help="結果を書き出すJSONファイル")
+    parser.add_argument("--baseline", help="比較する基準の結果（--output で書き出したJSONファイル）")
+    parser.add_argument("--threshold", type=float, default=0.2, help="遅くなったとみなす割合（0.2 = 20%%）")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="遅くなったとみなす最小の差（秒）")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", category=UserWarning)  # テンプレートのデータの入力規則の警告
+
+    config = load_config(PACKAGE_DIR / "config.yaml")
+    results = {
+        "meta": {"version": __version__, "python": platform.python_version(), "platform": platform.platform(),
+                 "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "repeat": args.repeat},
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        warm_up(Path(directory), config)
+        for cases in args.sizes:
+            result = run_size(cases, Path(directory), config, args.repeat)
+            results["results"][str(cases)] = result
+            print(f"cases: {cases}  ({result['bytes'] / 1024:.0f} KiB, {result['rows_per_second']:.0f} rows/s)")
+            for phase in PHASES:
+                print(f"  {phase:<15}: {result[phase] * 1000:10.1f} ms")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\nregressions (> {args.threshold:.0%}): {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
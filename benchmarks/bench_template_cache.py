@@ -0,0 +1,95 @@
+"""
+テンプレートのキャッシュのベンチマーク。
+
+Usage:
+    python benchmarks/bench_template_cache.py [--outputs N]
+
+同梱のテンプレートから N 個のエクセルファイルを出力する場合について、
+出力ごとにテンプレートをコピーして読み込み直す従来の方法と、TemplateCache の複製を使う方法を比較します。
+あわせて、ExcelWriter でテスト仕様書を書き込んだ場合の1出力あたりの時間を計測します。
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from md_test_case_to_excel.config_loader import load_config
+from md_test_case_to_excel.excel import ExcelWriter
+from md_test_case_to_excel.markdown import MarkdownTestParser
+from md_test_case_to_excel.template import TemplateCache, template_cache
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "md_test_case_to_excel"
+TEMPLATE_PATH = PACKAGE_DIR / "assets" / "ARMDXP_単体・結合試験_DAS-M_テンプレート_md.xlsx"
+SAMPLE_PATH = PACKAGE_DIR.parent / "example" / "sample.md"
+
+
+def run_copy_reload(directory: Path, outputs: int) -> tuple[float, float]:
+    """従来の処理: テンプレートをコピーしてから読み込み、保存する（合計時間, うち読み込みの時間）"""
+    from openpyxl import load_workbook
+
+    total = loading = 0.0
+    for i in range(outputs):
+        output_path = directory / f"copy_{i}.xlsx"
+        start = time.perf_counter()
+        shutil.copy2(TEMPLATE_PATH, output_path)
+        workbook = load_workbook(output_path)
+        loaded = time.perf_counter()
+        workbook.save(output_path)
+        loading += loaded - start
+        total += time.perf_counter() - start
+    return total, loading
+
+
+def run_cache(directory: Path, outputs: int) -> tuple[float, float]:
+    """TemplateCache の複製に書き込み、保存する（合計時間, うち複製の時間）"""
+    cache = TemplateCache()
+    total = loading = 0.0
+    for i in range(outputs):
+        start = time.perf_counter()
+        workbook = cache.load(TEMPLATE_PATH)
+        loaded = time.perf_counter()
+        workbook.save(directory / f"cache_{i}.xlsx")
+        loading += loaded - start
+        total += time.perf_counter() - start
+    return total, loading
+
+
+def run_writer(directory: Path, outputs: int) -> float:
+    config = load_config(PACKAGE_DIR / "config.yaml")
+    records = MarkdownTestParser(SAMPLE_PATH.read_text(encoding="utf-8"), config).parse_records()
+    template_cache.clear()
+    start = time.perf_counter()
+    for i in range(outputs):
+        ExcelWriter(records, config)(directory / f"writer_{i}.xlsx", template_path=TEMPLATE_PATH,
+                                     preserve_additional_columns=True, test_type="ut")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="テンプレートのキャッシュのベンチマーク")
+    parser.add_argument("--outputs", type=int, default=100, help="出力するファイルの数")
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore", category=UserWarning)  # テンプレートのデータの入力規則の警告
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        legacy, legacy_load = run_copy_reload(directory, args.outputs)
+        cached, cached_load = run_cache(directory, args.outputs)
+        writer = run_writer(directory, args.outputs)
+
+    print(f"outputs: {args.outputs}")
+    print(f"copy + load_workbook        : {legacy_load * 1000 / args.outputs:8.1f} ms/output")
+    print(f"TemplateCache clone         : {cached_load * 1000 / args.outputs:8.1f} ms/output  ({legacy_load / cached_load:.2f}x)")
+    print(f"copy + load_workbook + save : {legacy * 1000 / args.outputs:8.1f} ms/output  ({legacy:.2f} s)")
+    print(f"TemplateCache clone + save  : {cached * 1000 / args.outputs:8.1f} ms/output  ({cached:.2f} s, {legacy / cached:.2f}x)")
+    print(f"ExcelWriter (sample.md, ut) : {writer * 1000 / args.outputs:8.1f} ms/output  ({writer:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
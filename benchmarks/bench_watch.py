@@ -0,0 +1,68 @@
+"""
+監視モード（--watch）の再生成の所要時間のベンチマーク。
+
+Usage:
+    python benchmarks/bench_watch.py [--cases N] [--edits N]
+
+一時ディレクトリに作成したテスト仕様書を Watcher で変換したあと、1行ずつ書き換えて再生成を繰り返し、
+常駐したプロセスでの再生成1回あたりの所要時間を計測します。
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from md_test_case_to_excel.watch import Watcher
+
+
+def make_markdown(cases: int, per_subsection: int = 5, per_section: int = 4) -> str:
+    """大分類 > 中分類 > テストケース の階層を持つテスト仕様書を作成します。"""
+    lines = []
+    for i in range(cases):
+        if i % (per_subsection * per_section) == 0:
+            lines.append(f"# 大分類{i // (per_subsection * per_section)}")
+        if i % per_subsection == 0:
+            lines.append(f"## 中分類{i // per_subsection % per_section}")
+        lines += [f"#### [正常] [--] ケース{i}", "1. アプリを立ち上げる", "2. ボタンを押す",
+                  "* [ ] エラーが表示されないこと", ""]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="監視モードの再生成のベンチマーク")
+    parser.add_argument("--cases", type=int, default=1000, help="テストケース数")
+    parser.add_argument("--edits", type=int, default=5, help="書き換えて再生成する回数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        os.environ["MD2EXCEL_CACHE_DIR"] = str(directory / "cache")
+        markdown_path = directory / "spec.md"
+        text = make_markdown(args.cases)
+        markdown_path.write_text(text, encoding="utf-8")
+
+        watcher = Watcher([directory])
+        latencies = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            watcher.regenerate(markdown_path)
+            for i in range(args.edits):
+                text = text.replace(f"ケース{i * 7}\n", f"ケース{i * 7}（改）\n", 1)
+                markdown_path.write_text(text, encoding="utf-8")
+                start = time.perf_counter()
+                watcher.regenerate(markdown_path)
+                latencies.append(time.perf_counter() - start)
+
+    print(f"cases: {args.cases}, edits: {args.edits}")
+    print(f"regenerate (median): {statistics.median(latencies) * 1000:9.1f} ms  (max {max(latencies) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+ベンチマーク用のテスト仕様書（Markdown）の生成。
+
+Usage:
+    python benchmarks/specgen.py --cases N [--per-subsection N] [--per-section N] [--steps MIN MAX]
+                                 [--expectations MIN MAX] [--multiline RATIO] [--seed N] [-o OUTPUT]
+
+同梱の config.yaml の書式（## 大分類 / ### 中分類 / #### テストケース / 番号付きの試験内容 / * [ ] 確認事項）に沿って、
+日本語の文面を持つテスト仕様書を作成します。乱数の種が同じであれば同じ内容になります。
+他のベンチマークからは generate_spec / write_spec を読み込んで使います。
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Iterator
+
+SCREENS = ["メイン画面", "設定画面", "ログイン画面", "プロフィール画面", "検索画面", "通知一覧", "管理者画面", "ヘルプ画面"]
+TARGETS = ["ユーザ名", "パスワード", "メールアドレス", "プロフィール画像", "表示言語", "通知設定", "検索条件", "有効期限"]
+ACTIONS = ["を入力する", "を変更する", "を空欄にする", "に最大長の文字列を設定する", "に記号を含む文字列を設定する", "を初期値に戻す"]
+OPERATIONS = ["OKをタップする", "保存ボタンをクリックする", "画面を再読み込みする", "アプリを再起動する", "キャンセルを押す"]
+RESULTS = ["エラーが表示されないこと", "変更内容が保存されていること", "エラーダイアログが表示されること",
+           "入力欄が赤枠で強調されること", "一覧の件数が更新されていること", "前の画面に戻ること"]
+DETAILS = ["ログにエラーが出力されていないことも確認する", "再起動後も同じ表示であることを確認する",
+           "表示されるメッセージは仕様書の文言と一致すること", "他のユーザの情報が変わっていないこと"]
+KINDS = ["正常", "異常", "準正常"]
+
+
+def iter_spec_lines(cases: int, per_subsection: int = 10, per_section: int = 5, steps: tuple[int, int] = (2, 5),
+                    expectations: tuple[int, int] = (1, 3), multiline: float = 0.3, seed: int = 0) -> Iterator[str]:
+    """テスト仕様書を1行ずつ生成します（改行は含まない）。
+
+    Args:
+        cases (int):              テストケースの総数
+        per_subsection (int):     中分類あたりのテストケース数
+        per_section (int):        大分類あたりの中分類の数
+        steps (tuple):            テストケースあたりの試験内容の数（最小, 最大）
+        expectations (tuple):     テストケースあたりの確認事項の数（最小, 最大）
+        multiline (float):        継続行（複数行）を持つ確認事項の割合
+        seed (int):               乱数の種
+    """
+    rng = random.Random(seed)
+    per_section_cases = per_subsection * per_section
+    yield "# ベンチマーク用テスト仕様書"
+    yield ""
+    for i in range(cases):
+        if i % per_section_cases == 0:
+            yield f"## {rng.choice(SCREENS)}の機能{i // per_section_cases + 1}"
+            yield ""
+        if i % per_subsection == 0:
+            yield f"### {rng.choice(TARGETS)}の変更{i // per_subsection % per_section + 1}"
+            yield ""
+        target = rng.choice(TARGETS)
+        yield f"#### [{rng.choice(KINDS)}] [--] {target}{rng.choice(ACTIONS)}場合の確認{i + 1}"
+        yield ""
+        yield "1. アプリを立ち上げる"
+        for n in range(2, rng.randint(*steps) + 1):
+            yield f"{n}. {rng.choice(SCREENS)}で{rng.choice(TARGETS)}{rng.choice(ACTIONS)}" \
+                if n % 2 == 0 else f"{n}. {rng.choice(OPERATIONS)}"
+        for _ in range(rng.randint(*expectations)):
+            yield f"* [ ] {rng.choice(SCREENS)}で{rng.choice(RESULTS)}"
+            if rng.random() < multiline:
+                yield rng.choice(DETAILS)
+        yield ""
+
+
+def generate_spec(cases: int, **options) -> str:
+    """テスト仕様書の文字列を生成します。オプションは iter_spec_lines と同じ。"""
+    return "\n".join(iter_spec_lines(cases, **options)) + "\n"
+
+
+def write_spec(path: Path, cases: int, **options) -> Path:
+    """テスト仕様書をファイルに書き出します。オプションは iter_spec_lines と同じ。"""
+    with open(path, "w", encoding="utf-8") as f:
+        for line in iter_spec_lines(cases, **options):
+            f.write(line)
+            f.write("\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ベンチマーク用のテスト仕様書の生成")
+    parser.add_argument("--cases", type=int, default=1000, help="テストケースの総数")
+    parser.add_argument("--per-subsection", type=int, default=10, help="中分類あたりのテストケース数")
+    parser.add_argument("--per-section", type=int, default=5, help="大分類あたりの中分類の数")
+    parser.add_argument("--steps", type=int, nargs=2, default=(2, 5), metavar=("MIN", "MAX"), help="試験内容の数")
+    parser.add_argument("--expectations", type=int, nargs=2, default=(1, 3), metavar=("MIN", "MAX"), help="確認事項の数")
+    parser.add_argument("--multiline", type=float, default=0.3, help="継続行を持つ確認事項の割合")
+    parser.add_argument("--seed", type=int, default=0, help="乱数の種")
+    parser.add_argument("-o", "--output", help="出力先（省略時は標準出力）")
+    args = parser.parse_args()
+
+    options = dict(per_subsection=args.per_subsection, per_section=args.per_section, steps=tuple(args.steps),
+                   expectations=tuple(args.expectations), multiline=args.multiline, seed=args.seed)
+    if args.output:
+        write_spec(Path(args.output), args.cases, **options)
+    else:
+        sys.stdout.write(generate_spec(args.cases, **options))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import contextlib
+import glob
+import io
+import os
+import time
+import traceback
+from pathlib import Path
+from typing import Iterable
+
+from md_test_case_to_excel import instrument
+from md_test_case_to_excel.cache import DEFAULT_MAX_SIZE_MB, BuildCache
+
+# ワーカープロセスごとに一度だけ用意する変換の前提（パッケージのルート, 設定情報, キャッシュ）
+_worker_state = None
+
+
+class FileResult:
+    """1ファイル分の変換結果"""
+
+    __slots__ = ("file_path", "output_path", "status", "error", "log", "elapsed", "cache_updates", "report")
+
+    def __init__(self, file_path: Path, output_path: Path | None, status: str, error: str | None,
+                 log: str, elapsed: float, cache_updates: list, report: dict):
+        self.file_path = file_path          # 入力ファイルのパス
+        self.output_path = output_path      # 出力ファイルのパス（失敗した場合はNone）
+        self.status = status                # "converted", "skipped"（キャッシュにより省略）, "failed"
+        self.error = error                  # 失敗した場合のエラー内容
+        self.log = log                      # 変換中の標準出力
+        self.elapsed = elapsed              # 変換にかかった時間（秒）
+        self.cache_updates = cache_updates  # 親プロセスで反映するキャッシュの記録
+        self.report = report                # 処理ごとの所要時間とカウンター（Report.to_dict の結果）
+
+
+class BatchResult:
+    """複数ファイルの変換結果"""
+
+    def __init__(self, results: list[FileResult], elapsed: float):
+        self.results = results
+        self.elapsed = elapsed
+
+    def count(self, status: str) -> int:
+        return sum(1 for result in self.results if result.status == status)
+
+    @property
+    def failed(self) -> list[FileResult]:
+        return [result for result in self.results if result.status == "failed"]
+
+    def summary(self) -> str:
+        return (f"{len(self.results)}ファイル: 変換 {self.count('converted')}, "
+                f"省略 {self.count('skipped')}, 失敗 {self.count('failed')} ({self.elapsed:.2f}秒)")
+
+    def report(self) -> dict:
+        """ファイルごとの計測結果と、その合計を返します（--report-json の内容）。"""
+        files = [instrument.file_entry(result.file_path, result.output_path, result.status, result.elapsed,
+                                       result.report, result.error)
+                 for result in self.results]
+        return instrument.summarize(files, self.elapsed)
+
+
+def expand_patterns(patterns: Iterable[str]) -> list[Path]:
+    """glob形式のパターン（** による再帰指定に対応）から入力ファイルの一覧を求めます。重複は除きます。"""
+    files = {}
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        for match in sorted(matches):
+            path = Path(match)
+            files.setdefault(path.resolve(), path)
+    return list(files.values())
+
+
+def _init_worker(package_root: Path, config, cache_dir: Path | None, cache_max_size: float, use_cache: bool):
+    """ワーカープロセスの初期化。設定情報は親プロセスで読み込んだものを受け取り、ファイルごとには読み込まない"""
+    global _worker_state
+    cache = BuildCache(cache_dir, cache_max_size, autosave=False) if use_cache else None
+    _worker_state = (package_root, config, cache)
+
+
+def _convert_one(file_path: Path, options: dict) -> FileResult:
+    """1ファイルを変換します。例外は結果に記録し、他のファイルの変換を止めない"""
+    from md_test_case_to_excel.converter import convert_md_to_excel
+
+    package_root, config, cache = _worker_state
+    log = io.StringIO()
+    start = time.perf_counter()
+    output_path, error = None, None
+    report = instrument.Report()
+    try:
+        with contextlib.redirect_stdout(log), instrument.recording(report):
+            output_path = convert_md_to_excel(file_path, package_root=package_root, config=config,
+                                              cache=cache, use_cache=cache is not None, **options)
+    except Exception:
+        error = traceback.format_exc(limit=-3)
+    elapsed = time.perf_counter() - start
+
+    cache_updates = []
+    if cache is not None:
+        cache_updates, cache.pending = cache.pending, []
+    if error is not None:
+        status = "failed"
+    elif cache_updates and all(update["kind"] == "touch" for update in cache_updates):
+        status = "skipped"
+    else:
+        status = "converted"
+    return FileResult(file_path, output_path, status, error, log.getvalue(), elapsed, cache_updates,
+                      report.to_dict())
+
+
+def convert_many(files: Iterable[str | Path], jobs: int | None = None, use_cache: bool = True,
+                 cache_dir: str | Path | None = None, cache_max_size: float = DEFAULT_MAX_SIZE_MB,
+                 **options) -> BatchResult:
+    """複数のMarkdownファイルをプロセスプールで並列に変換します。
+
+    Args:
+        files (Iterable):         入力ファイルのパス。glob形式のパターンも指定できる
+        jobs (int):               並列数。省略時はCPUのコア数。1の場合は現在のプロセスで順に変換する
+        use_cache (bool):         変換結果のキャッシュを使うかどうか
+        cache_dir (Path):         キャッシュの保存先
+        cache_max_size (float):   解析結果のキャッシュの合計サイズの上限（MB）
+        **options:                convert_md_to_excel に渡す変換オプション（template, test_type など）
+
+    Returns:
+        BatchResult: ファイルごとの変換結果（入力の順）
+
+    Notes:
+        - パッケージのルートと設定情報は親プロセスで一度だけ読み込み、ワーカープロセスに渡す
+        - 1ファイルの失敗は結果に記録し、他のファイルの変換は続ける
+        - キャッシュの manifest.json は親プロセスがまとめて更新する（プロセス間で書き込みが競合しないようにする）
+    """
+    from md_test_case_to_excel.config_loader import load_config
+    from md_test_case_to_excel.converter import find_package_root
+
+    start = time.perf_counter()
+    paths = expand_patterns(str(file) for file in files)
+    package_root = find_package_root()
+    cache_dir = Path(cache_dir) if cache_dir else None
+    config = load_config(package_root / "config.yaml", use_snapshot=use_cache, cache_dir=cache_dir)
+    init_args = (package_root, config, cache_dir, cache_max_size, use_cache)
+
+    jobs = min(jobs or os.cpu_count() or 1, max(len(paths), 1))
+    if jobs == 1:
+        _init_worker(*init_args)
+        results = [_convert_one(path, options) for path in paths]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # 大きいファイルから投入して、最後に長い変換が1つだけ残ることを避ける
+        order = sorted(range(len(paths)), key=lambda i: paths[i].stat().st_size if paths[i].exists() else 0,
+                       reverse=True)
+        results = [None] * len(paths)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=init_args) as executor:
+            futures = {i: executor.submit(_convert_one, paths[i], options) for i in order}
+            for i, future in futures.items():
+                results[i] = future.result()
+
+    if use_cache:
+        BuildCache(cache_dir, cache_max_size).merge(
+            [update for result in results for update in result.cache_updates])
+    return BatchResult(results, time.perf_counter() - start)
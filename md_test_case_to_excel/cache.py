@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from md_test_case_to_excel import __version__
+
+if TYPE_CHECKING:
+    from md_test_case_to_excel.records import RecordStore
+
+# キャッシュの形式のバージョン（形式を変えた場合は上げる）
+CACHE_FORMAT = 2
+# 解析結果のキャッシュの合計サイズの上限（MB）
+DEFAULT_MAX_SIZE_MB = 64
+
+
+def default_cache_dir() -> Path:
+    """キャッシュの保存先の既定値を返します。
+
+    Notes:
+        - 環境変数 MD2EXCEL_CACHE_DIR、XDG_CACHE_HOME の順に参照し、どちらもなければ ~/.cache/md2excel
+        - 空の環境変数は設定されていないものとして扱う（カレントディレクトリをキャッシュの保存先にしない）
+    """
+    cache_dir = os.environ.get("MD2EXCEL_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir)
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "md2excel"
+
+
+def file_digest(path: Path) -> str:
+    """ファイルの内容のハッシュ値を返します。"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _fingerprint(path: Path) -> list[int] | None:
+    """出力ファイルが書き換えられていないかを確認するための情報（サイズ, 更新日時）を返します。"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class BuildCache:
+
+    def __init__(self, cache_dir: Path | None = None, max_size_mb: float = DEFAULT_MAX_SIZE_MB,
+                 autosave: bool = True):
+        """変換結果のキャッシュを管理するクラス
+
+        Args:
+            cache_dir (Path):     キャッシュの保存先。省略時は default_cache_dir()
+            max_size_mb (float):  解析結果のキャッシュの合計サイズの上限（MB）。超えた分は最後に使われた日時が古いものから削除する
+            autosave (bool):      記録のたびに manifest.json を保存するかどうか。Falseの場合は pending に溜め、
+                                  呼び出し元（並列変換の親プロセス）が merge() でまとめて反映する
+
+        Notes:
+            - 入力（Markdown・設定ファイル・テンプレートの内容、変換オプション、ツールのバージョン）のハッシュ値を
+              出力ファイルごとに manifest.json に記録し、入力も出力ファイルも変わっていなければ変換を省略する
+            - 解析結果は Markdown と設定ファイルの内容のハッシュ値をキーに保存し、テンプレートや出力ファイルのみ
+              変わった場合に再利用する
+            - このモジュールは openpyxl・pandas などの重い依存関係をインポートしない
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.manifest_path = self.cache_dir / "manifest.json"
+        self.records_dir = self.cache_dir / "records"
+        self.autosave = autosave
+        self.pending = []  # 保存していない記録（autosave=Falseの場合）
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            manifest = None
+        if not isinstance(manifest, dict) or manifest.get("format") != CACHE_FORMAT:
+            manifest = {"format": CACHE_FORMAT, "outputs": {}, "records": {}}
+        return manifest
+
+    def _save_manifest(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # 書き込み途中のファイルを読まないよう、一時ファイルに書いてから置き換える
+        temp_path = self.manifest_path.with_name(f"{self.manifest_path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False)
+        os.replace(temp_path, self.manifest_path)
+
+    @staticmethod
+    def records_key(markdown_digest: str, config_digest: str) -> str:
+        """解析結果のキャッシュのキーを返します。"""
+        return _digest("records", __version__, markdown_digest, config_digest)
+
+    @staticmethod
+    def build_key(records_key: str | dict[str, str], template_digest: str | None, options: dict) -> str:
+        """変換結果のキャッシュのキーを返します。
+
+        Args:
+            records_key (str):      records_key() で求めた解析結果のキー（複数のシートに出力する場合はテストの種別 -> キーのdict）
+            template_digest (str):  テンプレートファイルの内容のハッシュ値（テンプレートを使わない場合はNone）
+            options (dict):         出力に影響する変換オプション
+        """
+        return _digest("build", __version__, records_key, template_digest, options)
+
+    def is_fresh(self, output_path: Path, build_key: str) -> bool:
+        """前回の変換から入力も出力ファイルも変わっていないかどうかを返します。"""
+        entry = self.manifest["outputs"].get(str(Path(output_path).resolve()))
+        if entry is None or entry["key"] != build_key:
+            return False
+        return entry["fingerprint"] == _fingerprint(Path(output_path))
+
+    def touch(self, output_path: Path):
+        """キャッシュを使用した日時を更新します。"""
+        path = str(Path(output_path).resolve())
+        entry = self.manifest["outputs"].get(path)
+        if entry is not None:
+            entry["used"] = time.time()
+            records = {}
+            for records_key in entry["records"]:
+                records_entry = self.manifest["records"].get(records_key)
+                if records_entry is not None:
+                    records_entry["used"] = entry["used"]
+                    records[records_key] = records_entry
+            self._commit("touch", {path: entry}, records)
+
+    def load_records(self, records_key: str) -> RecordStore | None:
+        """保存済みの解析結果を返します。見つからない場合はNone。"""
+        from md_test_case_to_excel.records import FIELDS, RecordStore
+
+        if records_key not in self.manifest["records"]:
+            return None
+        try:
+            with open(self.records_dir / f"{records_key}.json", "r", encoding="utf-8") as f:
+                columns = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if len(columns) != len(FIELDS):
+            return None
+        self.manifest["records"][records_key]["used"] = time.time()
+        return RecordStore(zip(*columns))
+
+    def store(self, output_path: Path, build_key: str, records: dict[str, RecordStore]):
+        """変換結果を記録し、上限を超えた古いキャッシュを削除します。
+
+        Args:
+            output_path (Path):   出力したファイルのパス
+            build_key (str):      build_key() で求めた変換結果のキー
+            records (dict):       records_key() で求めた解析結果のキー -> 解析結果（複数のシートに出力した場合は複数）
+        """
+        now = time.time()
+        for records_key, store in records.items():
+            if records_key not in self.manifest["records"]:
+                self.records_dir.mkdir(parents=True, exist_ok=True)
+                records_path = self.records_dir / f"{records_key}.json"
+                with open(records_path, "w", encoding="utf-8") as f:
+                    json.dump(store.columns, f, ensure_ascii=False)
+                self.manifest["records"][records_key] = {"size": records_path.stat().st_size, "used": now}
+            else:
+                self.manifest["records"][records_key]["used"] = now
+
+        path = str(Path(output_path).resolve())
+        self.manifest["outputs"][path] = {
+            "key": build_key,
+            "records": list(records),
+            "fingerprint": _fingerprint(Path(output_path)),
+            "used": now,
+        }
+        self._commit("store", {path: self.manifest["outputs"][path]},
+                     {records_key: self.manifest["records"][records_key] for records_key in records})
+
+    def _commit(self, kind: str, outputs: dict, records: dict):
+        """記録を保存します。autosave=Falseの場合は pending に溜めます。
+
+        Args:
+            kind (str):      記録の種類（touch: 変換を省略した, store: 変換した）
+            outputs (dict):  更新した出力ファイルの記録
+            records (dict):  更新した解析結果の記録
+        """
+        if self.autosave:
+            self.prune()
+        else:
+            self.pending.append({"kind": kind, "outputs": outputs, "records": records})
+
+    def merge(self, updates: list[dict]):
+        """他のプロセスで記録した内容（pending）を反映し、上限を超えた古いキャッシュを削除して保存します。"""
+        for update in updates:
+            self.manifest["outputs"].update(update["outputs"])
+            self.manifest["records"].update(update["records"])
+        self.prune()
+
+    def prune(self, max_size: int | None = None) -> int:
+        """解析結果のキャッシュの合計サイズが上限以下になるまで、最後に使われた日時が古いものから削除します。
+
+        Args:
+            max_size (int):  上限（バイト）。省略時はコンストラクタで指定した値
+
+        Returns:
+            int: 削除した解析結果の数
+        """
+        max_size = self.max_size if max_size is None else max_size
+        records = self.manifest["records"]
+        total = sum(entry["size"] for entry in records.values())
+        removed = 0
+        for key, entry in sorted(records.items(), key=lambda item: item[1]["used"]):
+            if total <= max_size:
+                break
+            (self.records_dir / f"{key}.json").unlink(missing_ok=True)
+            del records[key]
+            total -= entry["size"]
+            removed += 1
+
+        # 出力ファイルが削除されたものと、解析結果が削除されたものは記録から外す
+        outputs = self.manifest["outputs"]
+        for path, entry in list(outputs.items()):
+            if any(key not in records for key in entry["records"]) or not Path(path).exists():
+                del outputs[path]
+        self._save_manifest()
+        return removed
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from md_test_case_to_excel.config_loader import Config
+
+# 見出し（行の種別が排他的に決まるもの）として扱う列。並び順が判定の優先順位
+HEADING_KINDS = ("section", "subsection", "testcase")
+# テストケース本文として扱う列。並び順が判定の優先順位
+BODY_KINDS = ("step", "expectation")
+
+# 正規表現のメタ文字
+_META_CHARS = set(".^$*+?{}[]\\|()")
+# 直前の文字を省略可能にする量指定子
+_OPTIONAL_QUANTIFIERS = set("*?{")
+
+
+def literal_prefix(pattern: str) -> tuple[str, bool]:
+    """正規表現が行頭で必ず一致するリテラル文字列を取り出します。
+
+    Args:
+        pattern (str):  md_patternの正規表現
+
+    Returns:
+        tuple[str, bool]: (リテラルの接頭辞, 接頭辞の直後が数字(\\d)で始まるかどうか)
+
+    Notes:
+        - 判定できない構文が現れた時点で打ち切るため、接頭辞は常に控えめに求まる
+        - 選択（|）を含むパターンは接頭辞なしとして扱う
+    """
+    if "|" in pattern:
+        return "", False
+
+    i = 1 if pattern.startswith("^") else 0
+    prefix = []
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\" and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            if escaped == "d" and not prefix:
+                # 先頭が数字クラスの場合は数字による振り分けを行う
+                return "", True
+            if escaped.isalnum():
+                # \s, \w, \b などの文字クラス・アンカー
+                break
+            literal, i = escaped, i + 2
+        elif c in _META_CHARS:
+            break
+        else:
+            literal, i = c, i + 1
+
+        # 量指定子が続く文字は省略される可能性があるので接頭辞に含めない
+        if i < len(pattern) and (pattern[i] in _OPTIONAL_QUANTIFIERS or pattern[i] == "+"):
+            if pattern[i] == "+":
+                prefix.append(literal)
+            break
+        prefix.append(literal)
+    return "".join(prefix), False
+
+
+class _Rule:
+    """1列分の判定ルール"""
+
+    __slots__ = ("kind", "pattern", "prefix", "digit")
+
+    def __init__(self, kind: str, md_pattern: str):
+        self.kind = kind
+        self.pattern = re.compile(md_pattern, re.MULTILINE)
+        self.prefix, self.digit = literal_prefix(md_pattern)
+
+
+# どの種別にも一致しない行の判定結果
+NO_MATCH = (None, None, None, None)
+
+
+class LineClassifier:
+
+    def __init__(self, config: Config):
+        """config.yamlのmd_patternから行の判定器を組み立てるクラス
+
+        Args:
+            config (Config):  設定情報
+
+        Notes:
+            - 行頭の1文字（#, 数字, * など）で候補となるパターンを絞り込み、候補のみ正規表現で判定する
+            - 見出しと本文の判定は1行につき1回の振り分けでまとめて行う
+            - 接頭辞を求められないパターンは全ての行で正規表現を評価する
+        """
+        columns = config.columns
+        rules = [_Rule(kind, getattr(columns, kind).md_pattern) for kind in HEADING_KINDS + BODY_KINDS]
+        # コンパイル済みの正規表現（種別名 -> Pattern）
+        self.patterns = {rule.kind: rule.pattern for rule in rules}
+
+        # 行を判定する。戻り値は (見出しの種別, Matchオブジェクト, 本文の種別, Matchオブジェクト)。一致しない側はNone
+        self.classify = self._build_classifier(rules)
+
+        # テストケースの終端となる行頭（見出しパターンの記号部分）
+        # 既定の設定では "##", "###", "####" となり、"#####" なども終端として扱う
+        boundary_prefixes = set()
+        self._boundary_patterns = []
+        for rule in rules[:len(HEADING_KINDS)]:
+            marker = rule.prefix.split(" ", 1)[0].rstrip()
+            if marker:
+                boundary_prefixes.add(marker)
+            else:
+                self._boundary_patterns.append(rule.pattern)
+        self._boundary_prefixes = tuple(sorted(boundary_prefixes))
+
+    @staticmethod
+    def _build_classifier(rules: list[_Rule]):
+        """行頭の1文字から候補ルールを引く表を使う判定関数を返します。"""
+        # 行頭の文字 -> (候補ルール, 見出しと本文の両方を含むかどうか)。初めて現れた文字のときに作成する
+        candidates_by_char = {}
+        lookup = candidates_by_char.get
+
+        def build_candidates(first_char: str):
+            # 優先順位を保つため、元のルール順で候補を並べる
+            candidates = tuple(
+                (rule.kind, rule.kind in HEADING_KINDS, rule.pattern.match) for rule in rules
+                if (not rule.prefix and not rule.digit) or (rule.prefix and rule.prefix[0] == first_char)
+                or (rule.digit and first_char.isdecimal()))
+            mixed = len({is_heading for _, is_heading, _ in candidates}) == 2
+            entry = candidates_by_char[first_char] = (candidates, mixed)
+            return entry
+
+        def classify(line: str):
+            first_char = line[:1]
+            candidates, mixed = lookup(first_char) or build_candidates(first_char)
+            if not mixed:
+                # 既定の設定では見出しと本文の行頭は重ならないため、最初に一致したものが判定結果
+                for kind, is_heading, match_func in candidates:
+                    match = match_func(line)
+                    if match:
+                        return (kind, match, None, None) if is_heading else (None, None, kind, match)
+                return NO_MATCH
+            # 見出しと本文の両方に一致しうる場合は、それぞれ最初に一致したものを求める
+            heading_kind = heading_match = body_kind = body_match = None
+            for kind, is_heading, match_func in candidates:
+                if (heading_kind if is_heading else body_kind) is not None:
+                    continue
+                match = match_func(line)
+                if match:
+                    if is_heading:
+                        heading_kind, heading_match = kind, match
+                    else:
+                        body_kind, body_match = kind, match
+            return heading_kind, heading_match, body_kind, body_match
+
+        return classify
+
+    def is_boundary(self, line: str) -> bool:
+        """テストケースの終端となる見出し行かどうかを判定します。"""
+        if self._boundary_prefixes and line.startswith(self._boundary_prefixes):
+            return True
+        return any(pattern.match(line) for pattern in self._boundary_patterns)
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 from pathlib import Path
 
-import yaml
 from pydantic import BaseModel, Field, ValidationError
 
 
@@ -41,16 +40,128 @@ class Config(BaseModel):
     excel_settings: ExcelSettings = Field(...)
 
 
-def load_config(file_path: Path):
-    if not file_path.exists():
-        raise FileNotFoundError(f"設定ファイルが見つかりません: {file_path}")
+# 検証済みの設定情報のスナップショットの形式のバージョン（形式を変えた場合は上げる）
+SNAPSHOT_FORMAT = 1
+
+# 読み込み済みの設定情報（ファイルのパス -> (ファイルの情報, 設定情報)）。同じプロセス内では1つの設定情報を共有する
+_loaded: dict[Path, tuple[tuple[int, int], Config]] = {}
+
+
+def _construct(model: type[BaseModel], data: dict) -> BaseModel:
+    """検証済みのデータから、検証を行わずにモデルを組み立てます（入れ子のモデルも組み立てる）。"""
+    values = {}
+    for name, field in model.model_fields.items():
+        key = field.alias or name
+        if key not in data:
+            continue
+        value = data[key]
+        if isinstance(field.annotation, type) and issubclass(field.annotation, BaseModel) and isinstance(value, dict):
+            value = _construct(field.annotation, value)
+        values[key] = value
+    return model.model_construct(**values)
+
+
+def _snapshot_path(file_path: Path, cache_dir: Path | None) -> Path:
+    import hashlib
+
+    from md_test_case_to_excel.cache import default_cache_dir
+
+    name = hashlib.sha256(str(file_path).encode("utf-8")).hexdigest()[:32]
+    return (Path(cache_dir) if cache_dir is not None else default_cache_dir()) / "config" / f"{name}.json"
+
+
+def _read_snapshot(file_path: Path, signature: tuple[int, int], cache_dir: Path | None) -> Config | None:
+    """保存済みのスナップショットを読み込みます。設定ファイルが変わっている場合はNone。"""
+    import json
+
+    from md_test_case_to_excel import __version__
+
+    try:
+        with open(_snapshot_path(file_path, cache_dir), "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT
+            or snapshot.get("version") != __version__ or snapshot.get("path") != str(file_path)
+            or snapshot.get("signature") != list(signature)):
+        return None
+    return _construct(Config, snapshot["data"])
+
+
+def _write_snapshot(file_path: Path, signature: tuple[int, int], config: Config, cache_dir: Path | None):
+    """検証済みの設定情報をスナップショットとして保存します（保存できない場合は何もしない）。"""
+    import json
+    import os
+
+    from md_test_case_to_excel import __version__
+
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "version": __version__,
+        "path": str(file_path),
+        "signature": list(signature),
+        # 設定ファイルに書かれていた項目のみ保存し、組み立てたモデルの model_fields_set を検証時と揃える
+        "data": config.model_dump(by_alias=True, exclude_unset=True),
+    }
+    snapshot_path = _snapshot_path(file_path, cache_dir)
+    temp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(temp_path, snapshot_path)
+    except OSError:
+        pass
+
+
+def _parse_yaml(file_path: Path) -> Config:
+    import yaml
+
+    # libyamlが使える場合はC実装のローダーで読み込む
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     with open(file_path, 'r', encoding='utf-8_sig') as f:
-        config_data = yaml.safe_load(f)
+        config_data = yaml.load(f, Loader=loader)
         try:
             return Config(**config_data)
         except ValidationError as e:
             raise ValueError(f"設定ファイルの形式が正しくありません\n{e}")
 
 
+def load_config(file_path: Path, use_snapshot: bool = True, cache_dir: str | Path | None = None) -> Config:
+    """設定ファイルを読み込みます。
+
+    Args:
+        file_path (Path):       設定ファイルのパス
+        use_snapshot (bool):    検証済みの設定情報のスナップショットを使うかどうか（False の場合はファイルの読み込みも保存もしない）
+        cache_dir (Path):       スナップショットの保存先とするキャッシュの保存先（省略時は cache.default_cache_dir()）
+
+    Returns:
+        Config: 設定情報
+
+    Notes:
+        - 同じプロセス内で読み込み済みの設定ファイルは、変更されていなければ同じ設定情報を返す
+        - 検証済みの設定情報はキャッシュの保存先（cache_dir）にスナップショットとして保存し、
+          設定ファイルのパス・更新日時・サイズが同じであればYAMLの解析と検証を行わずに読み込む
+    """
+    file_path = Path(file_path)
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"設定ファイルが見つかりません: {file_path}")
+    file_path = file_path.resolve()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    loaded = _loaded.get(file_path)
+    if loaded is not None and loaded[0] == signature:
+        return loaded[1]
+
+    config = _read_snapshot(file_path, signature, cache_dir) if use_snapshot else None
+    if config is None:
+        config = _parse_yaml(file_path)
+        if use_snapshot:
+            _write_snapshot(file_path, signature, config, cache_dir)
+    _loaded[file_path] = (signature, config)
+    return config
+
+
 def load_column_names(config: Config) -> list[str]:
     return [col["name"] for col in config.columns.model_dump().values()]
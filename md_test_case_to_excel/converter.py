@@ -5,98 +5,177 @@ Usage:
     md2excel -h
     md2excel [-f] <file> [--template] [--no-auto-width] [--test-type <type>]
     md2excel [-f] <file> [--ut|--it]  # 単体試験・結合試験の略称
+    md2excel --batch '<pattern>' [...] [--jobs <n>]  # 複数ファイルを並列に変換
+    md2excel [--test <file>] [--ut <file>] [--it <file>] [-o <output>]  # 複数のシートを1つのファイルに出力
+    md2excel --watch <dir-or-file> [...]  # 変更を監視して再変換
+    md2excel [-f] <file> --report-json <report.json>  # 処理ごとの所要時間とカウンターをJSONに出力
+    md2excel [-f] <file> --profile cpu|mem  # cProfile / tracemalloc で計測
+    md2excel -f - -o - < spec.md > spec.xlsx  # 標準入力から読み込み、標準出力に書き出す
+    md2excel [-f] <file> --format csv       # Excelを使わずに表形式（csv, tsv, jsonl, parquet, feather）で出力
+    md2excel serve [--port N]               # ローカルのHTTPサーバーとして常駐して変換する（serve.py を参照）
 """
 
 import argparse
+import contextlib
+import io
 import os
 import sys
+import time
+import traceback
 from pathlib import Path
-import shutil
-import importlib.resources
-import importlib.util
 
-# 自身のパッケージから参照するように変更
-from md_test_case_to_excel.config_loader import load_config
-from md_test_case_to_excel.excel import ExcelWriter
-from md_test_case_to_excel.markdown import MarkdownTestParser, read_markdown_file
+from md_test_case_to_excel import instrument
+from md_test_case_to_excel.cache import DEFAULT_MAX_SIZE_MB, BuildCache, file_digest
+
+# pandas, openpyxl, pydantic, yaml などの重い依存関係は、ヘルプ表示などで読み込まないよう
+# 変換処理の中で必要になった時点でインポートする
+
+# テストの種別（ワークブックに新しくシートを作成する場合はこの順に並べる）
+TEST_TYPES = ("test", "ut", "it")
+
+# 同梱のテンプレート（パッケージのルートディレクトリからの相対パス）
+TEMPLATE_NAME = Path("assets") / "ARMDXP_単体・結合試験_DAS-M_テンプレート_md.xlsx"
+
+# 標準入力・標準出力を表すファイル名
+STDIO = "-"
+
+# 既定の出力形式（export.EXCEL_FORMAT と同じ。コマンドの起動時に export を読み込まないよう定義する）
+EXCEL_FORMAT = "xlsx"
+
+# 探索済みのパッケージのルートディレクトリ（(環境変数の値, カレントディレクトリ) -> ルートディレクトリ）
+_package_roots = {}
 
 def find_package_root():
     """
-    パッケージのルートディレクトリを探します。
-    インストール済みの場合はインストール先ディレクトリ、
-    開発中の場合はプロジェクトのルートディレクトリを返します。
+    パッケージのルートディレクトリ（config.yamlのあるディレクトリ）を探します。
+    次の順に確認し、最初にconfig.yamlが見つかったディレクトリを返します。
+
+    1. 環境変数 MD_TEST_CASE_TO_EXCEL_ROOT で指定したディレクトリ
+    2. PyInstallerなどで実行ファイルになっている場合は、実行ファイルのディレクトリ
+    3. パッケージのディレクトリ（インストール先、または開発中のソース）
+    4. プロジェクトのルートディレクトリ（パッケージの親ディレクトリ）
+    5. カレントディレクトリ
+
+    結果はプロセス内で保持し、環境変数とカレントディレクトリが変わらなければ探し直しません。
     """
-    try:
-        # Python 3.9+のimportlib.resourcesを使用
-        # まずパッケージ内のconfig.yamlを探す
-        try:
-            with importlib.resources.files('md_test_case_to_excel').joinpath('config.yaml').open('rb'):
-                # 見つかったならそのパスを返す
-                return Path(importlib.resources.files('md_test_case_to_excel'))
-        except (ImportError, FileNotFoundError):
-            pass
-        
-        # pkg_resourcesを使用する方法（バックアップ）
-        import pkg_resources
-        config_file = pkg_resources.resource_filename('md_test_case_to_excel', 'config.yaml')
-        if Path(config_file).exists():
-            return Path(config_file).parent
-    except Exception as e:
-        print(f"設定ファイルの検索中にエラーが発生: {e}")
-        
-    # 実行ファイルのディレクトリをチェック
+    env_root = os.environ.get("MD_TEST_CASE_TO_EXCEL_ROOT")
+    key = (env_root, os.getcwd())
+    if key in _package_roots:
+        return _package_roots[key]
+
+    candidates = []
+    if env_root:
+        candidates.append(Path(env_root))
     if getattr(sys, 'frozen', False):
-        # PyInstallerなどで実行ファイルになっている場合
-        base_path = Path(sys.executable).parent
-        if (base_path / "config.yaml").exists():
-            return base_path
-    
-    # カレントディレクトリの相対パスをチェック
-    for path in [Path.cwd(), Path(__file__).parent, Path(__file__).parent.parent]:
+        candidates.append(Path(sys.executable).parent)
+    package_dir = Path(__file__).resolve().parent
+    candidates += [package_dir, package_dir.parent, Path.cwd()]
+
+    for path in candidates:
         if (path / "config.yaml").exists():
+            _package_roots[key] = path
             return path
             
-    # 環境変数をチェック
-    if "MD_TEST_CASE_TO_EXCEL_ROOT" in os.environ:
-        env_path = Path(os.environ["MD_TEST_CASE_TO_EXCEL_ROOT"])
-        if (env_path / "config.yaml").exists():
-            return env_path
-    
     # 最後の手段
     print("警告: 設定ファイル(config.yaml)が見つかりません。")
     print("MD_TEST_CASE_TO_EXCEL_ROOT環境変数を設定するか、カレントディレクトリにconfig.yamlを配置してください。")
     return Path.cwd()
 
-def convert_md_to_excel(file_path, template=False, no_auto_width=False, test_type="test"):
+# 設定情報ごとの解析器と書き込み器（id(設定情報) -> [設定情報, MarkdownTestParser, ExcelWriter（未作成の場合はNone）]）
+_engines = {}
+_MAX_ENGINES = 8
+
+def _engine_entry(config):
+    from md_test_case_to_excel.markdown import MarkdownTestParser
+
+    entry = _engines.get(id(config))
+    if entry is None or entry[0] is not config:
+        entry = [config, MarkdownTestParser(None, config), None]
+        if len(_engines) >= _MAX_ENGINES:
+            _engines.clear()
+        _engines[id(config)] = entry
+    return entry
+
+def markdown_parser(config):
     """
-    Markdownファイルをエクセルファイルに変換する関数
-    
+    設定情報に対応する、使い回しのできる解析器（MarkdownTestParser）を返します（openpyxlは読み込まない）。
+    """
+    return _engine_entry(config)[1]
+
+def conversion_engines(config):
+    """
+    設定情報に対応する、使い回しのできる解析器（MarkdownTestParser）と書き込み器（ExcelWriter）を返します。
+    正規表現のコンパイルと列のレイアウトの組み立ては設定情報ごとに一度だけ行います。
+
     Args:
-        file_path (str): 入力ファイルパス
-        template (bool): テンプレートを使用するかどうか
-        no_auto_width (bool): 列幅の自動調整を無効にするかどうか
-        test_type (str): テストの種別（test, ut, it）
-        
+        config (Config): 設定情報
+
     Returns:
-        Path: 出力されたファイルのパス
+        tuple: (MarkdownTestParser, ExcelWriter)。解析するテスト仕様書は parse_records に、
+               書き込むテストケースは ExcelWriter.bind に渡す。いずれも複数のスレッドから同時に使用できる
+
+    Notes:
+        - load_config は設定ファイルが変わらなければ同じ設定情報を返すため、変換のたびに組み立て直さない
     """
-    package_root = find_package_root()
-    
-    # 設定ファイルの読み込み
-    config = load_config(package_root / "config.yaml")
-    
-    # Markdownファイルの読み込みと解析
-    markdown_content = read_markdown_file(Path(file_path))
-    parser = MarkdownTestParser(markdown_content, config)
-    df = parser.parse()
-    print(f"-------\n{df}\n-------")
+    from md_test_case_to_excel.excel import ExcelWriter
 
-    writer = ExcelWriter(df, config)
-    
+    entry = _engine_entry(config)
+    if entry[2] is None:
+        entry[2] = ExcelWriter(None, config)
+    return entry[1], entry[2]
+
+def parse_markdown_file(markdown_path, config):
+    """
+    Markdownファイルを1行ずつ読み込みながら解析します。
+    プロセスプールで並列に解析できるよう、モジュールの関数として定義しています。
+
+    Args:
+        markdown_path (Path): 入力ファイルパス
+        config (Config): 設定情報
+
+    Returns:
+        RecordStore: 解析結果のテストケース
+    """
+    from md_test_case_to_excel.markdown import open_markdown_file
+
+    parser = markdown_parser(config)
+    with open_markdown_file(markdown_path) as f:
+        return parser.parse_records(f)
+
+def _parse_markdown_file_recorded(markdown_path, config):
+    """
+    プロセスプールで解析する場合に、解析結果と合わせてワーカープロセスでの計測結果を返します。
+    """
+    with instrument.recording() as report:
+        records = parse_markdown_file(markdown_path, config)
+    return records, report.to_dict()
+
+def sheet_name_of(config, test_type):
+    """
+    テストの種別（test, ut, it）から出力先のシート名を返します。
+    """
+    if test_type == "ut":
+        return config.excel_settings.sheet_name.ut
+    elif test_type == "it":
+        return config.excel_settings.sheet_name.it
+    return config.excel_settings.sheet_name.test
+
+def resolve_template_path(package_root, template, output_path):
+    """
+    使用するテンプレートファイルのパスを決定します。
+
+    Args:
+        package_root (Path): パッケージのルートディレクトリ
+        template (bool): テンプレートを使用するかどうか
+        output_path (Path): 出力先のパス
+
+    Returns:
+        Path | None: テンプレートとして使用するファイルのパス（使用しない場合はNone）
+    """
     # テンプレートパスの設定
     template_path = None
     if template:
-        template_path = package_root / "assets" / "ARMDXP_単体・結合試験_DAS-M_テンプレート_md.xlsx"
+        template_path = package_root / TEMPLATE_NAME
         if not template_path.exists():
             print(f"警告: テンプレートファイル {template_path} が見つかりません。新規ファイルを作成します。")
             template_path = None
@@ -104,10 +183,84 @@ def convert_md_to_excel(file_path, template=False, no_auto_width=False, test_typ
             print(f"テンプレートファイル {template_path} を使用します。")
     
     # 既存のExcelファイルが存在し、--templateオプションが指定されていない場合に既存ファイルをテンプレートとして使用
-    output_path = Path(file_path).parent / f"{Path(file_path).stem}.xlsx"
     if output_path.exists() and not template:
         print(f"既存のExcelファイル {output_path} をテンプレートとして使用します。")
         template_path = output_path
+    return template_path
+
+def convert_md_to_excel(file_path, template=False, no_auto_width=False, test_type="test", engine="openpyxl",
+                        upsert=False, use_cache=True, cache_dir=None, cache_max_size=DEFAULT_MAX_SIZE_MB,
+                        config=None, package_root=None, cache=None, output_path=None):
+    """
+    Markdownファイルをエクセルファイルに変換する関数
+    
+    Args:
+        file_path (str): 入力ファイルパス
+        template (bool): テンプレートを使用するかどうか
+        no_auto_width (bool): 列幅の自動調整を無効にするかどうか
+        test_type (str): テストの種別（test, ut, it）
+        engine (str): 新規ファイル作成時の出力エンジン（openpyxl, write_only, raw）
+        upsert (bool): 既存のExcelファイルを更新する際、変更のあった行のみ書き換えるかどうか
+        use_cache (bool): 入力と出力ファイルが前回の変換から変わっていない場合に変換を省略するかどうか
+        cache_dir (str): キャッシュの保存先（省略時は既定の保存先）
+        cache_max_size (float): 解析結果のキャッシュの合計サイズの上限（MB）
+        config (Config): 読み込み済みの設定情報（複数のファイルを変換する場合に共有する）
+        package_root (Path): 探索済みのパッケージのルートディレクトリ
+        cache (BuildCache): 使用するキャッシュ。指定した場合は use_cache, cache_dir, cache_max_size より優先する
+        output_path (str): 出力先のパス（省略時は入力ファイルと同じ場所・名前の.xlsx）
+        
+    Returns:
+        Path: 出力されたファイルのパス
+    """
+    package_root = package_root or find_package_root()
+    config_path = package_root / "config.yaml"
+    markdown_path = Path(file_path)
+    output_path = Path(output_path) if output_path else markdown_path.parent / f"{markdown_path.stem}.xlsx"
+    template_path = resolve_template_path(package_root, template, output_path)
+
+    # 入力・設定・テンプレートと出力ファイルが前回から変わっていなければ変換を省略する（openpyxlは読み込まない）
+    if cache is None and use_cache:
+        cache = BuildCache(Path(cache_dir) if cache_dir else None, cache_max_size)
+    if not (markdown_path.exists() and config_path.exists()):
+        cache = None
+    if cache is not None:
+        with instrument.phase("cache"):
+            records_key = cache.records_key(file_digest(markdown_path), file_digest(config_path))
+            options = {"template": template, "no_auto_width": no_auto_width, "test_type": test_type,
+                       "engine": engine, "upsert": upsert}
+            # 既存の出力ファイルをテンプレートとする場合、その内容は出力ファイルの記録で確認する
+            template_digest = file_digest(template_path) if template and template_path else None
+            build_key = cache.build_key(records_key, template_digest, options)
+            fresh = cache.is_fresh(output_path, build_key)
+            if fresh:
+                cache.touch(output_path)
+        if fresh:
+            instrument.count("files_skipped")
+            print(f"\nNo changes. `{output_path}` は最新のため変換を省略しました。")
+            return output_path
+
+    from md_test_case_to_excel.config_loader import load_column_names, load_config
+
+    # 設定ファイルの読み込み（キャッシュを使わない場合はスナップショットも使わない）
+    if config is None:
+        with instrument.phase("config"):
+            config = load_config(config_path, use_snapshot=cache is not None or use_cache,
+                                 cache_dir=cache.cache_dir if cache is not None else cache_dir)
+    
+    # Markdownファイルを1行ずつ読み込みながら解析（前回と同じ内容であれば保存済みの解析結果を使う）
+    with instrument.phase("cache"):
+        records = cache.load_records(records_key) if cache else None
+    if records is None:
+        records = parse_markdown_file(markdown_path, config)
+    else:
+        instrument.count("cached_test_cases", len(records))
+    with instrument.phase("display"):
+        print(f"-------\n{records.format_table(load_column_names(config))}\n-------")
+
+    writer = conversion_engines(config)[1].bind(records)
+
+    if engine != "openpyxl" and template_path:
+        print(f"警告: テンプレート使用時は出力エンジン {engine} を使用できません。openpyxlで出力します。")
     
     # 出力先のパスを決定
     if template_path and template_path.exists():
@@ -120,7 +273,8 @@ def convert_md_to_excel(file_path, template=False, no_auto_width=False, test_typ
                                 auto_adjust_width=not no_auto_width,
                                 auto_adjust_height=True,
                                 preserve_additional_columns=True,
-                                test_type=test_type)
+                                test_type=test_type,
+                                upsert=upsert)
         else:  # 既存ファイルの上書き更新の場合
             output_path = writer(output_path, 
                                 merge_cells=True, 
@@ -128,54 +282,594 @@ def convert_md_to_excel(file_path, template=False, no_auto_width=False, test_typ
                                 auto_adjust_width=not no_auto_width,
                                 auto_adjust_height=True,
                                 preserve_additional_columns=True,
-                                test_type=test_type)
+                                test_type=test_type,
+                                upsert=upsert)
     else:
         # 従来通りの処理 (新規ファイル作成)
         output_path = writer(output_path, 
                             merge_cells=True,
                             auto_adjust_width=not no_auto_width,
                             auto_adjust_height=True,
-                            test_type=test_type)
+                            test_type=test_type,
+                            engine=engine)
     
+    if writer.upsert_result is not None:
+        print(f"差分更新: {writer.upsert_result}")
+
+    if cache is not None:
+        with instrument.phase("cache"):
+            cache.store(output_path, build_key, {records_key: records})
+
     # 出力したシート名を表示する
-    sheet_name = ""
-    if test_type == "ut":
-        sheet_name = config.excel_settings.sheet_name.ut
-    elif test_type == "it":
-        sheet_name = config.excel_settings.sheet_name.it
-    else:
-        sheet_name = config.excel_settings.sheet_name.test
+    sheet_name = sheet_name_of(config, test_type)
         
     print(f"\nDone! The file is saved at `{output_path}` (シート: {sheet_name}).")
     
     return output_path
 
+def _open_markdown_stream(markdown):
+    """
+    Markdownのテキスト・バイト列・ストリームを、1行ずつ読み込めるテキストのストリームにします。
+    バイト列はUTF-8として読み込み、改行コードはファイルから読み込む場合と同様に \\n にそろえます。
+
+    Returns:
+        tuple[TextIO, Callable]: (テキストのストリーム, 読み込み後に呼び出す後始末の関数)
+    """
+    if isinstance(markdown, str):
+        return io.StringIO(markdown, newline=None), lambda: None
+    if isinstance(markdown, (bytes, bytearray, memoryview)):
+        markdown = io.BytesIO(markdown)
+    elif isinstance(markdown.read(0), str):
+        return markdown, lambda: None
+    # 呼び出し元のストリームは閉じないよう、読み込み後に切り離す
+    stream = io.TextIOWrapper(markdown, encoding="utf-8")
+    return stream, stream.detach
+
+def convert_markdown(markdown, output=None, template=None, no_auto_width=False, test_type="test", engine="openpyxl",
+                     upsert=False, config=None, package_root=None):
+    """
+    Markdownのテスト仕様書をメモリ上でエクセルファイルに変換する関数
+    ファイルの読み書き（一時ファイルを含む）、解析結果の表示、変換結果のキャッシュは行わない
+
+    Args:
+        markdown (str | bytes | IO): Markdownのテキスト、UTF-8のバイト列、またはそれらを読み込むストリーム
+        output (BinaryIO): 書き込み先のストリーム（省略時はエクセルファイルの内容をバイト列で返す）
+        template (bytes | BinaryIO | bool): テンプレートとして使用するエクセルファイルの内容。Trueの場合は同梱のテンプレート。
+                                            既存のエクセルファイルの内容を渡すと、ファイルを指定した場合と同様に追記（upsert の場合は差分更新）する
+        no_auto_width (bool): 列幅の自動調整を無効にするかどうか
+        test_type (str): テストの種別（test, ut, it）
+        engine (str): 新規ファイル作成時の出力エンジン（openpyxl, write_only, raw）
+        upsert (bool): テンプレートの既存の行と対応付け、変更のあった行のみ書き換えるかどうか
+        config (Config): 読み込み済みの設定情報
+        package_root (Path): 探索済みのパッケージのルートディレクトリ
+
+    Returns:
+        bytes | None: エクセルファイルの内容（output を指定した場合はNone）
+
+    Notes:
+        - テンプレートは内容ごとに一度だけ読み込み、以降は読み込み済みのものの複製に書き込む
+    """
+    from md_test_case_to_excel.config_loader import load_config
+    from md_test_case_to_excel.excel import ExcelWriter
+    from md_test_case_to_excel.template import template_cache
+
+    package_root = package_root or find_package_root()
+    if config is None:
+        with instrument.phase("config"):
+            config = load_config(package_root / "config.yaml", use_snapshot=False)
+
+    parser, writer = conversion_engines(config)
+    stream, release = _open_markdown_stream(markdown)
+    try:
+        records = parser.parse_records(stream)
+    finally:
+        release()
+
+    workbook = None
+    if template is not None and template is not False:
+        with instrument.phase("load"):
+            if template is True:
+                workbook = template_cache.load(package_root / TEMPLATE_NAME)
+            else:
+                workbook = template_cache.load_bytes(template if isinstance(template, (bytes, bytearray))
+                                                     else template.read())
+
+    buffer = io.BytesIO()
+    ExcelWriter.write_sheets(buffer, {test_type: writer.bind(records)},
+                             merge_cells=True,
+                             template_workbook=workbook,
+                             auto_adjust_width=not no_auto_width,
+                             auto_adjust_height=True,
+                             preserve_additional_columns=True,
+                             engine=engine,
+                             upsert=upsert)
+    if output is None:
+        return buffer.getvalue()
+    output.write(buffer.getbuffer())
+    return None
+
+def export_markdown(markdown, output_format, output=None, config=None, package_root=None):
+    """
+    Markdownのテスト仕様書を、openpyxlを使わずに表形式（csv, tsv, jsonl, parquet, feather）で書き出す関数
+    解析結果の表示、変換結果のキャッシュは行わない
+
+    Args:
+        markdown (str | bytes | IO): Markdownのテキスト、UTF-8のバイト列、またはそれらを読み込むストリーム
+        output_format (str): 出力形式（export.table_formats() のいずれか）
+        output (str | BinaryIO): 出力先のパス、または書き込み先のストリーム（省略時は内容をバイト列で返す）
+        config (Config): 読み込み済みの設定情報
+        package_root (Path): 探索済みのパッケージのルートディレクトリ
+
+    Returns:
+        bytes | None: 書き出した内容（output を指定した場合はNone）
+
+    Notes:
+        - csv, tsv, jsonl は解析しながら1件ずつ書き出す（全てのテストケースをメモリに保持しない）
+        - parquet, feather は pyarrow が必要
+    """
+    from md_test_case_to_excel.config_loader import load_column_names, load_config
+    from md_test_case_to_excel.export import get_writer
+
+    package_root = package_root or find_package_root()
+    if config is None:
+        with instrument.phase("config"):
+            config = load_config(package_root / "config.yaml", use_snapshot=False)
+    parser = markdown_parser(config)
+    writer = get_writer(output_format, load_column_names(config))
+
+    buffer = io.BytesIO() if output is None else None
+    stream, release = _open_markdown_stream(markdown)
+    try:
+        written = writer.write(parser.iter_records(stream), output if buffer is None else buffer)
+    finally:
+        release()
+    instrument.count("test_cases", written)
+    return buffer.getvalue() if buffer is not None else None
+
+def convert_sheets_to_excel(sources, output_path=None, template=False, no_auto_width=False, engine="openpyxl",
+                            upsert=False, jobs=None, use_cache=True, cache_dir=None, cache_max_size=DEFAULT_MAX_SIZE_MB,
+                            config=None, package_root=None, cache=None):
+    """
+    テストの種別ごとのMarkdownファイルを、1つのエクセルファイルのそれぞれのシートに変換する関数
+    ワークブックの読み込みと保存は1回ずつで、全てのシートをまとめて書き込む
+    
+    Args:
+        sources (dict): テストの種別（test, ut, it） -> 入力ファイルパス
+        output_path (str): 出力先のパス（省略時は最初の入力ファイルと同じ場所・名前の.xlsx）
+        template (bool): テンプレートを使用するかどうか
+        no_auto_width (bool): 列幅の自動調整を無効にするかどうか
+        engine (str): 新規ファイル作成時の出力エンジン（openpyxl, write_only, raw）
+        upsert (bool): 既存のExcelファイルを更新する際、変更のあった行のみ書き換えるかどうか
+        jobs (int): 入力ファイルを並列に解析するプロセス数（省略時または1の場合は順に解析する）
+        use_cache (bool): 入力と出力ファイルが前回の変換から変わっていない場合に変換を省略するかどうか
+        cache_dir (str): キャッシュの保存先（省略時は既定の保存先）
+        cache_max_size (float): 解析結果のキャッシュの合計サイズの上限（MB）
+        config (Config): 読み込み済みの設定情報
+        package_root (Path): 探索済みのパッケージのルートディレクトリ
+        cache (BuildCache): 使用するキャッシュ。指定した場合は use_cache, cache_dir, cache_max_size より優先する
+        
+    Returns:
+        Path: 出力されたファイルのパス
+    """
+    unknown = set(sources) - set(TEST_TYPES)
+    if unknown:
+        raise ValueError(f"テストの種別は {', '.join(TEST_TYPES)} のいずれかを指定してください: {', '.join(sorted(unknown))}")
+    sources = {test_type: Path(sources[test_type]) for test_type in TEST_TYPES if sources.get(test_type)}
+    if not sources:
+        raise ValueError("入力ファイルを1つ以上指定してください。")
+
+    package_root = package_root or find_package_root()
+    config_path = package_root / "config.yaml"
+    if output_path is None:
+        first_path = next(iter(sources.values()))
+        output_path = first_path.parent / f"{first_path.stem}.xlsx"
+    output_path = Path(output_path)
+    template_path = resolve_template_path(package_root, template, output_path)
+
+    # 入力・設定・テンプレートと出力ファイルが前回から変わっていなければ変換を省略する（openpyxlは読み込まない）
+    if cache is None and use_cache:
+        cache = BuildCache(Path(cache_dir) if cache_dir else None, cache_max_size)
+    if not (all(path.exists() for path in sources.values()) and config_path.exists()):
+        cache = None
+    if cache is not None:
+        with instrument.phase("cache"):
+            config_digest = file_digest(config_path)
+            records_keys = {test_type: cache.records_key(file_digest(path), config_digest)
+                            for test_type, path in sources.items()}
+            options = {"template": template, "no_auto_width": no_auto_width, "engine": engine, "upsert": upsert}
+            template_digest = file_digest(template_path) if template and template_path else None
+            build_key = cache.build_key(records_keys, template_digest, options)
+            fresh = cache.is_fresh(output_path, build_key)
+            if fresh:
+                cache.touch(output_path)
+        if fresh:
+            instrument.count("files_skipped")
+            print(f"\nNo changes. `{output_path}` は最新のため変換を省略しました。")
+            return output_path
+
+    from md_test_case_to_excel.config_loader import load_column_names, load_config
+    from md_test_case_to_excel.excel import ExcelWriter
+
+    # 設定ファイルの読み込み（キャッシュを使わない場合はスナップショットも使わない）
+    if config is None:
+        with instrument.phase("config"):
+            config = load_config(config_path, use_snapshot=cache is not None or use_cache,
+                                 cache_dir=cache.cache_dir if cache is not None else cache_dir)
+
+    # 前回と同じ内容のファイルは保存済みの解析結果を使い、それ以外のファイルのみ解析する（同じファイルは1回のみ）
+    records = {}
+    with instrument.phase("cache"):
+        for test_type in sources:
+            cached = cache.load_records(records_keys[test_type]) if cache else None
+            if cached is not None:
+                records[test_type] = cached
+                instrument.count("cached_test_cases", len(cached))
+    pending = list(dict.fromkeys(path for test_type, path in sources.items() if test_type not in records))
+    if jobs and jobs > 1 and len(pending) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # ワーカープロセスでの計測結果（カウンター）は現在のレポートに加算し、解析の時間はこのプロセスで計測する
+        with instrument.phase("parse"), ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as executor:
+            parsed = {}
+            for path, (parsed_records, worker_report) in zip(
+                    pending, executor.map(_parse_markdown_file_recorded, pending, [config] * len(pending))):
+                parsed[path] = parsed_records
+                for name, n in worker_report["counters"].items():
+                    instrument.count(name, n)
+    else:
+        parsed = {path: parse_markdown_file(path, config) for path in pending}
+    for test_type, path in sources.items():
+        records.setdefault(test_type, parsed.get(path))
+
+    column_names = load_column_names(config)
+    writers = {}
+    for test_type in sources:
+        with instrument.phase("display"):
+            print(f"-------\n[{sheet_name_of(config, test_type)}] {sources[test_type]}\n"
+                  f"{records[test_type].format_table(column_names)}\n-------")
+        writers[test_type] = conversion_engines(config)[1].bind(records[test_type])
+
+    if engine != "openpyxl" and template_path:
+        print(f"警告: テンプレート使用時は出力エンジン {engine} を使用できません。openpyxlで出力します。")
+
+    # 全てのシートを書き込んでから1回だけ保存する
+    output_path = ExcelWriter.write_sheets(output_path, writers,
+                                           merge_cells=True,
+                                           template_path=template_path,
+                                           auto_adjust_width=not no_auto_width,
+                                           auto_adjust_height=True,
+                                           preserve_additional_columns=True,
+                                           engine=engine,
+                                           upsert=upsert)
+
+    for test_type, writer in writers.items():
+        if writer.upsert_result is not None:
+            print(f"差分更新（{sheet_name_of(config, test_type)}）: {writer.upsert_result}")
+
+    if cache is not None:
+        with instrument.phase("cache"):
+            cache.store(output_path, build_key,
+                        {records_keys[test_type]: records[test_type] for test_type in sources})
+
+    sheet_names = ", ".join(sheet_name_of(config, test_type) for test_type in sources)
+    print(f"\nDone! The file is saved at `{output_path}` (シート: {sheet_names}).")
+
+    return output_path
+
+def convert_with_report(report_json, file_path, convert, *args, **kwargs):
+    """
+    変換処理を計測しながら実行し、処理ごとの所要時間とカウンターをJSONファイルに書き出します。
+    変換に失敗した場合もレポートを書き出してから例外を送出します。
+
+    Args:
+        report_json (str): レポートの出力先（Noneの場合は計測せずに変換する）
+        file_path (str): レポートに記録する入力ファイル
+        convert (Callable): 変換処理（convert_md_to_excel, convert_sheets_to_excel）
+        *args, **kwargs: 変換処理に渡す引数
+
+    Returns:
+        Path: 出力されたファイルのパス
+    """
+    if not report_json:
+        return convert(*args, **kwargs)
+
+    output_path, error = None, None
+    start = time.perf_counter()
+    with instrument.recording() as report:
+        try:
+            output_path = convert(*args, **kwargs)
+        except Exception:
+            error = traceback.format_exc(limit=-3)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            status = "failed" if error else "skipped" if report.counters.get("files_skipped") else "converted"
+            entry = instrument.file_entry(file_path, output_path, status, elapsed, report, error)
+            instrument.write_report(report_json, instrument.summarize([entry], elapsed))
+    return output_path
+
 def main():
     """
     コマンドラインツールのエントリーポイント
     """
+    if sys.argv[1:2] == ["serve"]:
+        from md_test_case_to_excel.serve import main as serve_main
+
+        serve_main(sys.argv[2:])
+        return
+
+    from md_test_case_to_excel.export import table_formats
+
     parser = argparse.ArgumentParser(description="Markdownで書かれたテスト仕様書をエクセルファイルに変換します。")
-    parser.add_argument("-f", "--file", type=str, required=True, help="入力ファイルパス")
+    input_group = parser.add_mutually_exclusive_group()
+    input_group.add_argument("-f", "--file", type=str, help="入力ファイルパス（- の場合は標準入力から読み込む）")
+    input_group.add_argument("--batch", type=str, nargs="+", metavar="PATTERN",
+                             help="複数の入力ファイルをまとめて変換する（'specs/**/*.md' のようなglob形式のパターンも指定できる）")
+    input_group.add_argument("--watch", type=str, nargs="+", metavar="PATH",
+                             help="ファイルまたはディレクトリ配下の*.mdの変更を監視し、変更のあったファイルを差分更新で再変換する")
     parser.add_argument("--template", action="store_true", help="テンプレートExcelファイルを使用する場合に指定")
     parser.add_argument("--no-auto-width", action="store_true", help="列幅の自動調整を無効にする場合に指定")
     
-    # テスト種別の指定方法（ショートカットと詳細オプションのグループ化）
-    test_type_group = parser.add_mutually_exclusive_group()
-    test_type_group.add_argument("--test-type", type=str, choices=["test", "ut", "it"], 
-                               default="test",
-                               help="テストの種別（test:テスト仕様書、ut:単体試験、it:結合試験）")
-    test_type_group.add_argument("--ut", action="store_const", const="ut", dest="test_type",
-                               help="単体試験シートに出力する（--test-type utのショートカット）")
-    test_type_group.add_argument("--it", action="store_const", const="it", dest="test_type",
-                               help="結合試験シートに出力する（--test-type itのショートカット）")
+    # テスト種別の指定方法（ショートカットと詳細オプション）
+    # --ut/--it にファイルを指定した場合は、--test と合わせてシートごとの入力ファイルとして扱う
+    parser.add_argument("--test-type", type=str, choices=["test", "ut", "it"], default=None,
+                        help="テストの種別（test:テスト仕様書、ut:単体試験、it:結合試験）")
+    parser.add_argument("--ut", nargs="?", const="", default=None, metavar="FILE",
+                        help="単体試験シートに出力する（--test-type utのショートカット）。ファイルを指定した場合はそのファイルを単体試験シートに出力する")
+    parser.add_argument("--it", nargs="?", const="", default=None, metavar="FILE",
+                        help="結合試験シートに出力する（--test-type itのショートカット）。ファイルを指定した場合はそのファイルを結合試験シートに出力する")
+    parser.add_argument("--test", type=str, default=None, metavar="FILE",
+                        help="テスト仕様書シートに出力する入力ファイル。--ut/--it のファイルと合わせて1つのExcelファイルに出力する")
+    parser.add_argument("-o", "--output", type=str, default=None,
+                        help="出力先（省略時は入力ファイルと同じ場所・名前の.xlsx。--test/--ut/--it にファイルを指定した場合は最初の入力ファイル）。"
+                             "- の場合は標準出力に書き出す")
+    
+    parser.add_argument("--engine", type=str, choices=["openpyxl", "write_only", "raw"], default="openpyxl",
+                        help="新規ファイル作成時の出力エンジン（openpyxl:通常、write_only:1行ずつ書き出して省メモリ化、raw:シートのXMLを直接書き出して高速化）")
+    parser.add_argument("--format", type=str, choices=[EXCEL_FORMAT, *table_formats()], default=EXCEL_FORMAT,
+                        help="出力形式（xlsx:エクセルファイル、csv/tsv/jsonl:解析しながら1件ずつ書き出す、"
+                             "parquet/feather:列指向の形式（pyarrowが必要））。xlsx以外はopenpyxlを使わずに解析結果の表のみを出力する")
+    
+    parser.add_argument("--upsert", action="store_true",
+                        help="既存のExcelファイルを更新する際、大分類・中分類・小分類で行を対応付けて変更のあった行のみ書き換える")
+    
+    parser.add_argument("--no-cache", action="store_true",
+                        help="変換結果のキャッシュを使わずに必ず変換する")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help="キャッシュの保存先（省略時は環境変数MD2EXCEL_CACHE_DIR、または~/.cache/md2excel）")
+    parser.add_argument("--cache-max-size", type=float, default=DEFAULT_MAX_SIZE_MB,
+                        help=f"解析結果のキャッシュの合計サイズの上限（MB）。超えた分は古いものから削除する（既定: {DEFAULT_MAX_SIZE_MB}）")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="--batch 指定時の並列数（省略時はCPUのコア数）。--test/--ut/--it にファイルを指定した場合は入力ファイルを並列に解析するプロセス数")
+    
+    parser.add_argument("--poll-interval", type=float, default=None,
+                        help="--watch 指定時にファイルの状態を確認する間隔（秒）")
+    parser.add_argument("--debounce", type=float, default=None,
+                        help="--watch 指定時に、最後の変更から再変換するまでの待ち時間（秒）")
+    parser.add_argument("--report-json", type=str, default=None, metavar="PATH",
+                        help="処理ごとの所要時間と件数（行数・テストケース数・セル数・書式数・マージ範囲数・保存サイズ）をJSONファイルに出力する。"
+                             "--batch 指定時はファイルごとに出力する")
+    parser.add_argument("--profile", type=str, choices=["cpu", "mem"], default=None,
+                        help="変換処理全体を計測する（cpu: cProfileでpstats形式のファイルを出力、"
+                             "mem: tracemallocでメモリのピークと確保箇所の上位をテキストで出力）。出力ファイルの内容は変わらない")
+    parser.add_argument("--profile-output", type=str, default=None, metavar="PATH",
+                        help="--profile の結果の出力先（省略時は md2excel-cpu.prof / md2excel-mem.txt）")
+    parser.add_argument("--profile-top", type=int, default=25, metavar="N",
+                        help="--profile の結果に表示する上位の件数")
     
     args = parser.parse_args()
     
-    convert_md_to_excel(
+    # テスト種別のショートカットとシートごとの入力ファイルを振り分ける
+    sheet_sources = {test_type: path for test_type, path in (("test", args.test), ("ut", args.ut), ("it", args.it))
+                     if path}
+    shortcuts = [test_type for test_type, path in (("ut", args.ut), ("it", args.it)) if path == ""]
+    if len(shortcuts) + (args.test_type is not None) > 1:
+        parser.error("--test-type, --ut, --it はいずれか1つのみ指定できます")
+    test_type = args.test_type or (shortcuts[0] if shortcuts else "test")
+    if sheet_sources:
+        if args.file or args.batch or args.watch:
+            parser.error("-f/--batch/--watch と --test/--ut/--it FILE は同時に指定できません")
+        if shortcuts or args.test_type is not None:
+            parser.error("--test/--ut/--it FILE を指定した場合、テストの種別は入力ファイルごとに決まります")
+    elif not (args.file or args.batch or args.watch):
+        parser.error("-f, --batch, --watch, または --test/--ut/--it FILE のいずれかを指定してください")
+    elif args.output and not args.file:
+        parser.error("-o/--output は -f または --test/--ut/--it FILE を指定した場合のみ使用できます")
+    if args.file == STDIO and not args.output:
+        parser.error("-f - で標準入力から読み込む場合は -o/--output で出力先を指定してください")
+    if args.output == STDIO and sheet_sources:
+        parser.error("-o - は -f と同時にのみ指定できます")
+    if args.format != EXCEL_FORMAT:
+        if not args.file:
+            parser.error(f"--format {args.format} は -f と同時にのみ指定できます")
+        if args.template or args.upsert:
+            parser.error(f"--format {args.format} は --template, --upsert と同時に指定できません")
+    if args.report_json and args.watch:
+        parser.error("--report-json は --watch と同時に指定できません")
+    if args.profile and args.watch:
+        parser.error("--profile は --watch と同時に指定できません")
+    
+    
+    # 標準出力にエクセルファイルを書き出す場合、メッセージ（プロファイルの結果を含む）は標準エラー出力に表示する
+    stdout = sys.stdout.buffer if args.output == STDIO else None
+    with contextlib.redirect_stdout(sys.stderr) if stdout else contextlib.nullcontext():
+        if not args.profile:
+            _run(args, sheet_sources, test_type, stdout)
+            return
+
+        from md_test_case_to_excel.profiling import profiled
+
+        if args.jobs and args.jobs > 1:
+            # 別のプロセスでの処理は計測できないため、このプロセスで順に変換する
+            print("--profile 指定時は並列に変換せず、このプロセスで順に変換します。")
+        args.jobs = 1
+        with profiled(args.profile, args.profile_output, args.profile_top):
+            _run(args, sheet_sources, test_type, stdout)
+
+def _load_cli_config(args, package_root):
+    """
+    コマンドライン引数のキャッシュの指定（--no-cache, --cache-dir）に従って設定ファイルを読み込みます。
+    """
+    from md_test_case_to_excel.config_loader import load_config
+
+    with instrument.phase("config"):
+        return load_config(package_root / "config.yaml", use_snapshot=not args.no_cache, cache_dir=args.cache_dir)
+
+def _convert_stream(args, test_type, stdout=None):
+    """
+    -f - / -o - の場合に、標準入力・標準出力を使ってメモリ上で変換します（一時ファイルは作成しない）。
+    変換結果のキャッシュは使わず、解析結果の表も表示しません。
+
+    Args:
+        args (Namespace): コマンドライン引数
+        test_type (str): テストの種別（test, ut, it）
+        stdout (BinaryIO): 書き込み先の標準出力（-o - の場合）
+
+    Returns:
+        str: 出力先（標準出力の場合は "-"）
+    """
+    package_root = find_package_root()
+    output_path = None if stdout else Path(args.output)
+
+    # 既存のExcelファイルに出力する場合は、ファイルを指定した場合と同様にその内容をテンプレートとして使用する
+    template = args.template or None
+    if output_path is not None and output_path.exists() and not args.template:
+        print(f"既存のExcelファイル {output_path} をテンプレートとして使用します。")
+        template = output_path.read_bytes()
+
+    config = _load_cli_config(args, package_root)
+    with open(args.file, "rb") if args.file != STDIO else contextlib.nullcontext(sys.stdin.buffer) as markdown:
+        content = convert_markdown(markdown,
+                                   template=template,
+                                   no_auto_width=args.no_auto_width,
+                                   test_type=test_type,
+                                   engine=args.engine,
+                                   upsert=args.upsert,
+                                   config=config,
+                                   package_root=package_root)
+    if stdout is not None:
+        stdout.write(content)
+        stdout.flush()
+        return STDIO
+    output_path.write_bytes(content)
+    print(f"\nDone! The file is saved at `{output_path}`.")
+    return output_path
+
+def _export_file(args, stdout=None):
+    """
+    --format で表形式を指定した場合に、-f の入力ファイル（- の場合は標準入力）を書き出します。
+
+    Returns:
+        str: 出力先（標準出力の場合は "-"）
+    """
+    from md_test_case_to_excel.export import output_suffix
+    from md_test_case_to_excel.markdown import open_markdown_file
+
+    if stdout is not None:
+        output = stdout
+    elif args.output:
+        output = Path(args.output)
+    else:
+        markdown_path = Path(args.file)
+        output = markdown_path.parent / f"{markdown_path.stem}{output_suffix(args.format)}"
+
+    package_root = find_package_root()
+    config = _load_cli_config(args, package_root)
+    with open_markdown_file(Path(args.file)) if args.file != STDIO else contextlib.nullcontext(sys.stdin.buffer) as f:
+        export_markdown(f, args.format, output, config=config, package_root=package_root)
+    if stdout is not None:
+        stdout.flush()
+        return STDIO
+    print(f"\nDone! The file is saved at `{output}`.")
+    return output
+
+def _run(args, sheet_sources, test_type, stdout=None):
+    """
+    コマンドライン引数に応じて変換を実行します。
+    """
+    if sheet_sources:
+        convert_with_report(
+            args.report_json,
+            ", ".join(sheet_sources.values()),
+            convert_sheets_to_excel,
+            sheet_sources,
+            output_path=args.output,
+            template=args.template,
+            no_auto_width=args.no_auto_width,
+            engine=args.engine,
+            upsert=args.upsert,
+            jobs=args.jobs,
+            use_cache=not args.no_cache,
+            cache_dir=args.cache_dir,
+            cache_max_size=args.cache_max_size
+        )
+        return
+    
+    if args.watch:
+        from md_test_case_to_excel.watch import DEFAULT_DEBOUNCE, DEFAULT_INTERVAL, watch
+
+        watch(
+            args.watch,
+            interval=args.poll_interval if args.poll_interval is not None else DEFAULT_INTERVAL,
+            debounce=args.debounce if args.debounce is not None else DEFAULT_DEBOUNCE,
+            use_cache=not args.no_cache,
+            cache_dir=args.cache_dir,
+            cache_max_size=args.cache_max_size,
+            template=args.template,
+            no_auto_width=args.no_auto_width,
+            test_type=test_type,
+            engine=args.engine
+        )
+        return
+    
+    if args.batch:
+        from md_test_case_to_excel.batch import convert_many
+
+        batch_result = convert_many(
+            args.batch,
+            jobs=args.jobs,
+            use_cache=not args.no_cache,
+            cache_dir=args.cache_dir,
+            cache_max_size=args.cache_max_size,
+            template=args.template,
+            no_auto_width=args.no_auto_width,
+            test_type=test_type,
+            engine=args.engine,
+            upsert=args.upsert
+        )
+        for result in batch_result.results:
+            print(f"[{result.status}] {result.file_path} ({result.elapsed:.2f}秒)")
+        for result in batch_result.failed:
+            print(f"\nエラー: {result.file_path} の変換に失敗しました。\n{result.log}{result.error}")
+        print(f"\n{batch_result.summary()}")
+        if args.report_json:
+            instrument.write_report(args.report_json, batch_result.report())
+        if batch_result.failed:
+            sys.exit(1)
+        return
+    
+    if args.format != EXCEL_FORMAT:
+        convert_with_report(args.report_json, args.file, _export_file, args, stdout)
+        return
+    
+    if STDIO in (args.file, args.output):
+        convert_with_report(args.report_json, args.file, _convert_stream, args, test_type, stdout)
+        return
+    
+    convert_with_report(
+        args.report_json,
+        args.file,
+        convert_md_to_excel,
         args.file,
+        output_path=args.output,
         template=args.template,
         no_auto_width=args.no_auto_width,
-        test_type=args.test_type
+        test_type=test_type,
+        engine=args.engine,
+        upsert=args.upsert,
+        use_cache=not args.no_cache,
+        cache_dir=args.cache_dir,
+        cache_max_size=args.cache_max_size
     )
 
 if __name__ == "__main__":
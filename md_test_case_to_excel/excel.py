@@ -1,32 +1,33 @@
-from itertools import product
-from pathlib import Path
-import shutil
-import os
-import re
-import math
+from __future__ import annotations
 
-import pandas as pd
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
-
-from md_test_case_to_excel.config_loader import Config, load_column_names
+import contextlib
+import os
+import shutil
+import tempfile
+import threading
+from copy import copy
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
 
+from md_test_case_to_excel import instrument
+from md_test_case_to_excel.config_loader import Config
+from md_test_case_to_excel.layout import ColumnLayout, LayoutPlan
+from md_test_case_to_excel.merges import MergeRange, apply_merges, plan_merges
+from md_test_case_to_excel.metrics import SheetMetrics, lines_to_height, measure_records, text_metrics, width_to_excel
+from md_test_case_to_excel.records import RecordStore
+from md_test_case_to_excel.sheetml import SpreadsheetMLWriter
+from md_test_case_to_excel.template import TemplateSnapshot, template_cache
+from md_test_case_to_excel.upsert import UpsertResult, upsert_sheet
 
-def apply_cell_style(cell, font, fill=None, alignment=None, border=None):
-    cell.font = font
-    if fill:
-        cell.fill = fill
-    if alignment:
-        cell.alignment = alignment
-    if border:
-        cell.border = border
+# openpyxlは書き込み処理の中でインポートする（モジュールの読み込みを軽くするため）
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def estimate_column_width(text, font_name='Meiryo UI', font_size=11, min_width=8, max_width=100):
     """
     テキストの内容に基づいて適切な列幅を推定します。
-    日本語文字は英数字より幅が広いため、文字数ベースで計算します。
+    日本語文字は英数字より幅が広いため、表示幅（全角:半角 = 2:1）で計算します。
     
     Args:
         text (str): セルに表示するテキスト
@@ -40,37 +41,8 @@ def estimate_column_width(text, font_name='Meiryo UI', font_size=11, min_width=8
     """
     if not text:
         return min_width
-    
-    # 改行で分割して各行の長さを計算
-    lines = str(text).split('\n')
-    
-    # 各行の文字数に基づいて幅を計算
-    widths = []
-    for line in lines:
-        # 全角文字（主に日本語）は2文字分、半角は1文字分として計算
-        # 全角文字のパターン
-        fullwidth_pattern = re.compile(r'[^\x00-\xff]')
-        
-        # 全角文字の数を数える
-        fullwidth_count = len(fullwidth_pattern.findall(line))
-        
-        # 半角文字の数を数える
-        halfwidth_count = len(line) - fullwidth_count
-        
-        # 文字数ベースの幅を計算（全角:半角 = 2:1の比率）
-        char_width = fullwidth_count * 2 + halfwidth_count
-        
-        # フォントサイズに応じて調整（Excelの列幅単位に変換）
-        # 標準のフォントサイズ11ptを基準に計算
-        excel_width = char_width * (font_size / 11) * 1.5  # 余裕係数を1.2から1.5に増加
-        
-        widths.append(excel_width)
-    
-    # 最大幅を求める
-    estimated_width = max(widths)
-    
-    # 最小・最大の範囲内に収める
-    return max(min_width, min(estimated_width, max_width))
+    char_width, _ = text_metrics(str(text))
+    return width_to_excel(char_width, font_size, min_width, max_width)
 
 
 def estimate_row_height(row_data, font_name='Meiryo UI', font_size=11, min_height=15, line_height_factor=1.5):
@@ -88,57 +60,128 @@ def estimate_row_height(row_data, font_name='Meiryo UI', font_size=11, min_heigh
         float: 推定行高
     """
     max_lines = 1
-    
-    # 各セルの改行数を計算
     for value in row_data:
         if value is None:
             continue
-            
-        # テキストを文字列に変換して改行で分割
-        lines = str(value).split('\n')
-        
-        # 各行の文字数によって必要な折り返し回数を考慮
-        wrapped_line_count = 0
-        for line in lines:
-            # 全角文字（主に日本語）の場合、1行あたりの文字数は少なくなる
-            # 全角文字のパターン
-            fullwidth_pattern = re.compile(r'[^\x00-\xff]')
-            
-            # 全角文字の数を数える
-            fullwidth_count = len(fullwidth_pattern.findall(line))
-            
-            # 半角文字の数を数える
-            halfwidth_count = len(line) - fullwidth_count
-            
-            # 文字数ベースの幅を計算（全角:半角 = 2:1の比率）
-            char_width = fullwidth_count * 2 + halfwidth_count
-            
-            # 1行あたり約40-50文字として折り返し回数を概算
-            # これは列幅に依存するため、厳密な計算は難しい
-            # 余裕を見て少し多めに見積もる
-            needed_lines = max(1, char_width / 40)
-            wrapped_line_count += needed_lines
-        
-        max_lines = max(max_lines, wrapped_line_count)
-    
-    # 行の高さを計算（各行に対して余裕を持たせる）
-    # Excel行の高さの単位はポイント（pt）なので、フォントサイズに比例
-    # 小数点以下は切り上げて、より余裕を持たせる
-    estimated_height = math.ceil(max_lines) * font_size * line_height_factor
-    
-    return max(min_height, estimated_height)
+        max_lines = max(max_lines, text_metrics(str(value))[1])
+    return lines_to_height(max_lines, font_size, min_height, line_height_factor)
+
+
+# 出力エンジン
+#   openpyxl:   ワークブック全体をメモリ上に構築してから保存する（テンプレート使用時はこちら）
+#   write_only: openpyxlの書き込み専用モードで1行ずつ書き出す（新規ファイル作成時のみ）
+#   raw:        openpyxlのワークブックを使わずに、シートのXMLを1行ずつzipファイルへ書き出す（新規ファイル作成時のみ）
+ENGINES = ("openpyxl", "write_only", "raw")
+
+
+class ExcelWriteError(ValueError):
+    """テスト仕様書やテンプレートの内容ではなく、エクセルファイルの書き込み処理で予期せず失敗した場合に送出する例外"""
+
+# ワークブックに登録される書式のコレクション（フォント・塗りつぶし・配置・枠線）
+_STYLE_COLLECTIONS = ("_fonts", "_fills", "_alignments", "_borders")
+
+
+def _style_count(workbook) -> int:
+    """ワークブックに登録済みの書式の数を返します。"""
+    return sum(len(getattr(workbook, collection)) for collection in _STYLE_COLLECTIONS)
+
+
+def _save_workbook(workbook, output_path: Path | BinaryIO, style_count: int):
+    """ワークブックを保存します。計測中であれば追加した書式の数と保存したファイルのサイズを記録します。
+
+    Args:
+        workbook:           openpyxlのワークブックオブジェクト
+        output_path (Path): 出力先のパス、または書き込み先のストリーム（シーク可能なもの）
+        style_count (int):  書き込み前にワークブックに登録されていた書式の数
+    """
+    instrument.count("style_objects", _style_count(workbook) - style_count)
+    is_stream = hasattr(output_path, "write")
+    start = output_path.tell() if is_stream else 0
+    with instrument.phase("save"):
+        workbook.save(output_path)
+    if instrument.current() is not None:
+        instrument.count("bytes_saved", output_path.tell() - start if is_stream else output_path.stat().st_size)
+
+
+@contextlib.contextmanager
+def _replace_on_success(output_path: Path | BinaryIO):
+    """出力先の代わりに書き込む一時ファイルを返し、with 文が正常に終了した場合のみ出力先に反映します。
+
+    Args:
+        output_path (Path): 出力先のパス、または書き込み先のストリーム
+
+    Notes:
+        - 書き込みの途中で失敗した場合は壊れたファイルを残さず、既存の出力先のファイルも変更しない
+        - 出力先がパスの場合は同じディレクトリの一時ファイルを os.replace で置き換え、ストリームの場合は一時ファイルの内容を書き込む
+    """
+    if hasattr(output_path, "write"):
+        with tempfile.TemporaryFile() as temp:
+            yield temp
+            temp.seek(0)
+            shutil.copyfileobj(temp, output_path)
+        return
+
+    temp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp_path, "wb") as temp:
+            yield temp
+        os.replace(temp_path, output_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
 
 
 class ExcelWriter:
 
-    def __init__(self, df: pd.DataFrame, config_excel: Config):
-        self.df = df.copy()
+    def __init__(self, records: RecordStore | pd.DataFrame | None, config_excel: Config):
+        """テスト仕様書をエクセルファイルに書き込むクラス
+
+        Args:
+            records (RecordStore):  解析結果のテストケース。DataFrameを渡した場合は列の先頭から順に対応付ける。
+                                    書き込むテストケースを bind で後から渡す場合はNone
+            config_excel (Config):  設定情報
+
+        Notes:
+            - 列のレイアウトとスタイルの組み立ては生成時に一度だけ行う。複数のテスト仕様書を書き込む場合は、
+              1つのインスタンスから bind でテスト仕様書ごとのインスタンスを作成する（複数のスレッドから同時に使用できる）
+        """
         self.config = config_excel
+        # データはコピーせずに参照する
+        self.records = self._as_records(records)
+
+        # 列のレイアウトとスタイルはここで一度だけ組み立て、全ての書き込み処理で共有する
+        self.layout = LayoutPlan(self.config)
+        self.columns = self.layout.column_names
+        self.col_names = [column.letter for column in self.layout.columns]
+        # 直近の差分更新の結果（差分更新を行っていない場合はNone）
+        self.upsert_result: UpsertResult | None = None
+
+    @staticmethod
+    def _as_records(records: RecordStore | pd.DataFrame | None) -> RecordStore | None:
+        if records is None or isinstance(records, RecordStore):
+            return records
+        return RecordStore.from_dataframe(records)
+
+    def bind(self, records: RecordStore | pd.DataFrame) -> ExcelWriter:
+        """列のレイアウトとスタイルを共有したまま、テストケースを書き込むインスタンスを作成します。
+
+        Args:
+            records (RecordStore):  書き込むテストケース
 
-        self.columns = load_column_names(self.config)
-        self.col_names = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"[:len(self.columns)]
-        if len(self.col_names) < len(self.columns):
-            raise IndexError("列は26列以下にしてください")
+        Returns:
+            ExcelWriter: records を書き込むインスタンス（差分更新の結果 upsert_result はインスタンスごとに持つ）
+        """
+        writer = copy(self)
+        writer.records = self._as_records(records)
+        writer.upsert_result = None
+        return writer
+
+    def measure(self) -> SheetMetrics:
+        """解析結果から列幅と行高を一度の走査で計算します（ワークシートのセルは読み直さない）。"""
+        return measure_records(self.records.columns, self.columns)
+
+    def plan_merges(self) -> list[MergeRange]:
+        """解析結果からマージ範囲を求めます（ワークシートのセルは読み直さない）。"""
+        return plan_merges(self.records.columns, self.layout.multi_idx_columns)
 
     def __write_test_specification_sheet(self,
                                          workbook,
@@ -147,7 +190,8 @@ class ExcelWriter:
                                          auto_adjust_width: bool = True,
                                          auto_adjust_height: bool = True,
                                          preserve_additional_columns: bool = False,
-                                         test_type: str = "test"  # デフォルトは "test" (テスト仕様書)
+                                         test_type: str = "test",  # デフォルトは "test" (テスト仕様書)
+                                         upsert: bool = False
                                          ):
         """テスト仕様書をエクセルシートに書き込みます。
 
@@ -159,331 +203,447 @@ class ExcelWriter:
             auto_adjust_height (bool): 行高を内容に合わせて自動調整するかどうか
             preserve_additional_columns (bool): J列以降の内容を保持するかどうか
             test_type (str):       テストの種別 ("test", "ut", "it")
+            upsert (bool):         既存のデータ行を識別キーで対応付け、差分のみ更新するかどうか（テンプレート使用時のみ有効）
         """
-        df_excel = self.df.copy()
-        df_excel.columns = self.columns
+
+        records = self.records
+        layout = self.layout
+        styles = layout.bind(workbook)
+        font_name = layout.font_name
 
         # マージできるようにマルチインデックス化
         multi_idx_cols = []
         if merge_cells:
-            multi_idx_cols = [v["name"] for k, v in self.config.columns.model_dump().items() if v.get("multi_idx")]
-            if multi_idx_cols:
-                # マージセルを使うが、NOをA列に確実に表示するため別の方法でマージする
-                pass
-            else:
+            multi_idx_cols = layout.multi_idx_columns
+            if not multi_idx_cols:
                 merge_cells = False  # マージ対象の列がなければマージを無効化
 
         # シート名を決定
-        if test_type == "ut":
-            sheet_name = self.config.excel_settings.sheet_name.ut
-        elif test_type == "it":
-            sheet_name = self.config.excel_settings.sheet_name.it
-        else:
-            sheet_name = self.config.excel_settings.sheet_name.test
+        sheet_name = self._sheet_name(test_type)
 
         # シート取得
         worksheet = workbook[sheet_name] if template_used and sheet_name in workbook.sheetnames else workbook.create_sheet(sheet_name)
 
         # テンプレートを使用している場合、既存のシートにデータを追加する
         if template_used:
-            # 既存データの最終行を取得 (ヘッダー行を考慮)
-            last_row = 1
-            for row in worksheet.iter_rows():
-                if row[0].value is not None:
-                    last_row += 1
-                else:
-                    break
-            
-            # J列以降のデータを保存する（オプションが有効な場合）
-            additional_columns_data = {}
-            if preserve_additional_columns:
-                # J列から右側のデータを一時保存 (通常、columnのインデックスは0から始まるため、J列はインデックス9)
-                start_col_idx = 9  # J列
-                for row_idx in range(2, last_row):  # 2行目から最終行まで（ヘッダー行はスキップ）
-                    row_data = {}
-                    # 行に一意の識別子を付ける（A列の値）
-                    row_id = worksheet["A" + str(row_idx)].value
-                    if row_id is not None:
-                        for col_idx in range(start_col_idx, worksheet.max_column + 1):
-                            col_letter = get_column_letter(col_idx + 1)
-                            cell_value = worksheet[col_letter + str(row_idx)].value
-                            row_data[col_idx] = cell_value
-                        additional_columns_data[row_id] = row_data
-            
-            # データフレームの内容をシートに書き込む (ヘッダー行はスキップ)
-            for i, row in enumerate(df_excel.itertuples(index=False)):
-                # 行の高さを自動調整
-                if auto_adjust_height:
-                    row_height = estimate_row_height(row, self.config.excel_settings.font_name)
-                    worksheet.row_dimensions[last_row + i].height = row_height
-                
-                for j, value in enumerate(row):
-                    col_letter = get_column_letter(j+1)  # 1-indexed
-                    cell = worksheet[f"{col_letter}{last_row + i}"]
-                    cell.value = value
-                    
-                    # スタイル適用
-                    apply_cell_style(
-                        cell,
-                        font=Font(name=self.config.excel_settings.font_name),
-                        alignment=Alignment(
-                            horizontal=self.config.columns.model_dump()[list(self.config.columns.model_dump().keys())[j]]["horizontal"], 
-                            vertical=self.config.columns.model_dump()[list(self.config.columns.model_dump().keys())[j]]["vertical"], 
-                            wrap_text=True
-                        ),
-                        border=Border(left=Side(style="thin"), right=Side(style="thin"),
-                                    top=Side(style="thin"), bottom=Side(style="thin"))
-                    )
-                
-                # J列以降のデータを復元（オプションが有効な場合）
-                if preserve_additional_columns:
-                    row_id = row[0]  # A列（NOカラム）の値
-                    if row_id in additional_columns_data:
-                        for col_idx, cell_value in additional_columns_data[row_id].items():
-                            col_letter = get_column_letter(col_idx + 1)
-                            cell = worksheet[f"{col_letter}{last_row + i}"]
-                            if cell_value is not None:  # None以外の値のみ設定
-                                cell.value = cell_value
-            
-            # G列からM列まで（試験実施者から再試験結果備考まで）の枠線を追加
-            for row_idx in range(last_row, last_row + len(df_excel)):
-                for col_idx in range(7, 14):  # G列(7)からM列(13)まで
-                    col_letter = get_column_letter(col_idx)
-                    cell = worksheet[f"{col_letter}{row_idx}"]
-                    # スタイルのみ適用（枠線と文字の折り返し）
-                    apply_cell_style(
-                        cell,
-                        font=Font(name=self.config.excel_settings.font_name),
-                        alignment=Alignment(vertical="center", horizontal="center", wrap_text=True),
-                        border=Border(left=Side(style="thin"), right=Side(style="thin"),
-                                    top=Side(style="thin"), bottom=Side(style="thin"))
-                    )
-                    
-                # J列以降の追加列の枠線も適用（読み込んだデータに基づく）
-                if preserve_additional_columns and worksheet.max_column > 13:
-                    for col_idx in range(14, worksheet.max_column + 1):
-                        col_letter = get_column_letter(col_idx)
-                        cell = worksheet[f"{col_letter}{row_idx}"]
-                        # スタイルのみ適用（枠線と文字の折り返し）
-                        apply_cell_style(
-                            cell,
-                            font=Font(name=self.config.excel_settings.font_name),
-                            alignment=Alignment(vertical="center", horizontal="center", wrap_text=True),
-                            border=Border(left=Side(style="thin"), right=Side(style="thin"),
-                                        top=Side(style="thin"), bottom=Side(style="thin"))
-                        )
+            # 既存データの最終行とJ列以降のデータ（オプションが有効な場合）をまとめて読み取る
+            # 差分更新の場合は行ごと移動するため、J列以降のデータは読み取らない
+            snapshot = TemplateSnapshot.read(worksheet, preserve_additional_columns and not upsert)
+            first_row = snapshot.last_row
         else:
             # 新規シートにデータを書き込む
-            # ヘッダーを書き込む
-            for j, col_name in enumerate(self.columns):
-                col_letter = get_column_letter(j+1)  # 1-indexed
-                cell = worksheet[f"{col_letter}1"]
-                cell.value = col_name
-                
-                # ヘッダースタイル適用
-                apply_cell_style(
-                    cell,
-                    font=Font(name=self.config.excel_settings.font_name, bold=True, color="ffffff"),
-                    fill=PatternFill(patternType="solid", fgColor="4f81bd"),
-                    alignment=Alignment(vertical="center", horizontal="center", wrap_text=True),
-                )
+            # ヘッダーを書き込む（テンプレート列のヘッダー（G列からM列）も同様に設定）
+            for column in layout.columns + layout.additional_columns:
+                cell = worksheet.cell(row=1, column=column.index, value=column.name)
+                styles.header.apply(cell)
                 
                 # デフォルトの列幅を設定
-                worksheet.column_dimensions[col_letter].width = self.config.columns.model_dump()[list(self.config.columns.model_dump().keys())[j]]["length"]
-            
-            # テンプレート列のヘッダー（G列からM列）も同様に設定
-            additional_headers = ['試験\n実施者', '試験日', '試験\nステータス', '試験結果備考', '再試験\n実施者', '再試験\nステータス', '再試験結果備考']
-            for j, header in enumerate(additional_headers, 7):  # G列(7)から始める
-                col_letter = get_column_letter(j)
-                cell = worksheet[f"{col_letter}1"]
-                cell.value = header
-                
-                # ヘッダースタイル適用
-                apply_cell_style(
-                    cell,
-                    font=Font(name=self.config.excel_settings.font_name, bold=True, color="ffffff"),
-                    fill=PatternFill(patternType="solid", fgColor="4f81bd"),
-                    alignment=Alignment(vertical="center", horizontal="center", wrap_text=True),
-                )
-                
-                # デフォルトの列幅を設定（標準的な幅を適用）
-                worksheet.column_dimensions[col_letter].width = 15
-            
+                worksheet.column_dimensions[column.letter].width = column.width
+            first_row = 2
+            upsert = False
+
+        # 列幅・行高は書き込む値（解析結果）からまとめて計算する
+        metrics = None
+        if auto_adjust_width or auto_adjust_height:
+            with instrument.phase("measure"):
+                metrics = self.measure()
+
+        # G列からM列まで（試験実施者から再試験結果備考まで）の枠線の範囲
+        # テンプレート使用時はJ列以降の追加列の枠線も適用（読み込んだデータに基づく）
+        last_col_idx = 13  # M列
+        if template_used and preserve_additional_columns and snapshot.max_column > 13:
+            last_col_idx = snapshot.max_column
+
+        if upsert:
+            # 既存の行との差分のみ書き換える（試験結果の列は行ごと移動する）
+            merge_ranges = self.plan_merges() if merge_cells else []
+            instrument.count("merge_ranges", len(merge_ranges))
+            self.upsert_result = upsert_sheet(worksheet, records, layout, styles, merge_ranges,
+                                              snapshot.last_row, last_col_idx,
+                                              metrics if auto_adjust_height else None)
+            rows_written = self.upsert_result.updated + self.upsert_result.inserted
+            instrument.count("rows_written", rows_written)
+            instrument.count("cells_written", rows_written * len(layout.columns))
+        else:
             # データを書き込む
-            for i, row in enumerate(df_excel.itertuples(index=False)):
+            body_styles = list(zip(layout.columns, styles.body))
+            for i, row in enumerate(records):
+                row_idx = first_row + i
                 # 行の高さを自動調整
                 if auto_adjust_height:
-                    row_height = estimate_row_height(row, self.config.excel_settings.font_name)
-                    worksheet.row_dimensions[i + 2].height = row_height
-                
-                for j, value in enumerate(row):
-                    col_letter = get_column_letter(j+1)  # 1-indexed
-                    cell = worksheet[f"{col_letter}{i + 2}"]
+                    worksheet.row_dimensions[row_idx].height = metrics.row_heights[i]
+            
+                for (column, style), value in zip(body_styles, row):
+                    cell = worksheet.cell(row=row_idx, column=column.index)
                     cell.value = value
-                    
                     # スタイル適用
-                    apply_cell_style(
-                        cell,
-                        font=Font(name=self.config.excel_settings.font_name),
-                        alignment=Alignment(
-                            horizontal=self.config.columns.model_dump()[list(self.config.columns.model_dump().keys())[j]]["horizontal"], 
-                            vertical=self.config.columns.model_dump()[list(self.config.columns.model_dump().keys())[j]]["vertical"], 
-                            wrap_text=True
-                        ),
-                        border=Border(left=Side(style="thin"), right=Side(style="thin"),
-                                    top=Side(style="thin"), bottom=Side(style="thin"))
-                    )
+                    style.apply(cell)
             
+                # J列以降のデータを復元（オプションが有効な場合）
+                if template_used and preserve_additional_columns:
+                    row_data = snapshot.additional.get(row[0])  # A列（NOカラム）の値で引く
+                    if row_data:
+                        for col_idx, cell_value in row_data.items():
+                            worksheet.cell(row=row_idx, column=col_idx, value=cell_value)
+
             # G列からM列まで（試験実施者から再試験結果備考まで）の枠線を追加
-            for row_idx in range(2, 2 + len(df_excel)):
-                for col_idx in range(7, 14):  # G列(7)からM列(13)まで
-                    col_letter = get_column_letter(col_idx)
-                    cell = worksheet[f"{col_letter}{row_idx}"]
+            for row_idx in range(first_row, first_row + len(records)):
+                for col_idx in range(7, last_col_idx + 1):  # G列(7)から
                     # スタイルのみ適用（枠線と文字の折り返し）
-                    apply_cell_style(
-                        cell,
-                        font=Font(name=self.config.excel_settings.font_name),
-                        alignment=Alignment(vertical="center", horizontal="center", wrap_text=True),
-                        border=Border(left=Side(style="thin"), right=Side(style="thin"),
-                                    top=Side(style="thin"), bottom=Side(style="thin"))
-                    )
+                    styles.additional.apply(worksheet.cell(row=row_idx, column=col_idx))
+
+            instrument.count("rows_written", len(records))
+            instrument.count("cells_written", len(records) * (len(layout.columns) + max(last_col_idx - 6, 0))
+                             + (0 if template_used else len(layout.columns) + len(layout.additional_columns)))
         
         # 列幅の自動調整（オプションが有効な場合）
         if auto_adjust_width:
-            # 各列ごとに最適な幅を計算
-            for j, col_name in enumerate(self.columns):
-                col_letter = get_column_letter(j+1)  # 1-indexed
-                col_config = self.config.columns.model_dump()[list(self.config.columns.model_dump().keys())[j]]
-                
-                # この列の最大幅を計算（ヘッダーも含む）
-                max_width = estimate_column_width(col_name, self.config.excel_settings.font_name)
-                
-                # データ行をチェック
-                start_row = 2
-                end_row = len(df_excel) + (1 if not template_used else last_row - 1)
-                
-                for row in range(start_row, end_row + 1):
-                    actual_row = row if not template_used else row + last_row - 2
-                    cell_value = worksheet[f"{col_letter}{actual_row}"].value
-                    if cell_value:
-                        estimated_width = estimate_column_width(cell_value, self.config.excel_settings.font_name)
-                        max_width = max(max_width, estimated_width)
-                
-                # 計算した最大幅を設定（configで指定された幅よりも大きい場合のみ）
-                default_width = col_config["length"]
-                worksheet.column_dimensions[col_letter].width = max(default_width, max_width)
+            # 各列ごとに最適な幅を設定（configで指定された幅よりも大きい場合のみ）
+            for column, max_width in zip(layout.columns, metrics.column_widths):
+                worksheet.column_dimensions[column.letter].width = max(column.width, max_width)
             
             # G列からM列の幅も自動調整
-            for col_idx in range(7, 14):  # G列(7)からM列(13)まで
-                col_letter = get_column_letter(col_idx)
+            for column in layout.additional_columns:
                 # ヘッダーの幅を計算
-                header_cell = worksheet[f"{col_letter}1"]
-                max_width = estimate_column_width(header_cell.value, self.config.excel_settings.font_name)
+                header_cell = worksheet.cell(row=1, column=column.index)
+                max_width = estimate_column_width(header_cell.value, font_name)
                 
                 # デフォルト幅を設定（少なくとも12以上）
-                worksheet.column_dimensions[col_letter].width = max(12, max_width)
+                worksheet.column_dimensions[column.letter].width = max(12, max_width)
                 
         # マージセルの処理（テンプレート使用の有無にかかわらず適用）
-        if merge_cells and multi_idx_cols:
-            # マージ対象の列のインデックスを取得
-            merge_col_indices = [self.columns.index(col) for col in multi_idx_cols]
-            
-            # 各マージ対象列に対して処理
-            for col_idx in merge_col_indices:
-                col_letter = get_column_letter(col_idx+1)  # 1-indexed
-                
-                # マージするセルの範囲を決定
-                current_value = None
-                start_row = 2 if not template_used else last_row  # データの開始行
-                
-                # 処理対象の行数
-                row_count = len(df_excel)
-                
-                for i in range(row_count):
-                    # 実際のExcel行番号
-                    row = i + (2 if not template_used else last_row)
-                    cell_value = worksheet[f"{col_letter}{row}"].value
-                    
-                    # 値が変わったか、最後の行の場合
-                    if cell_value != current_value or i == row_count - 1:
-                        # 前のグループがあればマージ
-                        if current_value is not None and row - start_row > 1:
-                            # 最後の行の場合は現在の行も含める
-                            end_row = row if cell_value != current_value else row + 1
-                            worksheet.merge_cells(f"{col_letter}{start_row}:{col_letter}{end_row-1}")
-                        
-                        # 新しいグループの開始
-                        current_value = cell_value
-                        start_row = row
+        if merge_cells and multi_idx_cols and not upsert:
+            with instrument.phase("merge"):
+                merge_ranges = self.plan_merges()
+                apply_merges(worksheet, merge_ranges, first_row)
+            instrument.count("merge_ranges", len(merge_ranges))
+
+    def _column_widths(self, auto_adjust_width: bool, metrics: SheetMetrics | None) -> list[tuple[ColumnLayout, float]]:
+        """新規シートの列幅を、解析結果から列の順に求めます（G列からM列を含む）。
+
+        Args:
+            auto_adjust_width (bool):   列幅を内容に合わせて自動調整するかどうか
+            metrics (SheetMetrics):     解析結果から計算した列幅と行高（自動調整しない場合はNone）
+        """
+        font_name = self.layout.font_name
+        widths = []
+        for j, column in enumerate(self.layout.columns):
+            widths.append((column, max(column.width, metrics.column_widths[j]) if auto_adjust_width else column.width))
+        for column in self.layout.additional_columns:
+            width = max(12, estimate_column_width(column.name, font_name)) if auto_adjust_width else column.width
+            widths.append((column, width))
+        return widths
+
+    @staticmethod
+    def _merged_cells(merge_ranges: list[MergeRange], first_row: int) -> dict[tuple[int, int], bool]:
+        """マージ範囲のうち、先頭以外の（値を書き込まない）セルを返します。
+
+        Returns:
+            dict: (行, 列) -> 結合範囲の最終行かどうか
+        """
+        merged_cells = {}
+        for merge_range in merge_ranges:
+            for i in range(merge_range.start + 1, merge_range.end + 1):
+                merged_cells[(i + first_row, merge_range.column.index)] = i == merge_range.end
+        return merged_cells
+
+    def __write_test_specification_sheet_streaming(self,
+                                                   workbook,
+                                                   merge_cells: bool = False,
+                                                   auto_adjust_width: bool = True,
+                                                   auto_adjust_height: bool = True,
+                                                   test_type: str = "test"
+                                                   ):
+        """openpyxlの書き込み専用モードで、テスト仕様書を1行ずつ新規シートに書き込みます。
+
+        Args:
+            workbook:               書き込み専用モードのワークブックオブジェクト
+            merge_cells (bool):     セルをマージするかどうか
+            auto_adjust_width (bool): 列幅を内容に合わせて自動調整するかどうか
+            auto_adjust_height (bool): 行高を内容に合わせて自動調整するかどうか
+            test_type (str):       テストの種別 ("test", "ut", "it")
+
+        Notes:
+            - 列幅とマージ範囲は行の書き込み前に確定させる必要があるため、シートではなく解析結果から計算する
+            - 書き込み済みの行の情報は保持しないため、行数が増えてもメモリ使用量はほぼ一定
+        """
+        from openpyxl.cell import WriteOnlyCell
+
+        records = self.records
+        layout = self.layout
+        worksheet = workbook.create_sheet(self._sheet_name(test_type))
+        styles = layout.bind(workbook)
+
+        metrics = None
+        if auto_adjust_width or auto_adjust_height:
+            with instrument.phase("measure"):
+                metrics = self.measure()
+
+        # 列幅を設定（行を書き込む前に設定する必要がある）
+        for column, width in self._column_widths(auto_adjust_width, metrics):
+            worksheet.column_dimensions[column.letter].width = width
+
+        # マージ範囲を計算（結合されるセルは値を書き込まない）
+        merged_cells = {}  # (行, 列) -> 結合範囲の最終行かどうか
+        if merge_cells:
+            with instrument.phase("merge"):
+                merge_ranges = self.plan_merges()
+                for merge_range in merge_ranges:
+                    worksheet.merged_cells.add(merge_range.coord(2))
+                merged_cells = self._merged_cells(merge_ranges, 2)
+            instrument.count("merge_ranges", len(merge_ranges))
+
+        def styled_cell(style, value=None):
+            cell = WriteOnlyCell(worksheet, value=value)
+            style.apply(cell)
+            return cell
+
+        # ヘッダーを書き込む
+        worksheet.append([styled_cell(styles.header, column.name)
+                          for column in layout.columns + layout.additional_columns])
+
+        # データを1行ずつ書き込む
+        for i, row in enumerate(records):
+            row_idx = i + 2
+            # 行の高さは行を書き込む前に設定する
+            if auto_adjust_height:
+                worksheet.row_dimensions[row_idx].height = metrics.row_heights[i]
+
+            cells = []
+            for j, value in enumerate(row):
+                is_last = merged_cells.get((row_idx, j + 1))
+                if is_last is None:
+                    cells.append(styled_cell(styles.body[j], value))
+                else:
+                    cells.append(styled_cell(styles.merged_last if is_last else styles.merged))
+
+            # G列からM列まで（試験実施者から再試験結果備考まで）の枠線を追加
+            cells.extend(styled_cell(styles.additional) for _ in layout.additional_columns)
+
+            worksheet.append(cells)
+            # 書き込み済みの行の情報は不要なので破棄する
+            worksheet.row_dimensions.pop(row_idx, None)
+
+        columns = len(layout.columns) + len(layout.additional_columns)
+        instrument.count("rows_written", len(records))
+        instrument.count("cells_written", (len(records) + 1) * columns)
+
+    def __write_test_specification_sheet_raw(self,
+                                             book: SpreadsheetMLWriter,
+                                             merge_cells: bool = False,
+                                             auto_adjust_width: bool = True,
+                                             auto_adjust_height: bool = True,
+                                             test_type: str = "test"
+                                             ):
+        """openpyxlのワークブックを使わずに、テスト仕様書のシートのXMLを1行ずつ書き込みます。
+
+        Args:
+            book (SpreadsheetMLWriter): 書き込み先のワークブック
+            merge_cells (bool):     セルをマージするかどうか
+            auto_adjust_width (bool): 列幅を内容に合わせて自動調整するかどうか
+            auto_adjust_height (bool): 行高を内容に合わせて自動調整するかどうか
+            test_type (str):       テストの種別 ("test", "ut", "it")
+
+        Notes:
+            - 列幅・マージ範囲・スタイルは write_only と同じものを使うため、出力されるシートのレイアウトは同じになる
+        """
+        records = self.records
+        layout = self.layout
+        plan_styles = [layout.header_style, layout.additional_style, layout.merged_style, layout.merged_last_style]
+        header, additional, merged, merged_last = (book.style(style) for style in plan_styles)
+        body = [book.style(column.style) for column in layout.columns]
+
+        metrics = None
+        if auto_adjust_width or auto_adjust_height:
+            with instrument.phase("measure"):
+                metrics = self.measure()
+
+        merge_ranges = []
+        merged_cells = {}  # (行, 列) -> 結合範囲の最終行かどうか
+        if merge_cells:
+            with instrument.phase("merge"):
+                merge_ranges = self.plan_merges()
+                merged_cells = self._merged_cells(merge_ranges, 2)
+            instrument.count("merge_ranges", len(merge_ranges))
+
+        all_columns = layout.columns + layout.additional_columns
+        column_widths = [(column.letter, column.index, width)
+                         for column, width in self._column_widths(auto_adjust_width, metrics)]
+        dimension = f"A1:{all_columns[-1].letter}{len(records) + 1}"
+        with book.sheet(self._sheet_name(test_type), column_widths,
+                        [merge_range.coord(2) for merge_range in merge_ranges], dimension) as sheet:
+            # ヘッダーを書き込む
+            sheet.write_row(1, [(header, column.name) for column in all_columns])
+
+            # G列からM列まで（試験実施者から再試験結果備考まで）は枠線のみ
+            additional_cells = [(additional, None)] * len(layout.additional_columns)
+            for i, row in enumerate(records):
+                row_idx = i + 2
+                cells = []
+                for j, value in enumerate(row):
+                    is_last = merged_cells.get((row_idx, j + 1))
+                    if is_last is None:
+                        cells.append((body[j], value))
+                    else:
+                        cells.append((merged_last if is_last else merged, None))
+                cells.extend(additional_cells)
+                sheet.write_row(row_idx, cells, metrics.row_heights[i] if auto_adjust_height else None)
+
+        instrument.count("rows_written", len(records))
+        instrument.count("cells_written", (len(records) + 1) * len(all_columns))
+
+    def _sheet_name(self, test_type: str) -> str:
+        """テストの種別 ("test", "ut", "it") から出力先のシート名を返します。"""
+        if test_type == "ut":
+            return self.config.excel_settings.sheet_name.ut
+        elif test_type == "it":
+            return self.config.excel_settings.sheet_name.it
+        return self.config.excel_settings.sheet_name.test
 
     def __call__(self, output_path: Path, merge_cells: bool = True, template_path: Path = None, 
                 auto_adjust_width: bool = True, auto_adjust_height: bool = True, preserve_additional_columns: bool = False,
-                test_type: str = "test"):
+                test_type: str = "test", engine: str = "openpyxl", upsert: bool = False):
         """
-        convert_md_to_df()により生成されたデータフレームをエクセルファイルに変換します。
+        MarkdownTestParserにより解析したテストケースをエクセルファイルに変換します。
 
         Args:
             output_path (Path):        出力先のパス
             merge_cells (bool):        セルをマージするかどうか
-            template_path (Path):      テンプレートとして使用するExcelファイルのパス。指定された場合はテンプレートをコピーして使用
+            template_path (Path):      テンプレートとして使用するExcelファイルのパス。指定された場合は読み込み済みのテンプレートの複製に書き込む
             auto_adjust_width (bool):  列幅を内容に合わせて自動調整するかどうか
             auto_adjust_height (bool): 行高を内容に合わせて自動調整するかどうか
             preserve_additional_columns (bool): J列以降の内容を保持するかどうか（テンプレート使用時のみ有効）
             test_type (str):          テストの種別 ("test", "unit_test", "integration_test")
+            engine (str):             新規ファイル作成時の出力エンジン ("openpyxl", "write_only", "raw")
+            upsert (bool):            既存のデータ行を大分類・中分類・小分類で対応付け、差分のみ更新するかどうか（テンプレート使用時のみ有効）
         """
+        return self.write_sheets(output_path, {test_type: self}, merge_cells=merge_cells, template_path=template_path,
+                                 auto_adjust_width=auto_adjust_width, auto_adjust_height=auto_adjust_height,
+                                 preserve_additional_columns=preserve_additional_columns,
+                                 engine=engine, upsert=upsert)
+
+    @staticmethod
+    def write_sheets(output_path: Path | BinaryIO, writers: dict[str, ExcelWriter], merge_cells: bool = True,
+                     template_path: Path = None, auto_adjust_width: bool = True, auto_adjust_height: bool = True,
+                     preserve_additional_columns: bool = False, engine: str = "openpyxl", upsert: bool = False,
+                     template_workbook=None):
+        """
+        複数のテスト種別のシートを、ワークブックの読み込みと保存を1回ずつで書き込みます。
+
+        Args:
+            output_path (Path):        出力先のパス、または書き込み先のストリーム（io.BytesIO など、シーク可能なもの）
+            writers (dict):            テストの種別 ("test", "ut", "it") -> そのシートに書き込むExcelWriter。この順にシートを書き込む
+            merge_cells (bool):        セルをマージするかどうか
+            template_path (Path):      テンプレートとして使用するExcelファイルのパス。指定された場合は読み込み済みのテンプレートの複製に書き込む
+            auto_adjust_width (bool):  列幅を内容に合わせて自動調整するかどうか
+            auto_adjust_height (bool): 行高を内容に合わせて自動調整するかどうか
+            preserve_additional_columns (bool): J列以降の内容を保持するかどうか（テンプレート使用時のみ有効）
+            engine (str):             新規ファイル作成時の出力エンジン ("openpyxl", "write_only", "raw")
+            upsert (bool):            既存のデータ行を大分類・中分類・小分類で対応付け、差分のみ更新するかどうか（テンプレート使用時のみ有効）
+            template_workbook:         テンプレートとして使用する読み込み済みのワークブック（template_path より優先し、直接書き込む）
+
+        Returns:
+            Path: 出力先のパス（ストリームの場合はそのストリーム）
+
+        Raises:
+            ValueError:       書き込めない文字を含むなど、テスト仕様書やテンプレートの内容によって書き込めない場合
+            ExcelWriteError:  それ以外の予期しないエラーの場合（ValueError の派生クラス）
+        """
+        from openpyxl import Workbook, load_workbook
+        from openpyxl.utils.exceptions import IllegalCharacterError
+
+        if engine not in ENGINES:
+            raise ValueError(f"出力エンジンは {', '.join(ENGINES)} のいずれかを指定してください: {engine}")
+
         try:
             # テンプレートが指定されている場合
-            if template_path and template_path.exists():
+            if template_workbook is not None or (template_path and template_path.exists()):
                 # テンプレートファイルと出力先が同じ場合は直接編集
-                if template_path == output_path:
-                    workbook = load_workbook(template_path)
-                else:
-                    # テンプレートファイルをコピー
-                    shutil.copy2(template_path, output_path)
-                    # コピーしたファイルを開く
-                    workbook = load_workbook(output_path)
-                
-                # シートが存在することを確認
-                if test_type == "ut":
-                    sheet_name = self.config.excel_settings.sheet_name.ut
-                elif test_type == "it":
-                    sheet_name = self.config.excel_settings.sheet_name.it
-                else:
-                    sheet_name = self.config.excel_settings.sheet_name.test
+                with instrument.phase("load"):
+                    if template_workbook is not None:
+                        workbook = template_workbook
+                    elif template_path == output_path:
+                        workbook = load_workbook(template_path)
+                    else:
+                        # テンプレートファイルは残したまま、読み込み済みのテンプレートの複製に書き込む
+                        workbook = template_cache.load(template_path)
+                style_count = _style_count(workbook)
                 
-                # 指定されたシートが存在しない場合は作成
-                if sheet_name not in workbook.sheetnames:
-                    workbook.create_sheet(sheet_name)
-                
-                # テンプレートのシートにデータを書き込む
-                self.__write_test_specification_sheet(workbook, merge_cells, template_used=True, 
-                                                     auto_adjust_width=auto_adjust_width,
-                                                     auto_adjust_height=auto_adjust_height,
-                                                     preserve_additional_columns=preserve_additional_columns,
-                                                     test_type=test_type)
+                for test_type, writer in writers.items():
+                    # 指定されたシートが存在しない場合は作成
+                    sheet_name = writer._sheet_name(test_type)
+                    if sheet_name not in workbook.sheetnames:
+                        workbook.create_sheet(sheet_name)
+                    
+                    # テンプレートのシートにデータを書き込む
+                    with instrument.phase("write"):
+                        writer.__write_test_specification_sheet(workbook, merge_cells, template_used=True, 
+                                                                auto_adjust_width=auto_adjust_width,
+                                                                auto_adjust_height=auto_adjust_height,
+                                                                preserve_additional_columns=preserve_additional_columns,
+                                                                test_type=test_type,
+                                                                upsert=upsert)
                 
                 # 変更を保存
-                workbook.save(output_path)
+                _save_workbook(workbook, output_path, style_count)
+            elif engine == "write_only":
+                # 書き込み専用モードで新規ファイルを作成
+                workbook = Workbook(write_only=True)
+                style_count = _style_count(workbook)
+                for test_type, writer in writers.items():
+                    with instrument.phase("write"):
+                        writer.__write_test_specification_sheet_streaming(workbook, merge_cells,
+                                                                          auto_adjust_width=auto_adjust_width,
+                                                                          auto_adjust_height=auto_adjust_height,
+                                                                          test_type=test_type)
+                _save_workbook(workbook, output_path, style_count)
+            elif engine == "raw":
+                # シートのXMLを直接書き出して新規ファイルを作成
+                # zipファイルは一時ファイルに書き出し、全てのシートを書き込めた場合のみ出力先に反映する
+                with _replace_on_success(output_path) as temp:
+                    book = SpreadsheetMLWriter(temp)
+                    try:
+                        for test_type, writer in writers.items():
+                            with instrument.phase("write"):
+                                writer.__write_test_specification_sheet_raw(book, merge_cells,
+                                                                            auto_adjust_width=auto_adjust_width,
+                                                                            auto_adjust_height=auto_adjust_height,
+                                                                            test_type=test_type)
+                    except BaseException:
+                        book.abort()
+                        raise
+                    with instrument.phase("save"):
+                        book.close()
+                    instrument.count("style_objects", book.style_count())
+                    instrument.count("bytes_saved", temp.tell())
             else:
                 # 新規ファイルを作成
-                workbook = load_workbook()
+                workbook = Workbook()
+                style_count = _style_count(workbook)
                 
                 # テスト仕様書シートを作成して書き込む
-                self.__write_test_specification_sheet(workbook, merge_cells, template_used=False, 
-                                                     auto_adjust_width=auto_adjust_width,
-                                                     auto_adjust_height=auto_adjust_height,
-                                                     preserve_additional_columns=False,  # 新規ファイルの場合はデータ保持は無意味
-                                                     test_type=test_type)
+                for test_type, writer in writers.items():
+                    with instrument.phase("write"):
+                        writer.__write_test_specification_sheet(workbook, merge_cells, template_used=False, 
+                                                                auto_adjust_width=auto_adjust_width,
+                                                                auto_adjust_height=auto_adjust_height,
+                                                                preserve_additional_columns=False,  # 新規ファイルの場合はデータ保持は無意味
+                                                                test_type=test_type)
                 
                 # 不要なSheetを削除して保存
                 if "Sheet" in workbook.sheetnames:
                     del workbook["Sheet"]
                 
-                workbook.save(output_path)
+                _save_workbook(workbook, output_path, style_count)
                     
         except PermissionError:
             raise PermissionError(f"出力先のファイルを開いている可能性があります。エクセルファイルを閉じてください。")
+        except IllegalCharacterError as e:
+            raise ValueError(f"エクセルファイルに書き込めない文字が含まれています: {e}") from e
+        except ValueError:
+            # テスト仕様書の内容による失敗は、原因が分かるようそのまま送出する
+            raise
         except Exception as e:
-            raise ValueError(f"エクセルファイル出力中に不明なエラーが発生しました：\n{e}")
+            raise ExcelWriteError(f"エクセルファイル出力中に不明なエラーが発生しました：\n{e}") from e
 
         return output_path
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import abc
+import contextlib
+import csv
+import io
+import json
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+from md_test_case_to_excel import instrument
+from md_test_case_to_excel.records import RecordStore
+
+# 出力形式（xlsx は ExcelWriter、それ以外はこのモジュールの TableWriter で書き出す）
+EXCEL_FORMAT = "xlsx"
+
+# 出力形式名 -> TableWriter のサブクラス（register_format で追加できる）
+_writers: dict[str, type[TableWriter]] = {}
+
+
+def register_format(name: str):
+    """TableWriter のサブクラスを出力形式 name として登録するデコレータ"""
+    def register(writer_class: type[TableWriter]) -> type[TableWriter]:
+        _writers[name] = writer_class
+        return writer_class
+    return register
+
+
+def table_formats() -> tuple[str, ...]:
+    """登録済みの表形式の出力形式の一覧を返します（xlsx は含まない）。"""
+    return tuple(_writers)
+
+
+def output_suffix(name: str) -> str:
+    """出力形式 name の出力ファイルの拡張子を返します。"""
+    return f".{EXCEL_FORMAT}" if name == EXCEL_FORMAT else _writers[name].suffix
+
+
+def get_writer(name: str, column_names: Iterable[str]) -> TableWriter:
+    """出力形式 name の TableWriter を作成します。
+
+    Args:
+        name (str):                 出力形式（csv, tsv, jsonl, parquet, feather など）
+        column_names (Iterable):    見出しの列名（config.yaml の列の name）
+    """
+    if name not in _writers:
+        raise ValueError(f"出力形式は {', '.join(_writers)} のいずれかを指定してください: {name}")
+    return _writers[name](column_names)
+
+
+@contextlib.contextmanager
+def _open_binary(output: str | Path | BinaryIO):
+    """出力先のパスまたはストリームを、書き込み用のバイナリストリームとして開きます（ストリームは閉じない）。"""
+    if hasattr(output, "write"):
+        yield output
+    else:
+        with open(output, "wb") as f:
+            yield f
+
+
+class TableWriter(abc.ABC):
+    """解析結果のテストケースを、openpyxlを使わずに表形式のファイルに書き出す出力形式の基底クラス
+
+    サブクラスは suffix を定義し、write_rows を実装します。列ごとに書き出す形式（streaming = False）は
+    write_records も実装し、write_rows では受け取った行を RecordStore に集めて write_records に渡します。
+    """
+
+    suffix = ""         # 出力ファイルの拡張子
+    streaming = True    # 行を受け取りながら書き出せるかどうか（False の場合は全ての行を RecordStore に集めてから書き出す）
+
+    def __init__(self, column_names: Iterable[str]):
+        self.column_names = list(column_names)
+
+    def write(self, rows: RecordStore | Iterable[tuple], output: str | Path | BinaryIO) -> int:
+        """テストケースを書き出します。
+
+        Args:
+            rows (Iterable):    RecordStore、または行データ（TestCaseRecord やタプル）のイテラブル。
+                                MarkdownTestParser.iter_records を渡すと、解析しながら書き出す
+            output (Path):      出力先のパス、またはバイナリのストリーム
+
+        Returns:
+            int: 書き出した行数
+        """
+        if not self.streaming and not isinstance(rows, RecordStore):
+            rows = RecordStore(rows)
+        with instrument.phase("write"), _open_binary(output) as stream:
+            start = stream.tell() if stream.seekable() else None
+            written = self.write_rows(rows, stream) if self.streaming else self.write_records(rows, stream)
+            if start is not None:
+                instrument.count("bytes_saved", stream.tell() - start)
+        instrument.count("rows_written", written)
+        instrument.count("cells_written", written * len(self.column_names))
+        return written
+
+    @abc.abstractmethod
+    def write_rows(self, rows: Iterable[tuple], stream: BinaryIO) -> int:
+        """行データを順に書き出し、書き出した行数を返します。"""
+
+    def write_records(self, records: RecordStore, stream: BinaryIO) -> int:
+        """RecordStore のテストケースを書き出し、書き出した行数を返します（既定では行を順に書き出す）。"""
+        return self.write_rows(records, stream)
+
+
+@contextlib.contextmanager
+def _text_stream(stream: BinaryIO) -> Iterator[io.TextIOWrapper]:
+    """バイナリのストリームにUTF-8で書き込むテキストのストリーム（終了時に切り離し、元のストリームは閉じない）"""
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="", write_through=False)
+    try:
+        yield text
+    finally:
+        text.flush()
+        text.detach()
+
+
+@register_format("csv")
+class CsvWriter(TableWriter):
+    """CSV（RFC 4180。改行を含むセルは引用符で囲む）"""
+
+    suffix = ".csv"
+    dialect = "excel"
+
+    def write_rows(self, rows: Iterable[tuple], stream: BinaryIO) -> int:
+        written = 0
+        with _text_stream(stream) as text:
+            writer = csv.writer(text, dialect=self.dialect)
+            writer.writerow(self.column_names)
+            for row in rows:
+                writer.writerow(row)
+                written += 1
+        return written
+
+
+@register_format("tsv")
+class TsvWriter(CsvWriter):
+    """TSV（タブ区切り。タブや改行を含むセルは引用符で囲む）"""
+
+    suffix = ".tsv"
+    dialect = "excel-tab"
+
+
+@register_format("jsonl")
+class JsonLinesWriter(TableWriter):
+    """JSON Lines（1行に1件のテストケースを列名をキーとするオブジェクトで出力する）"""
+
+    suffix = ".jsonl"
+
+    def write_rows(self, rows: Iterable[tuple], stream: BinaryIO) -> int:
+        written = 0
+        names = self.column_names
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        with _text_stream(stream) as text:
+            for row in rows:
+                text.write(encode(dict(zip(names, row))))
+                text.write("\n")
+                written += 1
+        return written
+
+
+class _ArrowWriter(TableWriter):
+    """pyarrow を使う列指向の出力形式（pyarrow がインストールされている場合のみ使用できる）"""
+
+    streaming = False
+
+    def _table(self, records: RecordStore):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError(f"{self.suffix[1:]} 形式で出力するには pyarrow が必要です（pip install pyarrow）") from None
+        # 列ごとのリストをそのまま文字列の列に変換する（行のタプルは作らない）
+        return pa.table([pa.array(column, type=pa.string()) for column in records.columns], names=self.column_names)
+
+    def write_rows(self, rows: Iterable[tuple], stream: BinaryIO) -> int:
+        return self.write_records(rows if isinstance(rows, RecordStore) else RecordStore(rows), stream)
+
+    def write_records(self, records: RecordStore, stream: BinaryIO) -> int:
+        table = self._table(records)
+        import pyarrow as pa
+
+        self._write_table(table, pa.PythonFile(stream, mode="w"))
+        return table.num_rows
+
+    @abc.abstractmethod
+    def _write_table(self, table, sink):
+        """pyarrow の Table を sink に書き出します。"""
+
+
+@register_format("parquet")
+class ParquetWriter(_ArrowWriter):
+    """Parquet"""
+
+    suffix = ".parquet"
+
+    def _write_table(self, table, sink):
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink)
+
+
+@register_format("feather")
+class FeatherWriter(_ArrowWriter):
+    """Feather（Arrow IPC ファイル）"""
+
+    suffix = ".feather"
+
+    def _write_table(self, table, sink):
+        import pyarrow.feather as feather
+
+        feather.write_feather(table, sink)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import time
+import tracemalloc
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Iterable
+
+# 計測中のレポート（計測していない場合はNone）。スレッドごと・非同期タスクごとに独立している
+_current: ContextVar[Report | None] = ContextVar("md2excel_report", default=None)
+
+# 計測していない場合に返す何もしないコンテキストマネージャ
+_NOT_RECORDING = contextlib.nullcontext()
+
+
+class Report:
+    """1回の変換の計測結果（処理ごとの所要時間とカウンター）"""
+
+    __slots__ = ("phases", "counters", "memory", "hooks", "parent", "_stack")
+
+    def __init__(self, hooks: Iterable[Callable[[str, str, float], None]] = ()):
+        """
+        Args:
+            hooks (Iterable):  計測のたびに呼び出す関数 hook(kind, name, value)。
+                               kind は "phase"（value は所要時間（秒））または "counter"（value は増分）
+        """
+        self.phases: dict[str, float] = {}   # 処理名 -> 所要時間（秒）。入れ子の処理の時間は含めない
+        self.counters: dict[str, int] = {}   # カウンター名 -> 値
+        self.memory: dict[str, int] = {}     # 処理名 -> 確保したまま残ったメモリ（バイト）。tracemalloc で追跡中の場合のみ
+        self.hooks = list(hooks)
+        self.parent: Report | None = None    # 外側で計測中のレポート（計測結果を合わせて加算する）
+        self._stack = []                     # 計測中の処理ごとの、入れ子の処理の [所要時間, メモリの増減] の合計
+
+    def add_hook(self, hook: Callable[[str, str, float], None]):
+        self.hooks.append(hook)
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """with ブロックの所要時間を処理 name の時間として加算します。
+
+        Notes:
+            - 入れ子になった処理の時間は外側の処理から差し引くため、処理ごとの時間の合計は全体の時間と一致する
+            - tracemalloc でメモリの確保を追跡している場合は、処理の前後のメモリ使用量の差も同様に記録する
+        """
+        tracing = tracemalloc.is_tracing()
+        memory_start = tracemalloc.get_traced_memory()[0] if tracing else 0
+        self._stack.append([0.0, 0])
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            allocated = tracemalloc.get_traced_memory()[0] - memory_start if tracing else None
+            nested_elapsed, nested_allocated = self._stack.pop()
+            if self._stack:
+                self._stack[-1][0] += elapsed
+                self._stack[-1][1] += allocated or 0
+            self._add_phase(name, elapsed - nested_elapsed,
+                            allocated - nested_allocated if allocated is not None else None)
+
+    def _add_phase(self, name: str, seconds: float, allocated: int | None):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        if allocated is not None:
+            self.memory[name] = self.memory.get(name, 0) + allocated
+        for hook in self.hooks:
+            hook("phase", name, seconds)
+        if self.parent is not None:
+            self.parent._add_phase(name, seconds, allocated)
+
+    def count(self, name: str, n: int = 1):
+        """カウンター name に n を加算します。"""
+        self.counters[name] = self.counters.get(name, 0) + n
+        for hook in self.hooks:
+            hook("counter", name, n)
+        if self.parent is not None:
+            self.parent.count(name, n)
+
+    def merge(self, other: Report | dict):
+        """他のレポート（または to_dict の結果）の時間とカウンターを加算します。フックは呼び出しません。"""
+        if isinstance(other, Report):
+            other = other.to_dict()
+        for name, seconds in other.get("phases", {}).items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        for name, n in other.get("counters", {}).items():
+            self.counters[name] = self.counters.get(name, 0) + n
+        for name, allocated in other.get("memory", {}).items():
+            self.memory[name] = self.memory.get(name, 0) + allocated
+
+    def to_dict(self) -> dict:
+        report = {"phases": dict(self.phases), "counters": dict(self.counters)}
+        if self.memory:
+            report["memory"] = dict(self.memory)
+        return report
+
+
+@contextlib.contextmanager
+def recording(report: Report | None = None):
+    """with ブロック内の変換処理をレポートに記録します。
+
+    Args:
+        report (Report):  記録先のレポート（省略時は新しく作成する）
+
+    Returns:
+        Report: 記録先のレポート（with ... as report で受け取る）
+
+    Notes:
+        - 既に計測中の場合は、記録した内容を外側のレポートにも加算する（--profile と --report-json の併用など）
+    """
+    report = report if report is not None else Report()
+    report.parent = _current.get()
+    token = _current.set(report)
+    try:
+        yield report
+    finally:
+        _current.reset(token)
+        report.parent = None
+
+
+def current() -> Report | None:
+    """計測中のレポートを返します。計測していない場合はNone。"""
+    return _current.get()
+
+
+def phase(name: str):
+    """計測中であれば with ブロックの所要時間を処理 name の時間として記録します。"""
+    report = _current.get()
+    return _NOT_RECORDING if report is None else report.phase(name)
+
+
+def count(name: str, n: int = 1):
+    """計測中であればカウンター name に n を加算します。"""
+    report = _current.get()
+    if report is not None:
+        report.count(name, n)
+
+
+def file_entry(file_path, output_path, status: str, elapsed: float, report: Report | dict,
+               error: str | None = None) -> dict:
+    """1ファイル分のレポートの項目を作成します。"""
+    entry = {"file": str(file_path), "output": str(output_path) if output_path else None,
+             "status": status, "elapsed": elapsed}
+    if error is not None:
+        entry["error"] = error
+    entry.update(report.to_dict() if isinstance(report, Report) else report)
+    return entry
+
+
+def summarize(files: list[dict], elapsed: float) -> dict:
+    """ファイルごとのレポートの項目を集計し、レポート全体を作成します。
+
+    Args:
+        files (list[dict]):  file_entry で作成した項目
+        elapsed (float):     全体の所要時間（秒）（並列に変換した場合はファイルごとの時間の合計より短い）
+
+    Returns:
+        dict: {"files": ファイルごとの項目, "totals": 状態ごとのファイル数・処理ごとの時間・カウンターの合計}
+    """
+    totals = Report()
+    status = {}
+    for entry in files:
+        totals.merge(entry)
+        status[entry["status"]] = status.get(entry["status"], 0) + 1
+    return {"files": files, "totals": {"files": len(files), "status": status, "elapsed": elapsed, **totals.to_dict()}}
+
+
+def write_report(path: str | Path, report: dict):
+    """レポートをJSONファイルに書き出します。"""
+    Path(path).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
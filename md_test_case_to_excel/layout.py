@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from copy import copy
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from md_test_case_to_excel.config_loader import Config
+
+# テンプレート列（G列からM列）のヘッダー
+ADDITIONAL_HEADERS = ['試験\n実施者', '試験日', '試験\nステータス', '試験結果備考', '再試験\n実施者', '再試験\nステータス', '再試験結果備考']
+# テンプレート列のデフォルトの列幅
+ADDITIONAL_COLUMN_WIDTH = 15
+
+# (スタイルの属性名, ワークブックのコレクション名, StyleArrayのキー)
+# openpyxl 3.1 の内部構造（Workbook._fonts などと Cell._style）に依存するため、setup.py で 3.1 系に固定している
+_STYLE_COLLECTIONS = (
+    ("font", "_fonts", "fontId"),
+    ("fill", "_fills", "fillId"),
+    ("alignment", "_alignments", "alignmentId"),
+    ("border", "_borders", "borderId"),
+)
+
+
+class ColumnLayout:
+    """1列分のレイアウト"""
+
+    __slots__ = ("index", "letter", "key", "name", "width", "multi_idx", "style")
+
+    def __init__(self, index: int, letter: str, key: str | None, name: str, width: float,
+                 multi_idx: bool, style: CellStyle):
+        self.index = index          # 列番号（1始まり）
+        self.letter = letter        # 列記号
+        self.key = key              # config.yamlのキー（テンプレート列はNone）
+        self.name = name            # ヘッダーの列名
+        self.width = width          # デフォルトの列幅
+        self.multi_idx = multi_idx  # マージ対象の列かどうか
+        self.style = style          # データ行のスタイル
+
+
+class CellStyle:
+    """セルに適用するスタイルの組み合わせ（フォント・塗りつぶし・配置・枠線）"""
+
+    __slots__ = ("font", "fill", "alignment", "border")
+
+    def __init__(self, font=None, fill=None, alignment=None, border=None):
+        self.font = font
+        self.fill = fill
+        self.alignment = alignment
+        self.border = border
+
+    def bind(self, workbook) -> BoundCellStyle:
+        """ワークブックにスタイルを登録し、セルに適用できる形にします。
+
+        Notes:
+            - cell.font などの公開属性に代入すると、セルごとにスタイルのハッシュを計算して登録するため10倍以上遅い
+            - 代わりに登録済みの番号をセルの StyleArray に直接設定する（結果は tests/test_layout.py で公開属性への代入と比較している）
+        """
+        ids = tuple((key, getattr(workbook, collection).add(getattr(self, name)))
+                    for name, collection, key in _STYLE_COLLECTIONS
+                    if getattr(self, name) is not None)
+        return BoundCellStyle(ids)
+
+
+class BoundCellStyle:
+    """ワークブックに登録済みのスタイル"""
+
+    __slots__ = ("ids", "array")
+
+    def __init__(self, ids: tuple):
+        from openpyxl.styles.cell_style import StyleArray
+
+        self.ids = ids
+        # 書式が未設定のセルにそのまま複製して使う書式情報
+        self.array = StyleArray()
+        for key, value in ids:
+            setattr(self.array, key, value)
+
+    def apply(self, cell):
+        """セルにスタイルを適用します。指定のない書式（表示形式など）はセルの既存の値を保持します。"""
+        style = cell._style
+        if style is None:
+            cell._style = copy(self.array)
+            return
+        for key, value in self.ids:
+            setattr(style, key, value)
+
+
+class SheetStyles:
+    """ワークブックに登録済みの、シート書き込み用のスタイル一式"""
+
+    __slots__ = ("header", "body", "additional", "merged", "merged_last")
+
+    def __init__(self, plan: LayoutPlan, workbook):
+        self.header = plan.header_style.bind(workbook)
+        self.body = [column.style.bind(workbook) for column in plan.columns]
+        self.additional = plan.additional_style.bind(workbook)
+        self.merged = plan.merged_style.bind(workbook)
+        self.merged_last = plan.merged_last_style.bind(workbook)
+
+
+class LayoutPlan:
+
+    def __init__(self, config: Config):
+        """列のレイアウトとスタイルを設定情報から一度だけ組み立てるクラス
+
+        Args:
+            config (Config):  設定情報
+
+        Notes:
+            - フォント・配置・枠線などのスタイルは全セルで共有する
+            - 列記号は列数から求めるため、列数の上限はない
+        """
+        from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+        from openpyxl.utils import get_column_letter
+
+        self.font_name = config.excel_settings.font_name
+        body_font = Font(name=self.font_name)
+        thin = Side(style="thin")
+        border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        center_alignment = Alignment(vertical="center", horizontal="center", wrap_text=True)
+
+        self.header_style = CellStyle(font=Font(name=self.font_name, bold=True, color="ffffff"),
+                                      fill=PatternFill(patternType="solid", fgColor="4f81bd"),
+                                      alignment=center_alignment)
+        self.additional_style = CellStyle(font=body_font, alignment=center_alignment, border=border)
+        # マージされたセルの枠線（左上のセルから左右、最終行は下側も引き継ぐ）
+        self.merged_style = CellStyle(border=Border(left=thin, right=thin))
+        self.merged_last_style = CellStyle(border=Border(left=thin, right=thin, bottom=thin))
+
+        self.columns = []
+        for index, (key, column) in enumerate(config.columns.model_dump().items(), 1):
+            alignment = Alignment(horizontal=column["horizontal"], vertical=column["vertical"], wrap_text=True)
+            self.columns.append(ColumnLayout(index, get_column_letter(index), key, column["name"],
+                                             column["length"], bool(column.get("multi_idx")),
+                                             CellStyle(font=body_font, alignment=alignment, border=border)))
+
+        # テンプレート列（G列からM列）
+        self.additional_columns = [
+            ColumnLayout(index, get_column_letter(index), None, header, ADDITIONAL_COLUMN_WIDTH, False,
+                         self.additional_style)
+            for index, header in enumerate(ADDITIONAL_HEADERS, 7)
+        ]
+
+        self.column_names = [column.name for column in self.columns]
+        self.multi_idx_columns = [column for column in self.columns if column.multi_idx]
+
+    def bind(self, workbook) -> SheetStyles:
+        """ワークブックにスタイルを登録します。"""
+        return SheetStyles(self, workbook)
@@ -1,21 +1,32 @@
-import re
+from __future__ import annotations
+
+from collections import deque
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, TextIO
+
+from md_test_case_to_excel import instrument
+from md_test_case_to_excel.classifier import LineClassifier
+from md_test_case_to_excel.records import RecordStore, TestCaseRecord
 
-import pandas as pd
+if TYPE_CHECKING:
+    import pandas as pd
 
-from md_test_case_to_excel.config_loader import Config
+    from md_test_case_to_excel.config_loader import Config
 
 
 class MarkdownTestParser:
 
-    def __init__(self, markdown_content: str, config: Config):
+    def __init__(self, markdown_content: str | None, config: Config):
         """Markdownテスト仕様書を解析し、データフレームに変換するクラス
 
         Args:
-            markdown_content (str):  Markdown形式のテスト仕様書
+            markdown_content (str):  Markdown形式のテスト仕様書。解析するテスト仕様書を parse / parse_records に渡す場合はNone
             config (Config):         設定情報
 
-
+        Notes:
+            - 正規表現のコンパイルと行の判定器の組み立ては生成時に一度だけ行う
+            - 解析中の状態（NOの採番など）は解析ごとに作成するため、1つのインスタンスで何度でも、
+              複数のスレッドから同時にでも解析できる（parse を繰り返し呼び出しても結果は重複しない）
         """
 
         self.markdown_content = markdown_content
@@ -23,24 +34,21 @@ class MarkdownTestParser:
 
         # 新しいカラム順序: ["NO", "大分類", "中分類", "小分類", "試験内容", "確認事項"]
         self.columns = self.config.columns.model_fields.keys()
-        self.data = []
 
-        self.pattern_section = re.compile(self.config.columns.section.md_pattern, re.MULTILINE)
-        self.pattern_subsection = re.compile(self.config.columns.subsection.md_pattern, re.MULTILINE)
-        self.pattern_testcase = re.compile(self.config.columns.testcase.md_pattern, re.MULTILINE)
-        self.pattern_step = re.compile(self.config.columns.step.md_pattern, re.MULTILINE)
-        self.pattern_expectation = re.compile(self.config.columns.expectation.md_pattern, re.MULTILINE)
+        # 行の種別判定は行頭の文字で候補を絞り込んでから正規表現を評価する
+        self.classifier = LineClassifier(self.config)
+        self.pattern_section = self.classifier.patterns["section"]
+        self.pattern_subsection = self.classifier.patterns["subsection"]
+        self.pattern_testcase = self.classifier.patterns["testcase"]
+        self.pattern_step = self.classifier.patterns["step"]
+        self.pattern_expectation = self.classifier.patterns["expectation"]
 
-        # 階層構造のNO管理用の変数
-        self.section_count = 0
-        self.section_map = {}  # 大分類名をキーとし、その番号を値とするディクショナリ
-        self.subsection_count = 0
-        self.subsection_map = {}  # '大分類名:中分類名'をキーとし、その番号を値とするディクショナリ
-        self.testcase_count = 0
-
-    def parse(self) -> pd.DataFrame:
+    def parse(self, file_obj: TextIO | str | None = None) -> pd.DataFrame:
         """Markdownファイルを解析し、データフレーム用のデータを作成します。
 
+        Args:
+            file_obj (TextIO):  読み込むファイルオブジェクト、またはMarkdownの文字列。省略時はコンストラクタで渡した文字列を解析する
+
         Returns:
             pd.DataFrame: 解析結果のデータフレーム
 
@@ -54,102 +62,205 @@ class MarkdownTestParser:
                 2. 確認手順
                 * [ ] 期待値
         """
+        records = self.parse_records(file_obj)
+        with instrument.phase("dataframe"):
+            return records.to_dataframe(self.columns)
+
+    def parse_records(self, file_obj: TextIO | str | None = None) -> RecordStore:
+        """Markdownファイルを解析し、データフレームを作らずにテストケースを返します。
+
+        Args:
+            file_obj (TextIO):  読み込むファイルオブジェクト、またはMarkdownの文字列。省略時はコンストラクタで渡した文字列を解析する
+
+        Returns:
+            RecordStore: 解析結果のテストケース（呼び出しごとに新しく作成する）
+        """
+        if file_obj is None:
+            file_obj = self.markdown_content
+        lines = file_obj.split('\n') if isinstance(file_obj, str) else file_obj
+        records = RecordStore()
+        with instrument.phase("parse"):
+            records.extend(self.iter_records(lines))
+            instrument.count("test_cases", len(records))
+        return records
+
+    def iter_records(self, file_obj: Iterable[str]) -> Iterator[TestCaseRecord]:
+        """Markdownを1行ずつ読み進め、確定したテストケースから順に返します。
+
+        Args:
+            file_obj (Iterable[str]):  ファイルオブジェクトまたは行のイテラブル
+
+        Yields:
+            TestCaseRecord: テストケース1件分のデータ (NO, 大分類, 中分類, 小分類, 試験内容, 確認事項)
+
+        Notes:
+            - 各行は一度だけ走査する（テストケースごとに後続行を再走査しない）
+            - 保持するのは未確定のテストケースのみで、ファイル全体は読み込まない
+            - NOは呼び出しごとに1から採番する
+        """
+        numbering = _Numbering()
         current_section = None
         current_subsection = None
         last_section = None
         last_subsection = None
 
-        lines = self.markdown_content.split('\n')
+        # 開始順に並んだ未確定のテストケース
+        # 確認事項の継続行として見出し行が取り込まれた場合、複数のテストケースが同時に開いた状態になる
+        open_cases = deque()
+        classify = self.classifier.classify
+        lines_scanned = 0
 
-        for i, line in enumerate(lines):
-            section_match = self.pattern_section.match(line)
-            subsection_match = self.pattern_subsection.match(line)
-            testcase_match = self.pattern_testcase.match(line)
+        for lines_scanned, line in enumerate(file_obj, 1):
+            line = line.rstrip('\n')
+            # 見出し・本文の判定は1行につき1回のみ行う
+            kind, match, body_kind, body_match = classify(line)
+            if open_cases:
+                self._feed_open_cases(open_cases, line, body_kind, body_match)
 
-            if section_match:
-                current_section = section_match.group(1)
+            if kind == "section":
+                current_section = match.group(1)
                 current_subsection = None  # Reset subsection when a new section is found
                 
                 # 大分類が変わった場合、カウンターを増やす
                 if current_section != last_section:
-                    if current_section not in self.section_map:
-                        self.section_count += 1
-                        self.section_map[current_section] = self.section_count
+                    if current_section not in numbering.section_map:
+                        numbering.section_count += 1
+                        numbering.section_map[current_section] = numbering.section_count
                     last_section = current_section
-                    self.subsection_count = 0 # 中分類のカウンターをリセット
-                    self.subsection_map = {}  # 中分類のマップもリセット
+                    numbering.subsection_count = 0 # 中分類のカウンターをリセット
+                    numbering.subsection_map = {}  # 中分類のマップもリセット
             
-            elif subsection_match:
-                current_subsection = subsection_match.group(1)
+            elif kind == "subsection":
+                current_subsection = match.group(1)
                 
                 # 中分類が変わった場合、カウンターを増やす
                 if current_subsection != last_subsection or current_section != last_section:
                     subsection_key = f"{current_section}:{current_subsection}"
-                    if subsection_key not in self.subsection_map:
-                        self.subsection_count += 1
-                        self.subsection_map[subsection_key] = self.subsection_count
+                    if subsection_key not in numbering.subsection_map:
+                        numbering.subsection_count += 1
+                        numbering.subsection_map[subsection_key] = numbering.subsection_count
                     last_subsection = current_subsection
-                    self.testcase_count = 0  # 小分類（テストケース）のカウンターをリセット
+                    numbering.testcase_count = 0  # 小分類（テストケース）のカウンターをリセット
             
-            elif testcase_match:
+            elif kind == "testcase":
                 # テストケースごとにカウンターを増やす
-                self.testcase_count += 1
-                
-                # 新しいパターン - 直接テストケース名を取得
-                test_case_name = testcase_match.group(1)
-                steps, expectations = [], []
-
-                # 直前の行からの継続かどうかを判断するフラグ
-                continuing_expectation = False
-                current_expectation = ""
-
-                for subline in lines[i + 1:]:
-                    step_match = self.pattern_step.match(subline)
-                    expectation_match = self.pattern_expectation.match(subline)
-
-                    if step_match:
-                        steps.append(step_match.group(1))
-                        continuing_expectation = False  # 確認事項の継続をリセット
-                    elif expectation_match:
-                        # 新しい確認事項が始まる場合は、前の確認事項を追加
-                        if continuing_expectation and current_expectation:
-                            expectations.append(current_expectation)
-                        # 新しい確認事項を開始
-                        current_expectation = expectation_match.group(1)
-                        continuing_expectation = True
-                    elif subline.strip() and continuing_expectation:
-                        # 空行でなく、かつ確認事項の継続中なら、その行を現在の確認事項に追加
-                        current_expectation += "\n" + subline.strip()
-                    elif subline.startswith('####') or subline.startswith('###') or subline.startswith('##'):
-                        # 次のセクションが始まったら処理終了
-                        break
-                    elif not subline.strip():
-                        # 空行の場合、確認事項の継続が終了
-                        if continuing_expectation and current_expectation:
-                            expectations.append(current_expectation)
-                            continuing_expectation = False
-                            current_expectation = ""
-
-                # 最後の確認事項が残っていれば追加
-                if continuing_expectation and current_expectation:
-                    expectations.append(current_expectation)
+                numbering.testcase_count += 1
 
                 # 階層構造のNO値を設定
-                section_num = self.section_map.get(current_section, 0)
-                subsection_num = self.subsection_map.get(f"{current_section}:{current_subsection}", 0) if current_subsection else 0
-                hierarchical_no = f"{section_num}-{subsection_num}-{self.testcase_count}"
-                
-                # データフレーム用の行データ作成（新しい順序）
-                self.data.append([
-                    hierarchical_no,     # 階層化されたNO
-                    current_section,     # 大分類
-                    current_subsection,  # 中分類  
-                    test_case_name,      # 小分類
-                    '\n'.join([f"{i + 1}. {step}" for i, step in enumerate(steps)]),  # 試験内容
-                    '\n'.join([f"・{exp}" for exp in expectations])   # 確認事項
-                ])
+                section_num = numbering.section_map.get(current_section, 0)
+                subsection_num = numbering.subsection_map.get(f"{current_section}:{current_subsection}", 0) if current_subsection else 0
+                hierarchical_no = f"{section_num}-{subsection_num}-{numbering.testcase_count}"
+
+                # 試験内容・確認事項は後続行を読み進めながら蓄積する
+                open_cases.append(_OpenTestCase(hierarchical_no, current_section, current_subsection,
+                                                match.group(1)))
+
+            # 先頭から順に確定したテストケースを出力する（出力順は開始順）
+            while open_cases and open_cases[0].closed:
+                yield open_cases.popleft().to_record()
 
-        return pd.DataFrame(self.data, columns=self.columns)
+        instrument.count("lines_scanned", lines_scanned)
+
+        # ファイル末尾で未確定のテストケースを確定させる
+        while open_cases:
+            case = open_cases.popleft()
+            case.close()
+            yield case.to_record()
+
+    def _feed_open_cases(self, open_cases, line: str, kind: str | None, match):
+        """未確定のテストケースに1行を渡し、状態を進めます。
+
+        Args:
+            open_cases (deque):  未確定のテストケース
+            line (str):          Markdownの1行
+            kind (str):          本文の種別（"step", "expectation"。どちらでもない場合はNone）
+            match (Match):       本文のパターンに一致した結果
+        """
+        stripped = line.strip()
+
+        for case in open_cases:
+            if case.closed:
+                continue
+            if kind == "step":
+                case.steps.append(match.group(1))
+                case.continuing_expectation = False  # 確認事項の継続をリセット
+            elif kind == "expectation":
+                # 新しい確認事項が始まる場合は、前の確認事項を追加
+                case.flush_expectation()
+                # 新しい確認事項を開始
+                case.expectation_parts = [match.group(1)]
+                case.continuing_expectation = True
+            elif stripped and case.continuing_expectation:
+                # 空行でなく、かつ確認事項の継続中なら、その行を現在の確認事項に追加
+                case.expectation_parts.append(stripped)
+            elif self.classifier.is_boundary(line):
+                # 次のセクション（既定では ##, ###, ####）が始まったら処理終了
+                case.close()
+            elif not stripped:
+                # 空行の場合、確認事項の継続が終了
+                if case.flush_expectation():
+                    case.continuing_expectation = False
+                    case.expectation_parts = []
+
+
+class _Numbering:
+    """階層構造のNOの採番状態（解析1回分）"""
+
+    __slots__ = ("section_count", "section_map", "subsection_count", "subsection_map", "testcase_count")
+
+    def __init__(self):
+        self.section_count = 0
+        self.section_map = {}  # 大分類名をキーとし、その番号を値とするディクショナリ
+        self.subsection_count = 0
+        self.subsection_map = {}  # '大分類名:中分類名'をキーとし、その番号を値とするディクショナリ
+        self.testcase_count = 0
+
+
+class _OpenTestCase:
+    """解析中（未確定）のテストケース"""
+
+    __slots__ = ("no", "section", "subsection", "name", "steps", "expectations",
+                 "expectation_parts", "continuing_expectation", "closed")
+
+    def __init__(self, no: str, section, subsection, name: str):
+        self.no = no
+        self.section = section
+        self.subsection = subsection
+        self.name = name
+        self.steps = []
+        self.expectations = []
+        # 複数行の確認事項は行単位で保持し、確定時にまとめて結合する
+        self.expectation_parts = []
+        self.continuing_expectation = False
+        self.closed = False
+
+    def flush_expectation(self) -> bool:
+        """継続中の確認事項があれば確定させます。
+
+        Returns:
+            bool: 確認事項を追加した場合はTrue
+        """
+        if self.continuing_expectation:
+            expectation = '\n'.join(self.expectation_parts)
+            if expectation:
+                self.expectations.append(expectation)
+                return True
+        return False
+
+    def close(self):
+        # 最後の確認事項が残っていれば追加
+        self.flush_expectation()
+        self.closed = True
+
+    def to_record(self) -> TestCaseRecord:
+        return TestCaseRecord(
+            self.no,            # 階層化されたNO
+            self.section,       # 大分類
+            self.subsection,    # 中分類
+            self.name,          # 小分類
+            '\n'.join([f"{i + 1}. {step}" for i, step in enumerate(self.steps)]),  # 試験内容
+            '\n'.join([f"・{exp}" for exp in self.expectations])   # 確認事項
+        )
 
 
 def read_markdown_file(file_path: Path) -> str:
@@ -157,3 +268,10 @@ def read_markdown_file(file_path: Path) -> str:
         raise FileNotFoundError(f"Markdownファイルが見つかりません: {file_path}")
     with open(file_path, 'r', encoding='utf-8') as file:
         return file.read()
+
+
+def open_markdown_file(file_path: Path) -> TextIO:
+    """Markdownファイルを1行ずつ読み込むためのファイルオブジェクトを返します。"""
+    if not file_path.exists():
+        raise FileNotFoundError(f"Markdownファイルが見つかりません: {file_path}")
+    return open(file_path, 'r', encoding='utf-8')
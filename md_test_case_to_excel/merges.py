@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Sequence
+
+if TYPE_CHECKING:
+    from md_test_case_to_excel.layout import ColumnLayout
+
+
+class MergeRange:
+    """1つのマージ範囲（1列内の連続した行）"""
+
+    __slots__ = ("column", "start", "end")
+
+    def __init__(self, column: ColumnLayout, start: int, end: int):
+        self.column = column  # マージする列
+        self.start = start    # 開始位置（データ行のインデックス、0始まり）
+        self.end = end        # 終了位置（両端を含む）
+
+    def __repr__(self):
+        return f"MergeRange({self.column.letter}, {self.start}, {self.end})"
+
+    def coord(self, first_row: int) -> str:
+        """ワークシート上の範囲（例: "B2:B5"）を返します。"""
+        return f"{self.column.letter}{first_row + self.start}:{self.column.letter}{first_row + self.end}"
+
+
+def _value_breaks(values: Sequence) -> set[int]:
+    """値が変わる位置（直前の行と値が異なる行のインデックス）を返します。"""
+    return {i for i, (previous, value) in enumerate(zip(values, values[1:]), 1) if value != previous}
+
+
+def plan_merges(columns: Sequence[Sequence], merge_columns: Sequence[ColumnLayout]) -> list[MergeRange]:
+    """解析結果から全てのマージ範囲を求めます。
+
+    Args:
+        columns (Sequence[Sequence]):        列ごとの値のリスト（RecordStore.columns）
+        merge_columns (Sequence[ColumnLayout]): マージ対象の列。並び順を階層（大分類 > 中分類 > 小分類）とみなす
+
+    Returns:
+        list[MergeRange]: マージ範囲のリスト。列ごとに行の昇順で並ぶ
+
+    Notes:
+        - 各列は (大分類, 中分類, ...) のように上位の列を含めたキーで連長圧縮するため、
+          下位の列の範囲は必ず上位の列の範囲に収まる（大分類をまたいで中分類をマージしない）
+        - 値が None の行と、1行だけの範囲はマージしない
+    """
+    if not merge_columns:
+        return []
+    row_count = len(columns[merge_columns[0].index - 1])
+
+    ranges = []
+    breaks = {0, row_count}  # 上位の列から引き継ぐ区切り位置
+    for column in merge_columns:
+        values = columns[column.index - 1]
+        breaks |= _value_breaks(values)
+        bounds = sorted(breaks)
+        for start, stop in zip(bounds, bounds[1:]):
+            if stop - start > 1 and values[start] is not None:
+                ranges.append(MergeRange(column, start, stop - 1))
+    return ranges
+
+
+def apply_merges(worksheet, ranges: Sequence[MergeRange], first_row: int):
+    """マージ範囲をワークシートに設定します。
+
+    Args:
+        worksheet:                    openpyxlのワークシートオブジェクト
+        ranges (Sequence[MergeRange]): plan_merges で求めたマージ範囲
+        first_row (int):              データの開始行
+
+    Notes:
+        - 範囲ごとに worksheet.merge_cells を呼び出す。結合されるセルの枠線と保護設定の引き継ぎも openpyxl に任せる
+        - 既存のマージ範囲（テンプレート）に含まれる範囲は設定しない
+    """
+    from openpyxl.worksheet.cell_range import MultiCellRange
+
+    existing = MultiCellRange(worksheet.merged_cells.ranges)
+    for merge_range in ranges:
+        coord = merge_range.coord(first_row)
+        if existing.ranges and coord in existing:
+            continue
+        worksheet.merge_cells(coord)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import math
+import unicodedata
+from functools import lru_cache
+from typing import Iterable
+
+# 1行あたりの表示幅（半角換算）。これを超える行は折り返されるものとして行高を見積もる
+WRAP_WIDTH = 40
+
+
+class _DisplayWidthTable(dict):
+    """str.translate用の変換表。全角の文字を2文字に置き換え、変換後の文字数を表示幅として扱う
+
+    Notes:
+        - East Asian Width が W (Wide) / F (Fullwidth) の文字を全角とする
+        - A (Ambiguous) の文字は日本語フォントでは全角で表示されるため、Latin-1の範囲外であれば全角とする
+        - 判定結果は文字ごとに保持するため、unicodedataを参照するのは初出の文字のみ
+    """
+
+    def __missing__(self, codepoint: int) -> str:
+        char = chr(codepoint)
+        east_asian_width = unicodedata.east_asian_width(char)
+        if east_asian_width in ("W", "F") or (east_asian_width == "A" and codepoint > 0xff):
+            value = "ww"
+        else:
+            value = char
+        self[codepoint] = value
+        return value
+
+
+_DISPLAY_WIDTH_TABLE = _DisplayWidthTable()
+
+
+def display_width(line: str) -> int:
+    """1行の表示幅（全角:半角 = 2:1）を返します。"""
+    if line.isascii():
+        return len(line)
+    return len(line.translate(_DISPLAY_WIDTH_TABLE))
+
+
+@lru_cache(maxsize=8192)
+def text_metrics(text: str) -> tuple[int, float]:
+    """セルに表示するテキストの寸法を返します。
+
+    Args:
+        text (str):  セルに表示するテキスト
+
+    Returns:
+        tuple[int, float]: (最も長い行の表示幅, 折り返しを考慮した行数)
+
+    Notes:
+        - 大分類・中分類のように繰り返し現れる文字列は計算結果を再利用する
+    """
+    # 改行は半角のまま変換されるため、変換後に分割しても行の対応は変わらない
+    translated = text if text.isascii() else text.translate(_DISPLAY_WIDTH_TABLE)
+    widths = [len(line) for line in translated.split('\n')]
+    # 1行あたり約40-50文字として折り返し回数を概算
+    wrapped_line_count = sum(max(1, width / WRAP_WIDTH) for width in widths)
+    return max(widths), wrapped_line_count
+
+
+def width_to_excel(char_width: float, font_size: int = 11, min_width: float = 8, max_width: float = 100) -> float:
+    """表示幅をExcelの列幅に変換します。"""
+    # 標準のフォントサイズ11ptを基準に計算
+    excel_width = char_width * (font_size / 11) * 1.5  # 余裕係数
+    return max(min_width, min(excel_width, max_width))
+
+
+def lines_to_height(line_count: float, font_size: int = 11, min_height: float = 15,
+                    line_height_factor: float = 1.5) -> float:
+    """行数をExcelの行高（pt）に変換します。小数点以下は切り上げて余裕を持たせます。"""
+    return max(min_height, math.ceil(line_count) * font_size * line_height_factor)
+
+
+class SheetMetrics:
+    """シート全体の列幅と行高"""
+
+    __slots__ = ("column_widths", "row_heights")
+
+    def __init__(self, column_widths: list[float], row_heights: list[float]):
+        self.column_widths = column_widths  # 列ごとの内容に合わせた列幅（ヘッダーを含む）
+        self.row_heights = row_heights      # データ行ごとの行高
+
+
+def measure_records(columns: Iterable[list], headers: Iterable[str], font_size: int = 11,
+                    min_width: float = 8, max_width: float = 100,
+                    min_height: float = 15, line_height_factor: float = 1.5) -> SheetMetrics:
+    """列ごとの値から、列幅と行高を一度の走査でまとめて計算します。
+
+    Args:
+        columns (Iterable[list]):  列ごとの値のリスト（RecordStore.columns）
+        headers (Iterable[str]):   列ごとのヘッダー
+        font_size (int):           フォントサイズ
+        min_width (float):         最小列幅
+        max_width (float):         最大列幅
+        min_height (float):        最小行高
+        line_height_factor (float): 行間の余裕係数
+
+    Returns:
+        SheetMetrics: 列幅と行高
+    """
+    column_widths = []
+    row_line_counts = None
+    for values, header in zip(columns, headers):
+        if row_line_counts is None:
+            row_line_counts = [1] * len(values)
+
+        widest = text_metrics(str(header))[0] if header else 0
+        for i, value in enumerate(values):
+            if value is None:
+                continue
+            char_width, line_count = text_metrics(value if isinstance(value, str) else str(value))
+            # 空のセルは列幅の計算に含めない
+            if value and char_width > widest:
+                widest = char_width
+            if line_count > row_line_counts[i]:
+                row_line_counts[i] = line_count
+        column_widths.append(width_to_excel(widest, font_size, min_width, max_width))
+
+    row_heights = [lines_to_height(line_count, font_size, min_height, line_height_factor)
+                   for line_count in row_line_counts or []]
+    return SheetMetrics(column_widths, row_heights)
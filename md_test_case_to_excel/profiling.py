@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import ast
+import contextlib
+import linecache
+import sys
+from pathlib import Path
+
+from md_test_case_to_excel import instrument
+
+PROFILES = ("cpu", "mem")
+
+# 既定の出力先（カレントディレクトリ）
+DEFAULT_OUTPUTS = {"cpu": "md2excel-cpu.prof", "mem": "md2excel-mem.txt"}
+DEFAULT_TOP = 25        # レポートに表示する件数
+TRACEBACK_FRAMES = 10   # メモリを確保した箇所として記録する呼び出し履歴の深さ
+SNAPSHOT_GROWTH = 1.05  # メモリ使用量がこの倍率を超えて最大値を更新した場合にスナップショットを取り直す
+
+PACKAGE_DIR = Path(__file__).resolve().parent
+
+
+def peak_rss() -> int | None:
+    """プロセスの最大常駐メモリ（バイト）を返します。取得できない環境（Windows）ではNone。"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linuxはキロバイト、macOSはバイト単位
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _mib(size: float) -> str:
+    return f"{size / (1024 * 1024):,.2f} MiB"
+
+
+class _FunctionIndex:
+    """ソースファイルの行番号から、その行を含む関数名（クラス名.関数名）を求めます。"""
+
+    def __init__(self):
+        self._functions: dict[str, list[tuple[int, int, str]]] = {}
+
+    def _load(self, filename: str) -> list[tuple[int, int, str]]:
+        functions = []
+        try:
+            tree = ast.parse(Path(filename).read_text(encoding="utf-8"))
+        except (OSError, SyntaxError, ValueError):
+            return functions
+
+        def visit(node, prefix):
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    name = f"{prefix}{child.name}"
+                    if not isinstance(child, ast.ClassDef):
+                        functions.append((child.lineno, child.end_lineno, name))
+                    visit(child, f"{name}.")
+
+        visit(tree, "")
+        return functions
+
+    def name_of(self, filename: str, lineno: int) -> str:
+        if filename not in self._functions:
+            self._functions[filename] = self._load(filename)
+        # 行を含む関数のうち最も内側（開始行が最も後）のもの
+        candidates = [(start, name) for start, end, name in self._functions[filename] if start <= lineno <= end]
+        return max(candidates)[1] if candidates else "<module>"
+
+
+def _allocation_sites(snapshot) -> tuple[list, list]:
+    """確保したまま残っているメモリを、確保した行ごとに集計します（tracemalloc 自身とインポート処理による確保は除く）。
+
+    Returns:
+        tuple[list, list]: (パッケージ内の行ごとの集計, 全体の行ごとの集計)。
+                           いずれも (ファイル名, 行番号, サイズ（バイト）, 確保した回数) のサイズの降順。
+                           パッケージ内の集計は、呼び出し履歴のうち最も内側のパッケージ内の行に割り当てる
+    """
+    import tracemalloc
+
+    excluded = {tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>"}
+    package = str(PACKAGE_DIR)
+    package_sites, all_sites = {}, {}
+
+    def add(sites, frame, size):
+        key = (frame.filename, frame.lineno)
+        total, count = sites.get(key, (0, 0))
+        sites[key] = (total + size, count + 1)
+
+    for trace in snapshot.traces:
+        # 呼び出し履歴は古いものから順に並んでいる（最後が確保した行）
+        frames = trace.traceback
+        if frames[-1].filename in excluded:
+            continue
+        add(all_sites, frames[-1], trace.size)
+        for frame in reversed(frames):
+            if frame.filename.startswith(package):
+                add(package_sites, frame, trace.size)
+                break
+
+    def ranked(sites):
+        return sorted(((filename, lineno, size, count) for (filename, lineno), (size, count) in sites.items()),
+                      key=lambda item: item[2], reverse=True)
+
+    return ranked(package_sites), ranked(all_sites)
+
+
+class _PeakSnapshot:
+    """処理の終了ごとにメモリ使用量を確認し、最も多かった時点の tracemalloc のスナップショットを保持します。"""
+
+    def __init__(self):
+        self.snapshot = None
+        self.phase = None   # スナップショットを取得した処理
+        self.size = -1      # スナップショットを取得した時点のメモリ使用量（バイト）
+
+    def __call__(self, kind: str, name: str, value):
+        import tracemalloc
+
+        if kind != "phase":
+            return
+        size = tracemalloc.get_traced_memory()[0]
+        # スナップショットの取得には時間がかかるため、最大値を一定以上更新した場合のみ取得する
+        if size > self.size * SNAPSHOT_GROWTH:
+            # 絞り込みは計測の終了後にまとめて行う（ここでは取得のみ）
+            self.snapshot, self.phase, self.size = tracemalloc.take_snapshot(), name, size
+
+
+def _preload():
+    """変換処理で使うモジュールを読み込みます。
+
+    モジュールの読み込みによる確保を計測の対象から除き、tracemalloc による読み込みの遅延も避けるため、
+    メモリの追跡を始める前に呼び出します。
+    """
+    import openpyxl  # noqa: F401
+    import openpyxl.reader.excel  # noqa: F401
+    import openpyxl.styles  # noqa: F401
+
+    import md_test_case_to_excel.config_loader  # noqa: F401
+    import md_test_case_to_excel.excel  # noqa: F401
+    import md_test_case_to_excel.markdown  # noqa: F401
+
+
+def write_memory_report(path: Path, peak: _PeakSnapshot, traced_peak: int, report: instrument.Report, top: int):
+    """tracemalloc の結果をテキストのレポートに書き出します。"""
+    functions = _FunctionIndex()
+    package_sites, all_sites = _allocation_sites(peak.snapshot)
+    rss = peak_rss()
+    lines = [
+        "# md2excel memory profile",
+        f"トレースしたメモリのピーク: {_mib(traced_peak)}",
+        f"最大常駐メモリ (peak RSS):   {_mib(rss) if rss is not None else '取得できません'}",
+        f"確保箇所の集計: 処理 {peak.phase} の終了時点（メモリ使用量 {_mib(peak.size)}、処理の終了時点で最大）",
+        "",
+        "## 処理ごとのメモリの増減（処理の終了時に確保したまま残ったメモリ。入れ子の処理の分は含めない）",
+    ]
+    for name, allocated in sorted(report.memory.items(), key=lambda item: item[1], reverse=True):
+        lines.append(f"{name:<12} {allocated / (1024 * 1024):+12,.2f} MiB  ({report.phases.get(name, 0.0):.3f}秒)")
+
+    lines += ["", f"## パッケージ内の確保箇所（上位{top}件。呼び出し履歴のうち最も内側のパッケージ内の行に割り当てる）"]
+    for filename, lineno, size, count in package_sites[:top]:
+        relative = Path(filename).relative_to(PACKAGE_DIR.parent)
+        lines.append(f"{_mib(size):>14} {count:>9,}個  {relative}:{lineno} {functions.name_of(filename, lineno)}")
+        lines.append(f"{'':>26}{linecache.getline(filename, lineno).strip()}")
+
+    lines += ["", f"## 全体の確保箇所（上位{top}件）"]
+    for filename, lineno, size, count in all_sites[:top]:
+        lines.append(f"{_mib(size):>14} {count:>9,}個  {filename}:{lineno}")
+        lines.append(f"{'':>26}{linecache.getline(filename, lineno).strip()}")
+
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@contextlib.contextmanager
+def profiled(kind: str, output: str | Path | None = None, top: int = DEFAULT_TOP):
+    """with ブロック内の変換処理を cProfile（cpu）または tracemalloc（mem）で計測します。
+
+    Args:
+        kind (str):     "cpu" または "mem"
+        output (Path):  結果の出力先（省略時はカレントディレクトリの md2excel-cpu.prof / md2excel-mem.txt）
+        top (int):      表示する上位の件数
+
+    Notes:
+        - cpu: pstats形式のファイルを出力し、累積時間の上位を表示する（python -m pstats や snakeviz で開ける）
+        - mem: メモリのピーク、処理ごとのメモリの増減、確保したメモリの多い箇所（パッケージ内の関数に割り当てたもの
+          と全体）をテキストで出力する。確保箇所は処理の終了時点のうちメモリ使用量が最大の時点で集計する
+        - mem: tracemalloc により処理は数倍遅くなる
+        - 計測は変換処理の内容や出力ファイルには影響しない
+    """
+    if kind not in PROFILES:
+        raise ValueError(f"プロファイルの種類は {', '.join(PROFILES)} のいずれかを指定してください: {kind}")
+    output = Path(output or DEFAULT_OUTPUTS[kind])
+
+    if kind == "cpu":
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(output)
+            print(f"\nCPUプロファイルを {output} に出力しました。累積時間の上位{top}件:")
+            pstats.Stats(profiler, stream=sys.stdout).strip_dirs().sort_stats("cumulative").print_stats(top)
+    else:
+        import tracemalloc
+
+        _preload()
+        peak = _PeakSnapshot()
+        tracemalloc.start(TRACEBACK_FRAMES)
+        try:
+            with instrument.recording(instrument.Report(hooks=[peak])) as report:
+                yield
+        finally:
+            if peak.snapshot is None:
+                peak.snapshot, peak.phase, peak.size = (tracemalloc.take_snapshot(), "(全体)",
+                                                        tracemalloc.get_traced_memory()[0])
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            write_memory_report(output, peak, traced_peak, report, top)
+            rss = peak_rss()
+            print(f"\nメモリのプロファイルを {output} に出力しました"
+                  f"（トレースしたピーク: {_mib(traced_peak)}"
+                  f"{f', peak RSS: {_mib(rss)}' if rss is not None else ''}）。")
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 列の並び順: ["NO", "大分類", "中分類", "小分類", "試験内容", "確認事項"]
+FIELDS = ("number", "section", "subsection", "testcase", "step", "expectation")
+
+
+class TestCaseRecord:
+    """テストケース1件分のデータ"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, number: str, section, subsection, testcase: str, step: str, expectation: str):
+        self.number = number            # 階層化されたNO
+        self.section = section          # 大分類
+        self.subsection = subsection    # 中分類
+        self.testcase = testcase        # 小分類
+        self.step = step                # 試験内容
+        self.expectation = expectation  # 確認事項
+
+    def __iter__(self):
+        return iter(self.as_row())
+
+    def __eq__(self, other):
+        if not isinstance(other, TestCaseRecord):
+            return NotImplemented
+        return self.as_row() == other.as_row()
+
+    def __repr__(self):
+        return f"TestCaseRecord{self.as_row()!r}"
+
+    def as_row(self) -> tuple:
+        return (self.number, self.section, self.subsection, self.testcase, self.step, self.expectation)
+
+
+class RecordStore:
+
+    def __init__(self, records: Iterable[TestCaseRecord | tuple] = ()):
+        """テストケースを列ごとに保持するクラス
+
+        Args:
+            records (Iterable):  TestCaseRecord または行データのタプル
+
+        Notes:
+            - 大分類・中分類の名称は同じ文字列オブジェクトを共有する（インターン）
+            - DataFrameは to_dataframe() を呼び出したときにのみ作成する
+        """
+        self.columns = tuple([] for _ in FIELDS)
+        self._names = {}  # 大分類・中分類の名称のインターン表
+        self.extend(records)
+
+    def _intern(self, value):
+        if value is None:
+            return None
+        return self._names.setdefault(value, value)
+
+    def append(self, record: TestCaseRecord | tuple):
+        number, section, subsection, testcase, step, expectation = record
+        numbers, sections, subsections, testcases, steps, expectations = self.columns
+        numbers.append(number)
+        sections.append(self._intern(section))
+        subsections.append(self._intern(subsection))
+        testcases.append(testcase)
+        steps.append(step)
+        expectations.append(expectation)
+
+    def extend(self, records: Iterable[TestCaseRecord | tuple]):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __iter__(self) -> Iterator[tuple]:
+        """行データのタプルを順に返します。"""
+        return zip(*self.columns)
+
+    def __getitem__(self, index: int) -> TestCaseRecord:
+        return TestCaseRecord(*(column[index] for column in self.columns))
+
+    def column(self, field: str) -> list:
+        """指定した列の値のリストを返します（コピーしない）。
+
+        Args:
+            field (str):  列のキー（number, section, subsection, testcase, step, expectation）
+        """
+        return self.columns[FIELDS.index(field)]
+
+    def to_dataframe(self, column_names: Iterable[str] | None = None) -> pd.DataFrame:
+        """データフレームに変換します。
+
+        Args:
+            column_names (Iterable[str]):  列名。省略時は列のキーを使用する
+
+        Returns:
+            pd.DataFrame: 変換したデータフレーム
+        """
+        import pandas as pd
+
+        names = list(column_names) if column_names is not None else list(FIELDS)
+        return pd.DataFrame(dict(zip(names, self.columns)), columns=names, dtype=object)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> RecordStore:
+        """データフレームから作成します。列は先頭から FIELDS の順に対応付けます。"""
+        return cls(df.itertuples(index=False, name=None))
+
+    def __str__(self):
+        return self.format_table()
+
+    def format_table(self, column_names: Iterable[str] | None = None, max_rows: int = 10) -> str:
+        """内容を確認用の表形式の文字列にします。
+
+        Args:
+            column_names (Iterable[str]):  見出しに表示する列名
+            max_rows (int):                表示する最大行数。超える場合は先頭と末尾のみ表示する
+
+        Returns:
+            str: 表形式の文字列
+        """
+        names = list(column_names) if column_names is not None else list(FIELDS)
+        total = len(self)
+        if total > max_rows:
+            half = max_rows // 2
+            indices = list(range(half)) + [None] + list(range(total - half, total))
+        else:
+            indices = list(range(total))
+
+        def shorten(value) -> str:
+            text = "None" if value is None else str(value).replace("\n", "\\n")
+            return text if len(text) <= 20 else text[:19] + "…"
+
+        lines = ["\t".join([""] + names)]
+        for index in indices:
+            if index is None:
+                lines.append("...")
+                continue
+            lines.append("\t".join([str(index)] + [shorten(column[index]) for column in self.columns]))
+        lines.append(f"[{total} rows x {len(names)} columns]")
+        return "\n".join(lines)
@@ -0,0 +1,414 @@
+"""
+ローカルのHTTPサーバーとして常駐し、Markdownのテスト仕様書をエクセルファイルに変換します。
+
+Usage:
+    md2excel serve [--port N] [--workers N] [--queue-size N] [--timeout SEC]
+
+    # テスト仕様書を変換する（本文はUTF-8のMarkdown）
+    curl --data-binary @spec.md -o spec.xlsx 'http://127.0.0.1:8765/convert?template=1&test_type=ut'
+    # 任意のテンプレート（既存のExcelファイル）に書き込む
+    curl -F markdown=@spec.md -F template=@試験仕様書.xlsx -o spec.xlsx 'http://127.0.0.1:8765/convert?upsert=1'
+    # 処理件数と所要時間のパーセンタイル
+    curl http://127.0.0.1:8765/metrics
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from md_test_case_to_excel import __version__, instrument
+
+HOST = "127.0.0.1"                              # ローカルからの接続のみ受け付ける
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)   # 同時に変換する数
+DEFAULT_QUEUE_SIZE = 16                         # 変換を待つことのできる数（超えた場合は503を返す）
+DEFAULT_TIMEOUT = 60.0                          # 1件あたりの待ち時間の上限（秒。超えた場合は504を返す）
+MAX_BODY_SIZE = 32 * 1024 * 1024                # リクエストの本文の上限（バイト）
+SOCKET_TIMEOUT = 30.0                           # リクエストの受信・レスポンスの送信の待ち時間の上限（秒）
+LATENCY_WINDOW = 1024                           # 所要時間のパーセンタイルの計算に使う直近の件数
+PERCENTILES = (50, 90, 99)
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# 変換処理に渡すクエリパラメータのうち、真偽値のもの
+_FLAGS = ("template", "no_auto_width", "upsert")
+
+
+class ServerBusy(Exception):
+    """変換を待っている件数が上限に達している場合に送出する例外"""
+
+
+class ConversionPool:
+    """同時に変換する数と、変換を待つ数に上限のあるスレッドプール"""
+
+    __slots__ = ("workers", "queue_size", "_executor", "_slots", "_lock", "_pending", "_running")
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE):
+        """
+        Args:
+            workers (int):     同時に変換する数
+            queue_size (int):  全てのスレッドが変換中の場合に、変換を待つことのできる数
+
+        Notes:
+            - 変換中と変換待ちの合計が workers + queue_size に達している場合、submit は待たずに ServerBusy を送出する
+              （受け付けたリクエストが際限なく溜まらないよう、呼び出し元にすぐに混雑を知らせる）
+        """
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="md2excel-convert")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._pending = 0   # 受け付けて完了していない件数（変換中を含む）
+        self._running = 0   # 変換中の件数
+
+    def submit(self, func, *args, **kwargs) -> Future:
+        """変換処理を受け付けます。上限に達している場合は ServerBusy を送出します。"""
+        if not self._slots.acquire(blocking=False):
+            raise ServerBusy(f"変換を待っている件数が上限（{self.queue_size}件）に達しています")
+        with self._lock:
+            self._pending += 1
+
+        def run():
+            with self._lock:
+                self._running += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        def release(_future):
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+        future = self._executor.submit(run)
+        # 完了・失敗・取り消しのいずれの場合も枠を空ける
+        future.add_done_callback(release)
+        return future
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "queue_size": self.queue_size,
+                    "running": self._running, "queued": self._pending - self._running}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def percentiles(values, points=PERCENTILES) -> dict:
+    """値のパーセンタイル（最近傍順位法）と最大値を返します。値がない場合は空の辞書。"""
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    result = {f"p{point}": ordered[max(math.ceil(point / 100 * len(ordered)) - 1, 0)] for point in points}
+    result["max"] = ordered[-1]
+    return result
+
+
+class Metrics:
+    """リクエストの件数と所要時間、変換処理の計測結果の集計"""
+
+    __slots__ = ("started", "requests", "statuses", "latencies", "queue_waits", "report", "_lock")
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.started = time.time()
+        self.requests = 0
+        self.statuses: dict[int, int] = {}
+        self.latencies = deque(maxlen=window)     # 変換のリクエストの受信から送信までの時間（秒）
+        self.queue_waits = deque(maxlen=window)   # 変換を受け付けてから開始するまでの時間（秒）
+        self.report = instrument.Report()         # 変換処理ごとの所要時間とカウンターの合計
+        self._lock = threading.Lock()
+
+    def observe(self, status: int, latency: float | None = None, queue_wait: float | None = None,
+                report: instrument.Report | None = None):
+        """1件のリクエストの結果を記録します。"""
+        with self._lock:
+            self.requests += 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if latency is not None:
+                self.latencies.append(latency)
+            if queue_wait is not None:
+                self.queue_waits.append(queue_wait)
+            if report is not None:
+                self.report.merge(report)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            latencies, queue_waits = list(self.latencies), list(self.queue_waits)
+            return {
+                "uptime": time.time() - self.started,
+                "requests": self.requests,
+                "status": {str(status): n for status, n in sorted(self.statuses.items())},
+                "latency_ms": {key: value * 1000 for key, value in percentiles(latencies).items()},
+                "queue_wait_ms": {key: value * 1000 for key, value in percentiles(queue_waits).items()},
+                "samples": len(latencies),
+                **self.report.to_dict(),
+            }
+
+
+class ConversionService:
+    """設定情報・テンプレート・変換処理のモジュールを読み込んだまま、変換のリクエストを処理するクラス"""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            workers (int):       同時に変換する数
+            queue_size (int):    変換を待つことのできる数
+            timeout (float):     1件あたりの待ち時間の上限（秒）
+
+        Notes:
+            - パッケージのルート・変換処理のモジュール（openpyxlなど）・同梱のテンプレートは起動時に一度だけ読み込む
+            - 設定ファイルはリクエストごとに変更を確認し、変更されていれば読み込み直す（変更がなければ読み込み済みのものを使う）
+        """
+        from md_test_case_to_excel.converter import find_package_root
+
+        self.package_root = find_package_root()
+        self.config_path = self.package_root / "config.yaml"
+        self.timeout = timeout
+        self.pool = ConversionPool(workers, queue_size)
+        self.metrics = Metrics()
+
+    def warm(self):
+        """小さなテスト仕様書を変換し、モジュール・設定情報・正規表現・テンプレートを読み込んでおきます。"""
+        self._convert("## 準備\n### 準備\n#### 準備\n1. 起動する\n* [ ] 起動すること\n", {"template": True})
+
+    def _convert(self, markdown: bytes | str, options: dict, submitted: float | None = None):
+        """変換処理（変換用のスレッドで実行する）。
+
+        Returns:
+            tuple: (エクセルファイルの内容, 変換待ちの時間（秒）, 計測結果)
+        """
+        from md_test_case_to_excel.config_loader import load_config
+        from md_test_case_to_excel.converter import convert_markdown
+
+        queue_wait = time.perf_counter() - submitted if submitted is not None else None
+        with instrument.recording() as report:
+            with instrument.phase("config"):
+                config = load_config(self.config_path)
+            content = convert_markdown(markdown, config=config, package_root=self.package_root, **options)
+        return content, queue_wait, report
+
+    def submit(self, markdown: bytes, options: dict) -> Future:
+        """変換を受け付けます。上限に達している場合は ServerBusy を送出します。"""
+        return self.pool.submit(self._convert, markdown, options, time.perf_counter())
+
+    def metrics_dict(self) -> dict:
+        return {"version": __version__, **self.metrics.to_dict(), "pool": self.pool.stats()}
+
+    def shutdown(self):
+        self.pool.shutdown()
+
+
+def _parse_multipart(content_type: str, body: bytes) -> dict[str, bytes]:
+    """multipart/form-data の本文を、フィールド名 -> 内容 の辞書にします。"""
+    from email.parser import BytesParser
+    from email.policy import HTTP
+
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body)
+    if not message.is_multipart():
+        raise ValueError("multipart/form-data の本文を解析できません")
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name:
+            fields[name] = part.get_payload(decode=True)
+    return fields
+
+
+def _parse_options(query: str, template: bytes | None) -> dict:
+    """クエリパラメータを変換処理のオプションにします。不正な値の場合は ValueError を送出します。"""
+    from md_test_case_to_excel.converter import TEST_TYPES
+    from md_test_case_to_excel.excel import ENGINES
+
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    unknown = params.keys() - {"test_type", "engine", *_FLAGS}
+    if unknown:
+        raise ValueError(f"不明なパラメータです: {', '.join(sorted(unknown))}")
+    options = {flag: params.get(flag, "").lower() in ("1", "true", "yes") for flag in _FLAGS}
+    options["test_type"] = params.get("test_type", "test")
+    if options["test_type"] not in TEST_TYPES:
+        raise ValueError(f"test_type は {', '.join(TEST_TYPES)} のいずれかを指定してください")
+    options["engine"] = params.get("engine", "openpyxl")
+    if options["engine"] not in ENGINES:
+        raise ValueError(f"engine は {', '.join(ENGINES)} のいずれかを指定してください")
+    # テンプレートが送られた場合はそれを、template=1 の場合は同梱のテンプレートを使う
+    options["template"] = template if template is not None else (options["template"] or None)
+    return options
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = f"md2excel/{__version__}"
+    timeout = SOCKET_TIMEOUT
+
+    @property
+    def service(self) -> ConversionService:
+        return self.server.service
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, data: dict, headers: dict | None = None):
+        self._send(status, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8",
+                   headers)
+
+    def _send_error(self, status: HTTPStatus, message: str, headers: dict | None = None):
+        self.service.metrics.observe(status)
+        self._send_json(status, {"error": message}, headers)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/metrics":
+            self._send_json(HTTPStatus.OK, self.service.metrics_dict())
+        elif path == "/healthz":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"見つかりません: {path}"})
+
+    def do_POST(self):
+        from md_test_case_to_excel.excel import ExcelWriteError
+
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        if url.path != "/convert":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"見つかりません: {url.path}"})
+            return
+
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "Content-Length を指定してください")
+            return
+        try:
+            length = int(length)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            # 本文を読まずに返すため、残りの本文が次のリクエストとして解釈されないよう接続を閉じる
+            self.close_connection = True
+            self._send_error(HTTPStatus.BAD_REQUEST, f"Content-Length が不正です: {length}")
+            return
+        if length > MAX_BODY_SIZE:
+            self.close_connection = True
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                             f"本文が上限（{MAX_BODY_SIZE // (1024 * 1024)} MiB）を超えています")
+            return
+        body = self.rfile.read(length)
+
+        try:
+            content_type = self.headers.get("Content-Type", "")
+            template = None
+            if content_type.startswith("multipart/form-data"):
+                fields = _parse_multipart(content_type, body)
+                if "markdown" not in fields:
+                    raise ValueError("markdown フィールドがありません")
+                body, template = fields["markdown"], fields.get("template")
+            options = _parse_options(url.query, template)
+        except ValueError as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+
+        try:
+            future = self.service.submit(body, options)
+        except ServerBusy as e:
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, str(e), {"Retry-After": "1"})
+            return
+
+        try:
+            content, queue_wait, report = future.result(timeout=self.service.timeout)
+        except FutureTimeoutError:
+            # 変換を開始していなければ取り消す（開始済みの変換は完了まで枠を使い続ける）
+            future.cancel()
+            self._send_error(HTTPStatus.GATEWAY_TIMEOUT, f"変換が {self.service.timeout} 秒以内に完了しませんでした")
+            return
+        except ExcelWriteError as e:
+            # 書き込み処理の予期しないエラー（ValueError の派生クラスのため、先に判定する）
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"変換に失敗しました: {e}")
+            return
+        except ValueError as e:
+            # 不正なMarkdownやテンプレート（UTF-8でない、書き込めない文字を含む、エクセルファイルでないなど）
+            self._send_error(HTTPStatus.BAD_REQUEST, f"変換に失敗しました: {e}")
+            return
+        except Exception as e:
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"変換に失敗しました: {type(e).__name__}: {e}")
+            return
+
+        self._send(HTTPStatus.OK, content, XLSX_CONTENT_TYPE)
+        self.service.metrics.observe(HTTPStatus.OK, time.perf_counter() - start, queue_wait, report)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, service: ConversionService):
+        super().__init__((HOST, port), _Handler)
+        self.service = service
+
+
+def serve(port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE,
+          timeout: float = DEFAULT_TIMEOUT):
+    """変換サーバーを起動します。Ctrl+C で終了します。
+
+    Args:
+        port (int):         待ち受けるポート（0の場合は空いているポート）
+        workers (int):      同時に変換する数
+        queue_size (int):   変換を待つことのできる数
+        timeout (float):    1件あたりの待ち時間の上限（秒）
+
+    Notes:
+        - 127.0.0.1 のみで待ち受け、外部のサービスは使わない
+        - 接続ごとのスレッドはリクエストの受信と送信のみを行い、変換は上限のあるスレッドプールで行う
+    """
+    service = ConversionService(workers, queue_size, timeout)
+    start = time.perf_counter()
+    service.warm()
+    server = _Server(port, service)
+    print(f"http://{HOST}:{server.server_port} で待ち受けています（準備: {time.perf_counter() - start:.2f}秒、"
+          f"同時変換数: {workers}、待機数の上限: {queue_size}）。Ctrl+C で終了します。", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    print("サーバーを終了しました。")
+
+
+def main(argv: list[str] | None = None):
+    """md2excel serve のエントリーポイント"""
+    parser = argparse.ArgumentParser(prog="md2excel serve",
+                                     description="ローカルのHTTPサーバーとして常駐し、テスト仕様書を変換します。")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"待ち受けるポート（既定: {DEFAULT_PORT}）")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"同時に変換する数（既定: {DEFAULT_WORKERS}）")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"変換を待つことのできる数。超えた場合は503を返す（既定: {DEFAULT_QUEUE_SIZE}）")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"1件あたりの待ち時間の上限（秒）。超えた場合は504を返す（既定: {DEFAULT_TIMEOUT:g}）")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.queue_size < 0:
+        parser.error("--workers は1以上、--queue-size は0以上を指定してください")
+    serve(args.port, args.workers, args.queue_size, args.timeout)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import re
+import time
+import zipfile
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterable
+from xml.sax.saxutils import escape, quoteattr
+
+if TYPE_CHECKING:
+    from md_test_case_to_excel.layout import CellStyle
+
+# 名前空間
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# XMLに書き込めない制御文字（タブ・改行・復帰を除く）
+_ILLEGAL_CHARACTERS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# 書き込み先のシートのXMLにまとめて渡す行数（呼び出し回数を減らすため、この行数ずつ結合して書き込む）
+_FLUSH_ROWS = 512
+
+# 既定の書式（書式を指定しないセル、フォントを指定しないスタイルで使う。openpyxlの既定値と同じ）
+_DEFAULT_FONT = '<font><name val="Calibri"/><family val="2"/><color theme="1"/><sz val="11"/><scheme val="minor"/></font>'
+_DEFAULT_FILLS = ('<fill><patternFill/></fill>', '<fill><patternFill patternType="gray125"/></fill>')
+_DEFAULT_BORDER = '<border><left/><right/><top/><bottom/><diagonal/></border>'
+
+
+def _number(value: float) -> str:
+    """列幅・行高をXMLの属性値にします（整数の場合は小数点以下を付けない）。"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _tostring(style_object) -> str:
+    """openpyxlの書式オブジェクト（Font, PatternFill, Border, Alignment）をXMLの文字列にします。"""
+    from openpyxl.xml.functions import tostring
+
+    return tostring(style_object.to_tree()).decode("utf-8")
+
+
+class _StyleTable:
+    """ワークブックで使う書式の一覧（styles.xml）。同じ書式は1つにまとめる"""
+
+    __slots__ = ("fonts", "fills", "borders", "xfs", "_indexes")
+
+    def __init__(self):
+        self.fonts = [_DEFAULT_FONT]
+        self.fills = list(_DEFAULT_FILLS)
+        self.borders = [_DEFAULT_BORDER]
+        self.xfs = ['<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>']
+        self._indexes = {}  # (一覧のid, 書式のXML) -> 一覧での位置
+
+    def _add(self, items: list[str], xml: str) -> int:
+        key = (id(items), xml)
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = len(items)
+            items.append(xml)
+        return index
+
+    def add(self, style: CellStyle) -> int:
+        """セルのスタイルを登録し、セルの s 属性に指定する番号を返します。"""
+        font_id = self._add(self.fonts, _tostring(style.font)) if style.font is not None else 0
+        fill_id = self._add(self.fills, _tostring(style.fill)) if style.fill is not None else 0
+        border_id = self._add(self.borders, _tostring(style.border)) if style.border is not None else 0
+        applied = "".join(f' {name}="1"' for name, used in (("applyFont", font_id), ("applyFill", fill_id),
+                                                           ("applyBorder", border_id)) if used)
+        if style.alignment is not None:
+            xf = (f'<xf numFmtId="0" fontId="{font_id}" fillId="{fill_id}" borderId="{border_id}" xfId="0"'
+                  f'{applied} applyAlignment="1">{_tostring(style.alignment)}</xf>')
+        else:
+            xf = f'<xf numFmtId="0" fontId="{font_id}" fillId="{fill_id}" borderId="{border_id}" xfId="0"{applied}/>'
+        return self._add(self.xfs, xf)
+
+    def count(self) -> int:
+        """既定の書式を除いて登録したフォント・塗りつぶし・枠線の数"""
+        return len(self.fonts) - 1 + len(self.fills) - len(_DEFAULT_FILLS) + len(self.borders) - 1
+
+    def to_xml(self) -> str:
+        def collection(tag, items):
+            return f'<{tag} count="{len(items)}">{"".join(items)}</{tag}>'
+
+        return (f'{_XML_DECLARATION}<styleSheet xmlns="{_MAIN_NS}">'
+                f'{collection("fonts", self.fonts)}{collection("fills", self.fills)}'
+                f'{collection("borders", self.borders)}'
+                '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+                f'{collection("cellXfs", self.xfs)}'
+                '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+                '</styleSheet>')
+
+
+class SheetStream:
+    """1シート分のXMLを、行ごとにzipファイルへ書き出すクラス（SpreadsheetMLWriter.sheet で作成する）"""
+
+    __slots__ = ("letters", "rows", "_stream", "_buffer", "_pending")
+
+    def __init__(self, stream: BinaryIO, letters: list[str]):
+        self.letters = letters  # 列記号（A, B, ...）。write_row のセルはこの順に対応付ける
+        self.rows = 0           # 書き込んだ行数
+        self._stream = stream
+        self._buffer = []
+        self._pending = 0
+
+    def write_row(self, row_idx: int, cells: Iterable[tuple[int, object]], height: float | None = None):
+        """1行を書き込みます。
+
+        Args:
+            row_idx (int):      行番号（1始まり。昇順に書き込む）
+            cells (Iterable):   (スタイルの番号, 値) を列の順に並べたもの。値がNoneまたは空文字列のセルは書式のみ設定する
+            height (float):     行高（pt）。Noneの場合は既定の行高
+        """
+        r = str(row_idx)
+        parts = self._buffer
+        parts.append(f'<row r="{r}" ht="{_number(height)}" customHeight="1">' if height is not None
+                     else f'<row r="{r}">')
+        for letter, (style, value) in zip(self.letters, cells):
+            if value is None or value == "":
+                # 空文字列はopenpyxlと同じく値のないセルにする
+                parts.append(f'<c r="{letter}{r}" s="{style}"/>')
+            elif isinstance(value, str):
+                if _ILLEGAL_CHARACTERS.search(value):
+                    raise ValueError(f"セル {letter}{r} の値にエクセルファイルに書き込めない文字が含まれています: {value!r}")
+                space = ' xml:space="preserve"' if value[:1].isspace() or value[-1:].isspace() else ""
+                parts.append(f'<c r="{letter}{r}" s="{style}" t="inlineStr"><is><t{space}>{escape(value)}</t></is></c>')
+            elif isinstance(value, bool):
+                parts.append(f'<c r="{letter}{r}" s="{style}" t="b"><v>{int(value)}</v></c>')
+            else:
+                parts.append(f'<c r="{letter}{r}" s="{style}"><v>{value}</v></c>')
+        parts.append("</row>")
+        self.rows += 1
+        self._pending += 1
+        if self._pending >= _FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._stream.write("".join(self._buffer).encode("utf-8"))
+            self._buffer.clear()
+        self._pending = 0
+
+
+class SpreadsheetMLWriter:
+    """openpyxlのワークブックを作らずに、xlsxファイル（SpreadsheetML）を直接書き出すクラス
+
+    Notes:
+        - シートのXMLは行ごとにzipファイルへ書き出すため、行数が増えてもメモリ使用量はほぼ一定
+        - 書式は登録したスタイル（ヘッダー・本文・G列からM列・マージしたセル）のみの小さな一覧にする
+        - 文字列はセルに直接書き込む（inlineStr。openpyxlの出力と同じ）
+    """
+
+    def __init__(self, output: str | Path | BinaryIO):
+        """
+        Args:
+            output (Path):  出力先のパス、または書き込み先のストリーム
+        """
+        self._zip = zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED)
+        self._styles = _StyleTable()
+        self._sheets: list[str] = []  # シート名
+
+    def style(self, style: CellStyle) -> int:
+        """セルのスタイルを登録し、SheetStream.write_row に渡す番号を返します。"""
+        return self._styles.add(style)
+
+    def style_count(self) -> int:
+        return self._styles.count()
+
+    def sheet(self, name: str, column_widths: Iterable[tuple[str, int, float]], merged_ranges: Iterable[str] = (),
+              dimension: str | None = None) -> _SheetContext:
+        """シートを追加し、行を書き込む SheetStream を返します（with 文で使用する）。
+
+        Args:
+            name (str):                 シート名
+            column_widths (Iterable):   (列記号, 列番号, 列幅) を列の順に並べたもの。SheetStream の列もこの順になる
+            merged_ranges (Iterable):   マージ範囲（"B2:B5" など）
+            dimension (str):            使用している範囲（"A1:M100" など）
+        """
+        return _SheetContext(self, name, list(column_widths), list(merged_ranges), dimension)
+
+    def close(self):
+        """ワークブックの残りの部分（ブック・書式・関連付け）を書き込み、zipファイルを閉じます。"""
+        try:
+            self._write_package()
+        finally:
+            self._zip.close()
+
+    def abort(self):
+        """書き込みを中止し、ワークブックの残りの部分を書き込まずにzipファイルを閉じます（書き込みに失敗した場合に使う）。"""
+        self._zip.close()
+
+    def _write_package(self):
+        sheets = "".join(f'<sheet name={quoteattr(name)} sheetId="{i}" r:id="rId{i}"/>'
+                         for i, name in enumerate(self._sheets, 1))
+        sheet_rels = "".join(f'<Relationship Id="rId{i}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                             for i in range(1, len(self._sheets) + 1))
+        sheet_types = "".join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/'
+                              f'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                              for i in range(1, len(self._sheets) + 1))
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        self._write("[Content_Types].xml",
+                    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                    '<Default Extension="xml" ContentType="application/xml"/>'
+                    '<Override PartName="/xl/workbook.xml" '
+                    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                    '<Override PartName="/xl/styles.xml" '
+                    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+                    '<Override PartName="/xl/theme/theme1.xml" '
+                    'ContentType="application/vnd.openxmlformats-officedocument.theme+xml"/>'
+                    '<Override PartName="/docProps/core.xml" '
+                    'ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+                    '<Override PartName="/docProps/app.xml" '
+                    'ContentType="application/vnd.openxmlformats-officedocument.extended-properties+xml"/>'
+                    f'{sheet_types}</Types>')
+        self._write("_rels/.rels",
+                    f'<Relationships xmlns="{_PACKAGE_REL_NS}">'
+                    f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+                    f'<Relationship Id="rId2" Type="{_PACKAGE_REL_NS}/metadata/core-properties" '
+                    'Target="docProps/core.xml"/>'
+                    f'<Relationship Id="rId3" Type="{_REL_NS}/extended-properties" Target="docProps/app.xml"/>'
+                    '</Relationships>')
+        self._write("docProps/app.xml",
+                    '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+                    '<Application>md_test_case_to_excel</Application></Properties>')
+        self._write("docProps/core.xml",
+                    '<cp:coreProperties '
+                    'xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+                    'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+                    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+                    f'<dcterms:created xsi:type="dcterms:W3CDTF">{now}</dcterms:created>'
+                    f'<dcterms:modified xsi:type="dcterms:W3CDTF">{now}</dcterms:modified>'
+                    '</cp:coreProperties>')
+        self._write("xl/workbook.xml",
+                    f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+                    '<bookViews><workbookView activeTab="0"/></bookViews>'
+                    f'<sheets>{sheets}</sheets><calcPr calcId="124519" fullCalcOnLoad="1"/></workbook>')
+        self._write("xl/_rels/workbook.xml.rels",
+                    f'<Relationships xmlns="{_PACKAGE_REL_NS}">{sheet_rels}'
+                    f'<Relationship Id="rId{len(self._sheets) + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+                    f'<Relationship Id="rId{len(self._sheets) + 2}" Type="{_REL_NS}/theme" Target="theme/theme1.xml"/>'
+                    '</Relationships>')
+        self._zip.writestr("xl/styles.xml", self._styles.to_xml())
+        # 既定のフォントの色はテーマの色を参照するため、openpyxlと同じテーマを含める
+        from openpyxl.writer.theme import theme_xml
+
+        self._zip.writestr("xl/theme/theme1.xml", theme_xml)
+
+    def _write(self, name: str, xml: str):
+        self._zip.writestr(name, _XML_DECLARATION + xml)
+
+
+class _SheetContext:
+    """SpreadsheetMLWriter.sheet の戻り値。シートのXMLの先頭と末尾を書き込む"""
+
+    __slots__ = ("book", "name", "column_widths", "merged_ranges", "dimension", "_entry", "_rows")
+
+    def __init__(self, book: SpreadsheetMLWriter, name: str, column_widths: list, merged_ranges: list,
+                 dimension: str | None):
+        self.book = book
+        self.name = name
+        self.column_widths = column_widths
+        self.merged_ranges = merged_ranges
+        self.dimension = dimension
+        self._entry = None
+        self._rows = None
+
+    def __enter__(self) -> SheetStream:
+        book = self.book
+        book._sheets.append(self.name)
+        self._entry = book._zip.open(f"xl/worksheets/sheet{len(book._sheets)}.xml", "w", force_zip64=True)
+        cols = "".join(f'<col min="{index}" max="{index}" width="{_number(width)}" customWidth="1"/>'
+                       for _, index, width in self.column_widths)
+        dimension = f'<dimension ref="{self.dimension}"/>' if self.dimension else ""
+        self._entry.write((f'{_XML_DECLARATION}<worksheet xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">{dimension}'
+                           '<sheetViews><sheetView workbookViewId="0"><selection activeCell="A1" sqref="A1"/>'
+                           '</sheetView></sheetViews><sheetFormatPr baseColWidth="8" defaultRowHeight="15"/>'
+                           f'{f"<cols>{cols}</cols>" if cols else ""}<sheetData>').encode("utf-8"))
+        self._rows = SheetStream(self._entry, [letter for letter, _, _ in self.column_widths])
+        return self._rows
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            if exc_type is None:
+                self._rows.flush()
+                merges = "".join(f'<mergeCell ref="{ref}"/>' for ref in self.merged_ranges)
+                if merges:
+                    merges = f'<mergeCells count="{len(self.merged_ranges)}">{merges}</mergeCells>'
+                self._entry.write((f'</sheetData>{merges}'
+                                   '<pageMargins left="0.75" right="0.75" top="1" bottom="1" header="0.5" footer="0.5"/>'
+                                   '</worksheet>').encode("utf-8"))
+        finally:
+            self._entry.close()
+        return False
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import pickle
+import threading
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+
+from md_test_case_to_excel.cache import file_digest
+
+# J列（追加列の開始位置）
+ADDITIONAL_START_COLUMN = 10
+
+
+class _CachedTemplate:
+    """キャッシュしたテンプレート"""
+
+    __slots__ = ("signature", "digest", "data")
+
+    def __init__(self, signature: tuple[int, int] | None, digest: str, data: bytes | None):
+        self.signature = signature  # 読み込んだ時点のファイルの情報（更新日時, サイズ）。メモリ上のテンプレートはNone
+        self.digest = digest        # 読み込んだ時点のファイルの内容のハッシュ値
+        self.data = data            # 読み込んだワークブックをシリアライズしたもの（シリアライズできない場合はNone）
+
+
+def _clone(data: bytes):
+    """シリアライズしたワークブックを復元します。"""
+    workbook = pickle.loads(data)
+    # 行・列の情報（DimensionHolder）は defaultdict の派生クラスで、pickle では要素を作る関数が復元されないため設定し直す
+    for worksheet in workbook.worksheets:
+        worksheet.row_dimensions.default_factory = worksheet._add_row
+        worksheet.column_dimensions.default_factory = worksheet._add_column
+    return workbook
+
+
+class TemplateCache:
+
+    def __init__(self, max_entries: int = 4):
+        """テンプレートのワークブックを一度だけ読み込み、出力ごとに複製を渡すキャッシュ
+
+        Args:
+            max_entries (int):  保持するテンプレートの数の上限（超えた分は最後に使われたのが古いものから破棄する）
+
+        Notes:
+            - 読み込んだワークブックを pickle でシリアライズして保持し、複製は pickle から復元する
+              （zipとXMLの解析をやり直すより1桁以上速く、deepcopy と違いセルの書式も欠けない）
+            - ファイルの更新日時・サイズが変わった場合は内容のハッシュ値を確認し、内容も変わっていれば読み込み直す
+            - メモリ上のテンプレート（load_bytes）は内容のハッシュ値で識別する
+            - 複数のスレッドから使用できる
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Path | str, _CachedTemplate] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, template_path: str | Path):
+        """テンプレートのワークブックの複製を返します。
+
+        Args:
+            template_path (Path):  テンプレートファイルのパス
+
+        Returns:
+            Workbook: 出力ごとに変更してよいワークブック（呼び出しごとに別のオブジェクト）
+        """
+        path = Path(template_path).resolve()
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.signature != signature:
+                # 更新日時が変わっても内容が同じであれば読み込み直さない
+                digest = file_digest(path)
+                entry = _CachedTemplate(signature, digest, entry.data) if digest == entry.digest else None
+                if entry is not None:
+                    self._entries[path] = entry
+            if entry is not None:
+                self._entries.move_to_end(path)
+                if entry.data is not None:
+                    return _clone(entry.data)
+
+        from openpyxl import load_workbook
+
+        if entry is not None:
+            return load_workbook(path)
+
+        workbook = load_workbook(path)
+        self._store(path, signature, file_digest(path), workbook)
+        # キャッシュしたものと共有しないよう、読み込んだワークブックはそのまま返す
+        return workbook
+
+    def load_bytes(self, content: bytes):
+        """メモリ上のテンプレート（エクセルファイルの内容）からワークブックの複製を返します。
+
+        Args:
+            content (bytes):  テンプレートのエクセルファイルの内容
+
+        Returns:
+            Workbook: 出力ごとに変更してよいワークブック（呼び出しごとに別のオブジェクト）
+
+        Raises:
+            ValueError: エクセルファイルとして読み込めない場合
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        key = f"sha256:{digest}"
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if entry.data is not None:
+                    return _clone(entry.data)
+
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+
+        try:
+            workbook = load_workbook(io.BytesIO(content))
+        except (zipfile.BadZipFile, InvalidFileException, KeyError) as e:
+            # zipファイルでない、ワークブックの構成要素が足りないなど
+            raise ValueError(f"テンプレートをエクセルファイルとして読み込めません: {e}") from e
+        if entry is None:
+            self._store(key, None, digest, workbook)
+        return workbook
+
+    def _store(self, key: Path | str, signature: tuple[int, int] | None, digest: str, workbook):
+        """読み込んだワークブックをシリアライズして保持します。"""
+        try:
+            data = pickle.dumps(workbook, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            data = None  # シリアライズできない内容を含む場合は毎回読み込む
+        with self._lock:
+            self._entries[key] = _CachedTemplate(signature, digest, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """保持しているテンプレートを破棄します。"""
+        with self._lock:
+            self._entries.clear()
+
+
+# 既定のテンプレートのキャッシュ（プロセス内で共有する）
+template_cache = TemplateCache()
+
+
+class TemplateSnapshot:
+    """テンプレートのシートから読み取った既存データ"""
+
+    __slots__ = ("last_row", "max_column", "additional")
+
+    def __init__(self, last_row: int, max_column: int, additional: dict):
+        self.last_row = last_row      # A列が空になる最初の行（データの書き込み開始行）
+        self.max_column = max_column  # 読み取り時点のシートの最大列
+        self.additional = additional  # NO -> {列番号: 値}（J列以降の内容）
+
+    @classmethod
+    def read(cls, worksheet, preserve_additional_columns: bool = False) -> TemplateSnapshot:
+        """シートの既存データを、列を絞った values_only の走査でまとめて読み取ります。
+
+        Args:
+            worksheet:                          openpyxlのワークシートオブジェクト
+            preserve_additional_columns (bool): J列以降の内容を読み取るかどうか
+
+        Returns:
+            TemplateSnapshot: 読み取った既存データ
+
+        Notes:
+            - 最終行はA列のみを走査して求め、その値（NO）をJ列以降の索引のキーにする
+            - J列以降は範囲を絞った1回の走査でまとめて読み取る。NOが重複する場合は後の行の内容を使う
+        """
+        max_column = worksheet.max_column
+
+        # 既存データの最終行を取得 (ヘッダー行を考慮)
+        numbers = []
+        for (number,) in worksheet.iter_rows(min_col=1, max_col=1, values_only=True):
+            if number is None:
+                break
+            numbers.append(number)
+        last_row = len(numbers) + 1
+
+        additional = {}
+        if preserve_additional_columns and last_row > 2 and max_column >= ADDITIONAL_START_COLUMN:
+            # 2行目から最終行まで（ヘッダー行はスキップ）
+            rows = worksheet.iter_rows(min_row=2, max_row=last_row - 1, min_col=ADDITIONAL_START_COLUMN,
+                                       max_col=max_column, values_only=True)
+            for number, row in zip(numbers[1:], rows):
+                additional[number] = {col_idx: value
+                                      for col_idx, value in enumerate(row, ADDITIONAL_START_COLUMN)
+                                      if value is not None}
+        return cls(last_row, max_column, additional)
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING, Sequence
+
+from md_test_case_to_excel.merges import MergeRange
+
+if TYPE_CHECKING:
+    from md_test_case_to_excel.layout import LayoutPlan, SheetStyles
+    from md_test_case_to_excel.metrics import SheetMetrics
+    from md_test_case_to_excel.records import RecordStore
+
+
+def case_key(section, subsection, testcase) -> str:
+    """大分類・中分類・小分類からテストケースの識別キーを求めます。
+
+    Notes:
+        - 階層化されたNO（1-2-3）はテストケースの追加・削除で変わるため、キーには含めない
+    """
+    text = "\x1f".join("" if value is None else str(value) for value in (section, subsection, testcase))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def case_identities(sections: Sequence, subsections: Sequence, testcases: Sequence) -> list[tuple[str, int]]:
+    """行ごとの識別キーを返します。同じキーが複数ある場合は出現順の番号で区別します。"""
+    occurrences = {}
+    identities = []
+    for section, subsection, testcase in zip(sections, subsections, testcases):
+        key = case_key(section, subsection, testcase)
+        count = occurrences.get(key, 0)
+        occurrences[key] = count + 1
+        identities.append((key, count))
+    return identities
+
+
+class UpsertResult:
+    """差分更新の結果"""
+
+    __slots__ = ("updated", "inserted", "deleted", "moved", "unchanged")
+
+    def __init__(self):
+        self.updated = 0    # 内容を書き換えた行数
+        self.inserted = 0   # 追加した行数
+        self.deleted = 0    # 削除した行数
+        self.moved = 0      # 内容は同じで位置のみ変わった行数
+        self.unchanged = 0  # 変更のなかった行数
+
+    def __str__(self):
+        return (f"更新: {self.updated}行, 追加: {self.inserted}行, 削除: {self.deleted}行, "
+                f"移動: {self.moved}行, 変更なし: {self.unchanged}行")
+
+
+def _shift_cells(worksheet, row_map: dict[int, int], deleted_rows: set[int], last_row: int, delta: int):
+    """セルと行の高さを新しい行位置に移動します。
+
+    Args:
+        worksheet:           openpyxlのワークシートオブジェクト
+        row_map (dict):      移動する行 (旧行番号 -> 新行番号)
+        deleted_rows (set):  削除する行番号
+        last_row (int):      既存データの次の行。この行以降はまとめて delta 行ずらす
+        delta (int):         データ行数の増減
+    """
+    def target(row: int) -> int | None:
+        if row in deleted_rows:
+            return None
+        if row >= last_row:
+            return row + delta
+        return row_map.get(row, row)
+
+    cells = worksheet._cells
+    moving = [key for key in cells if key[0] in row_map or key[0] in deleted_rows or (delta and key[0] >= last_row)]
+    popped = [(key, cells.pop(key)) for key in moving]
+    for (row, column), cell in popped:
+        new_row = target(row)
+        if new_row is not None:
+            cell.row = new_row
+            cells[(new_row, column)] = cell
+
+    dimensions = worksheet.row_dimensions
+    moving = [row for row in dimensions if row in row_map or row in deleted_rows or (delta and row >= last_row)]
+    popped = [(row, dimensions.pop(row)) for row in moving]
+    for row, dimension in popped:
+        new_row = target(row)
+        if new_row is not None:
+            dimension.index = new_row
+            dimensions[new_row] = dimension
+
+
+def upsert_sheet(worksheet, records: RecordStore, layout: LayoutPlan, styles: SheetStyles,
+                 merge_ranges: Sequence[MergeRange], last_row: int, last_col_idx: int,
+                 metrics: SheetMetrics | None = None) -> UpsertResult:
+    """既存のシートを、解析結果との差分のみ書き換えて更新します。
+
+    Args:
+        worksheet:                       openpyxlのワークシートオブジェクト
+        records (RecordStore):           解析結果のテストケース
+        layout (LayoutPlan):             列のレイアウト
+        styles (SheetStyles):            ワークブックに登録済みのスタイル
+        merge_ranges (Sequence[MergeRange]): 解析結果から求めたマージ範囲
+        last_row (int):                  既存データの次の行（A列が空になる最初の行）
+        last_col_idx (int):              枠線を設定する最終列（新しく追加する行のみ）
+        metrics (SheetMetrics):          行の高さ。Noneの場合は行の高さを設定しない
+
+    Returns:
+        UpsertResult: 更新結果
+
+    Notes:
+        - 既存の行とテストケースは大分類・中分類・小分類の識別キーで対応付ける（NOは使わない）
+        - 対応付いた行は試験結果（G列以降）ごと新しい位置に移動し、A列からF列のうち値が変わったセルのみ書き換える
+        - マージ範囲は大分類・中分類・小分類の列のみ差分を反映する。それ以外の列のマージ範囲は変更しない
+    """
+    result = UpsertResult()
+    # 1行目がヘッダーの場合は2行目から、ヘッダーのないシートは1行目からをデータ行とする
+    header_cell = worksheet._cells.get((1, 1))
+    first_row = 2 if header_cell is not None and header_cell.value == layout.columns[0].name else 1
+    last_row = max(last_row, first_row)
+    column_count = len(layout.columns)
+    merge_indices = {column.index for column in layout.multi_idx_columns}
+
+    # 既存データ（A列からF列）を読み取る
+    old_count = last_row - first_row
+    old_rows = []
+    if old_count > 0:
+        old_rows = [list(row) for row in worksheet.iter_rows(min_row=first_row, max_row=last_row - 1,
+                                                              max_col=column_count, values_only=True)]
+
+    # 既存のマージ範囲。結合されたセル（値はNone）には左上のセルの値を補ってキーを求める
+    old_merged = {}  # (旧データ行, 列番号) -> 結合範囲の最終行かどうか
+    old_ranges = {}  # 範囲の文字列 -> MergedCellRange
+    for cell_range in worksheet.merged_cells.ranges:
+        column_index = cell_range.min_col
+        if (column_index != cell_range.max_col or column_index not in merge_indices
+                or cell_range.min_row < first_row or cell_range.max_row >= last_row):
+            continue
+        old_ranges[cell_range.coord] = cell_range
+        top_value = old_rows[cell_range.min_row - first_row][column_index - 1]
+        for row_idx in range(cell_range.min_row + 1, cell_range.max_row + 1):
+            old_rows[row_idx - first_row][column_index - 1] = top_value
+            old_merged[(row_idx - first_row, column_index)] = row_idx == cell_range.max_row
+
+    new_merged = {}  # (新データ行, 列番号) -> (範囲の文字列, 結合範囲の最終行かどうか)
+    new_ranges = {merge_range.coord(first_row): merge_range for merge_range in merge_ranges}
+    for coord, merge_range in new_ranges.items():
+        for i in range(merge_range.start + 1, merge_range.end + 1):
+            new_merged[(i, merge_range.column.index)] = (coord, i == merge_range.end)
+
+    # 識別キーで既存の行とテストケースを対応付ける
+    old_index = {identity: i for i, identity in enumerate(
+        case_identities(*([row[k] for row in old_rows] for k in (1, 2, 3))))}
+    new_to_old = [old_index.pop(identity, None) for identity in case_identities(*records.columns[1:4])]
+
+    # 行の移動・削除（試験結果の列も含めて行ごと移動する）
+    row_map = {first_row + i: first_row + j for j, i in enumerate(new_to_old) if i is not None and i != j}
+    deleted_rows = {first_row + i for i in old_index.values()}
+    delta = len(records) - old_count
+    if row_map or deleted_rows or delta:
+        _shift_cells(worksheet, row_map, deleted_rows, last_row, delta)
+    result.deleted = len(deleted_rows)
+
+    # マージ範囲の差分を反映する（新しい範囲は行を書き換えたあとに worksheet.merge_cells で設定する）
+    registered = worksheet.merged_cells.ranges
+    for coord, cell_range in old_ranges.items():
+        if coord not in new_ranges:
+            registered.discard(cell_range)
+    if delta:
+        # 既存データより下にあるマージ範囲をずらす（範囲のハッシュが変わるため、一度取り除いてから登録し直す）
+        below = [cell_range for cell_range in registered if cell_range.min_row >= last_row]
+        registered.difference_update(below)
+        for cell_range in below:
+            cell_range.shift(row_shift=delta)
+        registered.update(below)
+
+    body_styles = list(zip(layout.columns, styles.body))
+    cells = worksheet._cells
+    remerge = set()  # 結合されるセルを作り直すマージ範囲（既存の範囲のうち、セルの状態が変わったもの）
+    for j, row in enumerate(records):
+        row_idx = first_row + j
+        i = new_to_old[j]
+        changed = False
+        for (column, style), value in zip(body_styles, row):
+            coord, is_last = new_merged.get((j, column.index), (None, None))
+            if i is None:
+                current_is_last = None
+            else:
+                current_is_last = old_merged.get((i, column.index))
+                if is_last is None and current_is_last is None and old_rows[i][column.index - 1] == value:
+                    continue
+                if is_last is not None and current_is_last == is_last:
+                    continue
+            changed = True
+
+            if is_last is not None:
+                # 結合されるセルはマージ範囲を設定するときに作り直す
+                remerge.add(coord)
+                continue
+            if current_is_last is not None:
+                # 結合されていたセルを通常のセルに戻す
+                cells.pop((row_idx, column.index), None)
+            cell = worksheet.cell(row=row_idx, column=column.index)
+            cell.value = value
+            if i is None or current_is_last is not None:
+                style.apply(cell)
+
+        if i is None:
+            # 追加した行の試験結果の列に枠線を設定
+            for col_idx in range(7, last_col_idx + 1):
+                styles.additional.apply(worksheet.cell(row=row_idx, column=col_idx))
+            result.inserted += 1
+        elif changed:
+            result.updated += 1
+        elif i != j:
+            result.moved += 1
+        else:
+            result.unchanged += 1
+
+        if changed and metrics is not None:
+            worksheet.row_dimensions[row_idx].height = metrics.row_heights[j]
+
+    for coord in new_ranges:
+        if coord in old_ranges:
+            if coord not in remerge:
+                continue
+            registered.discard(old_ranges[coord])
+        worksheet.merge_cells(coord)
+    return result
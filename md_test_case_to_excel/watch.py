@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import os
+import time
+import traceback
+from pathlib import Path
+from typing import Iterable
+
+from md_test_case_to_excel.cache import DEFAULT_MAX_SIZE_MB, BuildCache
+
+# 監視の既定値（秒）
+DEFAULT_INTERVAL = 0.25  # ファイルの状態を確認する間隔
+DEFAULT_DEBOUNCE = 0.2   # 最後の変更からこの時間だけ変更がなければ再生成する（保存途中のファイルを変換しないため）
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    """変更の検出に使うファイルの情報（更新日時, サイズ）を返します。ファイルがない場合はNone。"""
+    try:
+        stat = path.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _iter_markdown_files(directory: Path) -> Iterable[Path]:
+    """ディレクトリ配下のMarkdownファイルを再帰的に列挙します（隠しディレクトリは除く）。"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_markdown_files(Path(entry.path))
+            elif entry.name.endswith(".md") and entry.is_file():
+                yield Path(entry.path)
+
+
+class Watcher:
+
+    def __init__(self, targets: Iterable[str | Path], interval: float = DEFAULT_INTERVAL,
+                 debounce: float = DEFAULT_DEBOUNCE, use_cache: bool = True, cache_dir: str | Path | None = None,
+                 cache_max_size: float = DEFAULT_MAX_SIZE_MB, **options):
+        """Markdownファイルの変更を監視し、変更のあったファイルのみ再変換するクラス
+
+        Args:
+            targets (Iterable):       監視するファイルまたはディレクトリ（ディレクトリの場合は配下の *.md を再帰的に監視）
+            interval (float):         ファイルの状態を確認する間隔（秒）
+            debounce (float):         最後の変更から再変換までの待ち時間（秒）
+            use_cache (bool):         変換結果のキャッシュを使うかどうか
+            cache_dir (Path):         キャッシュの保存先
+            cache_max_size (float):   解析結果のキャッシュの合計サイズの上限（MB）
+            **options:                convert_md_to_excel に渡す変換オプション（template, test_type など）
+
+        Notes:
+            - OS固有のファイル監視の仕組みは使わず、os.stat による定期的な確認（ポーリング）で変更を検出する
+            - パッケージのルート・設定情報・変換処理のモジュールは起動時に一度だけ読み込み、プロセスを保ったまま使い回す
+            - 設定ファイルが変更された場合は読み込み直し、全てのファイルを再変換する
+            - 保存のたびに行が追記されないよう、既存のExcelファイルは差分更新（upsert）で更新する
+        """
+        from md_test_case_to_excel.converter import find_package_root
+        # 変換処理（openpyxlなど）のインポートを起動時に済ませ、初回の再変換を速くする
+        import md_test_case_to_excel.excel  # noqa: F401
+
+        self.targets = [Path(target) for target in targets]
+        self.interval = interval
+        self.debounce = debounce
+        self.options = {**options, "upsert": True}
+        self.package_root = find_package_root()
+        self.config_path = self.package_root / "config.yaml"
+        self.cache = BuildCache(Path(cache_dir) if cache_dir else None, cache_max_size) if use_cache else None
+        self.config = self._load_config()
+        self.config_signature = _signature(self.config_path)
+
+        self.signatures: dict[Path, tuple[int, int]] = {}  # 監視中のファイル -> 最後に確認した状態
+        self.changed_at: dict[Path, float] = {}           # 再変換を待っているファイル -> 最後に変更を検出した時刻
+
+    def _load_config(self):
+        """設定ファイルを読み込みます（キャッシュを使わない場合は検証済みのスナップショットも使わない）。"""
+        from md_test_case_to_excel.config_loader import load_config
+
+        return load_config(self.config_path, use_snapshot=self.cache is not None,
+                           cache_dir=self.cache.cache_dir if self.cache is not None else None)
+
+    def scan(self) -> dict[Path, tuple[int, int]]:
+        """監視対象のMarkdownファイルとその状態を返します。"""
+        signatures = {}
+        for target in self.targets:
+            paths = _iter_markdown_files(target) if target.is_dir() else [target]
+            for path in paths:
+                signature = _signature(path)
+                if signature is not None:
+                    signatures[path] = signature
+        return signatures
+
+    def poll(self, now: float | None = None) -> list[Path]:
+        """ファイルの状態を確認し、再変換するファイルを返します。
+
+        Args:
+            now (float):  現在時刻（time.monotonic()）。省略時は現在の時刻
+
+        Returns:
+            list[Path]: 最後の変更から debounce 秒以上変更のないファイル
+        """
+        now = time.monotonic() if now is None else now
+        signatures = self.scan()
+
+        config_signature = _signature(self.config_path)
+        if config_signature != self.config_signature:
+            # 設定ファイルが変わった場合は全てのファイルが再変換の対象
+            self.config_signature = config_signature
+            self.config = self._load_config()
+            print(f"設定ファイル {self.config_path} が変更されたため、読み込み直しました。")
+            self.changed_at.update((path, now) for path in signatures)
+
+        for path, signature in signatures.items():
+            if self.signatures.get(path) != signature:
+                self.changed_at[path] = now
+        for path in self.changed_at.keys() - signatures.keys():
+            del self.changed_at[path]  # 再変換する前に削除されたファイル
+        self.signatures = signatures
+
+        ready = sorted(path for path, changed_at in self.changed_at.items() if now - changed_at >= self.debounce)
+        for path in ready:
+            del self.changed_at[path]
+        return ready
+
+    def regenerate(self, path: Path) -> bool:
+        """1ファイルを再変換し、所要時間を表示します。
+
+        Returns:
+            bool: 変換に成功したかどうか
+        """
+        from md_test_case_to_excel.converter import convert_md_to_excel
+
+        output_signature = _signature(path.parent / f"{path.stem}.xlsx")
+        log = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(log):
+                output_path = convert_md_to_excel(path, package_root=self.package_root, config=self.config,
+                                                  cache=self.cache, use_cache=self.cache is not None,
+                                                  **self.options)
+        except Exception:
+            print(f"エラー: {path} の変換に失敗しました。\n{log.getvalue()}{traceback.format_exc(limit=-3)}")
+            return False
+        elapsed = time.perf_counter() - start
+        status = "更新" if _signature(output_path) != output_signature else "変更なし"
+        print(f"[{time.strftime('%H:%M:%S')}] {status}: {path} -> {output_path} ({elapsed:.3f}秒)")
+        return True
+
+    def run(self, max_cycles: int | None = None):
+        """変更の監視を開始します。Ctrl+C で終了します。
+
+        Args:
+            max_cycles (int):  確認を行う回数の上限（省略時は終了されるまで監視を続ける）
+        """
+        targets = ", ".join(str(target) for target in self.targets)
+        print(f"{targets} の監視を開始しました（確認間隔: {self.interval}秒）。Ctrl+C で終了します。")
+        cycles = 0
+        try:
+            # 起動時は全てのファイルを変換の対象にする（変更のないファイルはキャッシュにより省略される）
+            self.signatures = self.scan()
+            for path in sorted(self.signatures):
+                self.regenerate(path)
+
+            while max_cycles is None or cycles < max_cycles:
+                time.sleep(self.interval)
+                for path in self.poll():
+                    self.regenerate(path)
+                cycles += 1
+        except KeyboardInterrupt:
+            pass
+        print("監視を終了しました。")
+
+
+def watch(targets: Iterable[str | Path], **options):
+    """Markdownファイルの変更を監視し、変更のたびにエクセルファイルを再生成します。
+
+    Args:
+        targets (Iterable):  監視するファイルまたはディレクトリ
+        **options:           Watcher に渡すオプション
+    """
+    Watcher(targets, **options).run()
@@ -39,10 +39,15 @@ setup(
     ],
     install_requires=[
         "pandas>=2.2.0",
-        "openpyxl>=3.1.0",
+        # スタイルの適用（layout.py）と差分更新（upsert.py）は openpyxl 3.1 の内部構造に依存するため、3.1 系に固定
+        "openpyxl>=3.1.0,<3.2",
         "pydantic>=2.9.0", 
         "pyyaml>=6.0.0"
     ],
+    extras_require={
+        # --format parquet / feather
+        "arrow": ["pyarrow>=14.0.0"],
+    },
     entry_points={
         'console_scripts': [
             'md2excel=md_test_case_to_excel.converter:main',
@@ -0,0 +1,52 @@
+"""
+複数ファイルの並列変換（convert_many）のテスト。
+"""
+
+import json
+
+from openpyxl import load_workbook
+
+from md_test_case_to_excel.batch import convert_many
+
+
+def write_specs(directory, count: int) -> list:
+    paths = []
+    for i in range(count):
+        path = directory / f"spec{i}.md"
+        path.write_text(f"## 機能{i}\n### 画面\n#### ケース{i}\n1. 手順\n* [ ] 確認\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def test_process_pool_merges_cache_updates(tmp_path):
+    cache_dir = tmp_path / "cache"
+    paths = write_specs(tmp_path, 3)
+
+    result = convert_many([str(tmp_path / "*.md")], jobs=2, cache_dir=cache_dir)
+    assert [r.status for r in result.results] == ["converted"] * 3
+    for i, r in enumerate(result.results):
+        assert r.file_path.name == f"spec{i}.md"  # 入力の順に並ぶ
+        assert load_workbook(r.output_path).active["D2"].value == f"ケース{i}"
+
+    # ワーカープロセスの記録は、親プロセスが manifest.json にまとめて反映する
+    manifest = json.loads((cache_dir / "manifest.json").read_text(encoding="utf-8"))
+    assert sorted(manifest["outputs"]) == sorted(str(r.output_path.resolve()) for r in result.results)
+
+    # 変更のないファイルは変換を省略し、変更したファイルのみ変換する
+    paths[1].write_text(paths[1].read_text(encoding="utf-8") + "#### 追加\n1. 手順\n* [ ] 確認\n", encoding="utf-8")
+    result = convert_many(paths, jobs=2, cache_dir=cache_dir)
+    assert [r.status for r in result.results] == ["skipped", "converted", "skipped"]
+    # 既存の出力ファイルはテンプレートとして使い、その後ろに追記する
+    worksheet = load_workbook(result.results[1].output_path).active
+    assert worksheet.cell(row=worksheet.max_row, column=4).value == "追加"
+
+
+def test_failure_does_not_stop_other_files(tmp_path):
+    paths = write_specs(tmp_path, 2)
+    missing = tmp_path / "missing.md"
+
+    result = convert_many([paths[0], missing, paths[1]], jobs=2, use_cache=False)
+    assert [r.status for r in result.results] == ["converted", "failed", "converted"]
+    assert "FileNotFoundError" in result.failed[0].error
+    assert result.failed[0].output_path is None
+    assert "失敗 1" in result.summary()
@@ -0,0 +1,117 @@
+"""
+変換結果のキャッシュ（BuildCache）のテスト。
+"""
+
+from pathlib import Path
+
+import pytest
+
+from md_test_case_to_excel.cache import BuildCache, default_cache_dir
+from md_test_case_to_excel.records import RecordStore
+
+
+def make_records(name: str) -> RecordStore:
+    return RecordStore([("1-1-1", "機能", "画面", name, "1. 手順", "・確認")])
+
+
+def make_output(tmp_path: Path, name: str) -> Path:
+    output_path = tmp_path / "out" / name
+    output_path.parent.mkdir(exist_ok=True)
+    output_path.write_bytes(b"xlsx")
+    return output_path
+
+
+def test_default_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("MD2EXCEL_CACHE_DIR", str(tmp_path / "md2excel-cache"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert default_cache_dir() == tmp_path / "md2excel-cache"
+
+    # 空の環境変数は設定されていないものとして扱う
+    monkeypatch.setenv("MD2EXCEL_CACHE_DIR", "")
+    assert default_cache_dir() == tmp_path / "xdg" / "md2excel"
+    monkeypatch.setenv("XDG_CACHE_HOME", "")
+    assert default_cache_dir() == tmp_path / ".cache" / "md2excel"
+
+
+def test_manifest_is_shared_between_instances(tmp_path):
+    cache_dir = tmp_path / "cache"
+    output_path = make_output(tmp_path, "spec.xlsx")
+    records_key = BuildCache.records_key("markdown", "config")
+    build_key = BuildCache.build_key(records_key, None, {"engine": "openpyxl"})
+
+    cache = BuildCache(cache_dir)
+    assert not cache.is_fresh(output_path, build_key)
+    cache.store(output_path, build_key, {records_key: make_records("ケース")})
+
+    cache = BuildCache(cache_dir)
+    assert cache.is_fresh(output_path, build_key)
+    assert cache.load_records(records_key).columns == make_records("ケース").columns
+    assert cache.load_records(BuildCache.records_key("other", "config")) is None
+
+
+def test_changed_inputs_or_output_are_not_fresh(tmp_path):
+    cache = BuildCache(tmp_path / "cache")
+    output_path = make_output(tmp_path, "spec.xlsx")
+    records_key = BuildCache.records_key("markdown", "config")
+    build_key = BuildCache.build_key(records_key, None, {"engine": "openpyxl"})
+    cache.store(output_path, build_key, {records_key: make_records("ケース")})
+
+    # 入力（テンプレート・オプション）が変わるとキーが変わる
+    assert build_key != BuildCache.build_key(records_key, "template", {"engine": "openpyxl"})
+    assert not cache.is_fresh(output_path, BuildCache.build_key(records_key, None, {"engine": "raw"}))
+
+    # 出力ファイルが書き換えられた場合、削除された場合は変換し直す
+    output_path.write_bytes(b"edited by hand")
+    assert not cache.is_fresh(output_path, build_key)
+    output_path.unlink()
+    assert not cache.is_fresh(output_path, build_key)
+
+
+def test_prune_removes_least_recently_used(tmp_path):
+    cache = BuildCache(tmp_path / "cache")
+    keys = []
+    for i, name in enumerate(["a", "b", "c"]):
+        records_key = BuildCache.records_key(name, "config")
+        output_path = make_output(tmp_path, f"{name}.xlsx")
+        cache.store(output_path, BuildCache.build_key(records_key, None, {}), {records_key: make_records(name)})
+        cache.manifest["records"][records_key]["used"] = i  # a が最も古い
+        keys.append(records_key)
+    # b を使うと、a の次に古いのは c になる
+    cache.manifest["records"][keys[1]]["used"] = 10
+
+    size = cache.manifest["records"][keys[0]]["size"]
+    assert cache.prune(max_size=size * 2) == 1
+    assert cache.prune(max_size=size) == 1
+    assert list(cache.manifest["records"]) == [keys[1]]
+    assert sorted(path.name for path in cache.records_dir.iterdir()) == [f"{keys[1]}.json"]
+    # 解析結果を削除した出力ファイルは記録から外す
+    assert [Path(path).name for path in cache.manifest["outputs"]] == ["b.xlsx"]
+
+    # 保存した記録にも反映されている
+    assert list(BuildCache(tmp_path / "cache").manifest["records"]) == [keys[1]]
+
+
+def test_pending_updates_are_merged(tmp_path):
+    cache_dir = tmp_path / "cache"
+    output_path = make_output(tmp_path, "spec.xlsx")
+    records_key = BuildCache.records_key("markdown", "config")
+    build_key = BuildCache.build_key(records_key, None, {})
+
+    # 並列変換の子プロセスは manifest.json を保存せず、親プロセスがまとめて反映する
+    worker = BuildCache(cache_dir, autosave=False)
+    worker.store(output_path, build_key, {records_key: make_records("ケース")})
+    assert not (cache_dir / "manifest.json").exists()
+    assert [update["kind"] for update in worker.pending] == ["store"]
+
+    parent = BuildCache(cache_dir)
+    parent.merge(worker.pending)
+    assert BuildCache(cache_dir).is_fresh(output_path, build_key)
+
+
+@pytest.mark.parametrize("content", ["", "{broken", '{"format": 1, "outputs": {}, "records": {}}'])
+def test_invalid_manifest_is_ignored(tmp_path, content):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / "manifest.json").write_text(content, encoding="utf-8")
+    assert BuildCache(cache_dir).manifest["outputs"] == {}
@@ -0,0 +1,87 @@
+"""
+設定ファイルの読み込み（load_config）と、検証済みのスナップショットのテスト。
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from md_test_case_to_excel import config_loader
+from md_test_case_to_excel.config_loader import Column, load_config
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+
+
+def forget_loaded(monkeypatch):
+    """同じプロセス内で読み込み済みの設定情報を破棄し、別のプロセスで読み込む場合と同じ状態にします。"""
+    monkeypatch.setattr(config_loader, "_loaded", {})
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    """設定ファイルを複製し、読み込み済みの設定情報を破棄します。"""
+    forget_loaded(monkeypatch)
+    path = tmp_path / "config.yaml"
+    shutil.copy(CONFIG_PATH, path)
+    return path
+
+
+def no_parse(monkeypatch):
+    """YAMLの解析と検証を行った場合に失敗させます。"""
+    def fail(file_path):
+        raise AssertionError("YAMLを解析しました")
+    monkeypatch.setattr(config_loader, "_parse_yaml", fail)
+
+
+def test_snapshot_matches_validated_config(config_path, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    validated = load_config(config_path, cache_dir=cache_dir)
+    assert len(list((cache_dir / "config").glob("*.json"))) == 1
+
+    forget_loaded(monkeypatch)
+    no_parse(monkeypatch)
+    constructed = load_config(config_path, cache_dir=cache_dir)
+    assert constructed is not validated
+    assert constructed.model_dump() == validated.model_dump()
+    # 入れ子のモデルも組み立て、設定ファイルに書かれていた項目（model_fields_set）も揃える
+    assert isinstance(constructed.columns.section, Column)
+    assert constructed.columns.section.model_fields_set == validated.columns.section.model_fields_set
+    assert constructed.columns.number.md_pattern is None
+    assert constructed.excel_settings.sheet_name.ut == validated.excel_settings.sheet_name.ut
+
+
+def test_changed_config_is_validated_again(config_path, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    load_config(config_path, cache_dir=cache_dir)
+
+    config_path.write_text(config_path.read_text(encoding="utf-8").replace("Meiryo UI", "MS Gothic"),
+                           encoding="utf-8")
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    forget_loaded(monkeypatch)
+    assert load_config(config_path, cache_dir=cache_dir).excel_settings.font_name == "MS Gothic"
+
+    # 不正な設定ファイルはスナップショットがあっても読み込まない
+    config_path.write_text("columns: {}\n", encoding="utf-8")
+    forget_loaded(monkeypatch)
+    with pytest.raises(ValueError):
+        load_config(config_path, cache_dir=cache_dir)
+
+
+@pytest.mark.parametrize("content", ["", "{broken", '{"format": 0}'])
+def test_invalid_snapshot_is_ignored(config_path, tmp_path, monkeypatch, content):
+    cache_dir = tmp_path / "cache"
+    load_config(config_path, cache_dir=cache_dir)
+    snapshot_path, = (cache_dir / "config").glob("*.json")
+    snapshot_path.write_text(content, encoding="utf-8")
+
+    forget_loaded(monkeypatch)
+    assert load_config(config_path, cache_dir=cache_dir).excel_settings.font_name == "Meiryo UI"
+
+
+def test_without_snapshot_nothing_is_written(config_path, tmp_path):
+    cache_dir = tmp_path / "cache"
+    load_config(config_path, use_snapshot=False, cache_dir=cache_dir)
+    assert not cache_dir.exists()
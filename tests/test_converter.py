@@ -0,0 +1,65 @@
+"""
+メモリ上の変換（convert_markdown・export_markdown）のテスト。
+"""
+
+import io
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+from md_test_case_to_excel import config_loader
+from md_test_case_to_excel.converter import convert_markdown, export_markdown
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+
+MARKDOWN = """## 機能
+
+### 画面
+
+#### ケース1
+1. 手順1
+* [ ] 確認1
+
+#### ケース2
+1. 手順2
+* [ ] 確認2
+"""
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """ホームディレクトリを一時ディレクトリに差し替え、読み込み済みの設定情報も破棄します。"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    monkeypatch.delenv("MD2EXCEL_CACHE_DIR", raising=False)
+    monkeypatch.setattr(config_loader, "_loaded", {})
+    return tmp_path
+
+
+def test_convert_markdown_writes_no_files(home):
+    content = convert_markdown(MARKDOWN)
+    worksheet = load_workbook(io.BytesIO(content)).active
+    assert [cell.value for cell in worksheet["D"][1:]] == ["ケース1", "ケース2"]
+    # 設定情報のスナップショットを含め、ファイルを作成しない
+    assert list(home.rglob("*")) == []
+
+
+def test_export_markdown_writes_no_files(home):
+    content = export_markdown(MARKDOWN, "csv").decode("utf-8-sig")
+    assert "ケース1" in content and "ケース2" in content
+    assert list(home.rglob("*")) == []
+
+
+def test_config_is_shared_within_process(home, tmp_path):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(CONFIG_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+    config = config_loader.load_config(config_path, use_snapshot=False)
+    assert config_loader.load_config(config_path, use_snapshot=False) is config
+
+    # 設定ファイルを変更すると読み込み直す
+    config_path.write_text(config_path.read_text(encoding="utf-8").replace("Meiryo UI", "MS Gothic"),
+                           encoding="utf-8")
+    reloaded = config_loader.load_config(config_path, use_snapshot=False)
+    assert reloaded.excel_settings.font_name == "MS Gothic"
+    assert sorted(path.name for path in home.rglob("*")) == ["config.yaml"]
@@ -0,0 +1,142 @@
+"""
+ExcelWriter の出力エンジンのテスト。
+"""
+
+import io
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from md_test_case_to_excel.config_loader import load_config
+from md_test_case_to_excel.excel import ENGINES, ExcelWriter
+from md_test_case_to_excel.records import RecordStore
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+
+
+@pytest.fixture(scope="module")
+def config():
+    return load_config(CONFIG_PATH, use_snapshot=False)
+
+
+def make_records(rows) -> RecordStore:
+    records = RecordStore()
+    records.extend(rows)
+    return records
+
+
+# エクセルファイルに書き込めない制御文字を含むテストケース（最後の行のみ）
+INVALID_ROWS = [
+    ("1-1-1", "画面", "入力", "ケース1", "1. 手順1", "・確認1"),
+    ("1-1-2", "画面", "入力", "ケース2", "1. 手順2", "・確認\x012"),
+]
+
+
+def test_raw_engine_failure_leaves_no_file(config, tmp_path):
+    output_path = tmp_path / "spec.xlsx"
+    with pytest.raises(ValueError):
+        ExcelWriter(make_records(INVALID_ROWS), config)(output_path, engine="raw")
+    # 書きかけのファイルも一時ファイルも残さない
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_raw_engine_failure_keeps_existing_output(config, tmp_path):
+    output_path = tmp_path / "spec.xlsx"
+    ExcelWriter(make_records(INVALID_ROWS[:1]), config)(output_path, engine="raw")
+    content = output_path.read_bytes()
+
+    with pytest.raises(ValueError):
+        ExcelWriter(make_records(INVALID_ROWS), config)(output_path, engine="raw")
+    assert output_path.read_bytes() == content
+    assert list(tmp_path.iterdir()) == [output_path]
+
+
+def test_raw_engine_failure_writes_nothing_to_stream(config):
+    output = io.BytesIO()
+    with pytest.raises(ValueError):
+        ExcelWriter.write_sheets(output, {"test": ExcelWriter(make_records(INVALID_ROWS), config)}, engine="raw")
+    assert output.getvalue() == b""
+
+
+def sheet_values(worksheet) -> list[list]:
+    return [list(row) for row in worksheet.iter_rows(min_row=2, max_col=6, values_only=True)]
+
+
+def type_records(test_type: str) -> RecordStore:
+    return make_records([(f"1-1-{i}", f"{test_type}機能", "画面", f"ケース{i}", "1. 手順", "・確認") for i in (1, 2)])
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_write_sheets_writes_each_test_type(config, tmp_path, engine):
+    output_path = tmp_path / "spec.xlsx"
+    writers = {test_type: ExcelWriter(type_records(test_type), config) for test_type in ("test", "ut", "it")}
+    ExcelWriter.write_sheets(output_path, writers, engine=engine)
+
+    workbook = load_workbook(output_path)
+    sheet_names = config.excel_settings.sheet_name
+    assert workbook.sheetnames == [sheet_names.test, sheet_names.ut, sheet_names.it]
+    for test_type, sheet_name in zip(writers, workbook.sheetnames):
+        assert sheet_values(workbook[sheet_name])[0][1] == f"{test_type}機能"
+        assert "B2:B3" in {str(cell_range) for cell_range in workbook[sheet_name].merged_cells.ranges}
+
+
+def test_write_sheets_into_template(config, tmp_path):
+    sheet_names = config.excel_settings.sheet_name
+    template = Workbook()
+    template.active.title = sheet_names.summary
+    template.active["A1"] = "集計"
+    existing = template.create_sheet(sheet_names.ut)
+    existing.append(["NO", "大分類", "中分類", "小分類", "試験内容", "確認事項"])
+    existing.append(["0-0-0", "既存", "画面", "既存のケース", "1. 手順", "・確認"])
+    template_path = tmp_path / "template.xlsx"
+    template.save(template_path)
+    template_content = template_path.read_bytes()
+
+    output_path = tmp_path / "spec.xlsx"
+    writers = {test_type: ExcelWriter(type_records(test_type), config) for test_type in ("ut", "it")}
+    ExcelWriter.write_sheets(output_path, writers, template_path=template_path)
+
+    workbook = load_workbook(output_path)
+    assert workbook.sheetnames == [sheet_names.summary, sheet_names.ut, sheet_names.it]
+    assert workbook[sheet_names.summary]["A1"].value == "集計"
+    # 既存のシートは既存の行の後ろに追記し、ないシートは作成する
+    assert [row[1] for row in sheet_values(workbook[sheet_names.ut])] == ["既存", "ut機能", None]
+    assert "it機能" in [cell.value for cell in workbook[sheet_names.it]["B"]]
+    # テンプレートファイルは変更しない
+    assert template_path.read_bytes() == template_content
+
+
+def layout_state(worksheet) -> dict:
+    """比較用に、セルの値・マージ範囲・列幅・行高を取り出します。"""
+    return {
+        "values": [list(row) for row in worksheet.iter_rows(values_only=True)],
+        "merged": sorted(str(cell_range) for cell_range in worksheet.merged_cells.ranges),
+        "widths": {letter: dimension.width for letter, dimension in worksheet.column_dimensions.items()
+                   if dimension.width},
+        "heights": {row: dimension.height for row, dimension in worksheet.row_dimensions.items() if dimension.height},
+    }
+
+
+def test_new_file_is_identical_for_every_engine(config, tmp_path):
+    # 変更前は新規ファイルの作成時に引数なしの load_workbook() を呼び出しており、TypeError で失敗していた
+    records = make_records([
+        ("1-1-1", "機能", "画面", "ケース1", "1. 手順1\n2. 手順2", "・確認1"),
+        ("1-1-2", "機能", "画面", "ケース2", "1. 手順", "・確認2\n・確認3\n・確認4"),
+        ("1-2-1", "機能", "一覧", "ケース3", "1. 手順", "・確認"),
+        ("2-1-1", "設定", "画面", "ケース4", "1. 手順", "・確認"),
+    ])
+    states = {}
+    for engine in ENGINES:
+        output_path = tmp_path / f"{engine}.xlsx"
+        ExcelWriter(records, config)(output_path, engine=engine)
+        workbook = load_workbook(output_path)
+        assert workbook.sheetnames == [config.excel_settings.sheet_name.test]
+        states[engine] = layout_state(workbook.active)
+
+    expected = states["openpyxl"]
+    assert expected["values"][1][:4] == ["1-1-1", "機能", "画面", "ケース1"]
+    assert expected["merged"] == ["B2:B4", "C2:C3"]
+    assert expected["heights"][3] > expected["heights"][5]
+    for engine in ENGINES:
+        assert states[engine] == expected, engine
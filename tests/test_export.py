@@ -0,0 +1,81 @@
+"""
+表形式の出力（csv, tsv, jsonl, parquet, feather）のテスト。
+"""
+
+import csv
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from md_test_case_to_excel.config_loader import load_column_names, load_config
+from md_test_case_to_excel.export import TableWriter, get_writer, output_suffix, table_formats
+from md_test_case_to_excel.markdown import MarkdownTestParser
+from md_test_case_to_excel.records import RecordStore
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+
+# 区切り文字・引用符・改行・タブを含むテストケース
+ROWS = [
+    ("1-1-1", "機能", "画面", "ケース, \"引用\"", "1. 手順1\n2. 手順2", "・確認1\t(タブ)"),
+    ("1-1-2", "機能", "画面", "ケース2", "1. 手順", "・確認"),
+]
+
+
+@pytest.fixture(scope="module")
+def column_names():
+    return load_column_names(load_config(CONFIG_PATH, use_snapshot=False))
+
+
+def write(name: str, column_names, rows) -> bytes:
+    output = io.BytesIO()
+    assert get_writer(name, column_names).write(rows, output) == len(ROWS)
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("name, delimiter", [("csv", ","), ("tsv", "\t")])
+def test_delimited_round_trip(column_names, name, delimiter):
+    content = write(name, column_names, RecordStore(ROWS)).decode("utf-8")
+    rows = list(csv.reader(io.StringIO(content, newline=""), delimiter=delimiter))
+    assert rows == [column_names, *map(list, ROWS)]
+
+
+def test_jsonl_round_trip(column_names):
+    lines = write("jsonl", column_names, iter(ROWS)).decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [dict(zip(column_names, row)) for row in ROWS]
+
+
+@pytest.mark.parametrize("name", ["parquet", "feather"])
+def test_arrow_round_trip(column_names, tmp_path, name):
+    pytest.importorskip("pyarrow")
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    output_path = tmp_path / f"spec{output_suffix(name)}"
+    # 行のイテラブルを渡しても、列ごとにまとめて書き出す
+    assert get_writer(name, column_names).write(iter(ROWS), output_path) == len(ROWS)
+    table = pq.read_table(output_path) if name == "parquet" else feather.read_table(output_path)
+    assert table.column_names == column_names
+    assert [tuple(row.values()) for row in table.to_pylist()] == ROWS
+
+
+def test_streaming_from_parser(column_names):
+    config = load_config(CONFIG_PATH, use_snapshot=False)
+    markdown = "## 機能\n### 画面\n#### ケース1\n1. 手順1\n* [ ] 確認1\n#### ケース2\n1. 手順2\n* [ ] 確認2\n"
+    output = io.BytesIO()
+    records = MarkdownTestParser(None, config).iter_records(io.StringIO(markdown))
+    written = get_writer("csv", column_names).write(records, output)
+    assert written == 2
+    rows = list(csv.reader(io.StringIO(output.getvalue().decode("utf-8"), newline="")))
+    assert [row[3] for row in rows[1:]] == ["ケース1", "ケース2"]
+
+
+def test_formats_and_base_class(column_names):
+    assert {"csv", "tsv", "jsonl", "parquet", "feather"} <= set(table_formats())
+    assert output_suffix("xlsx") == ".xlsx"
+    with pytest.raises(ValueError):
+        get_writer("xls", column_names)
+    # 基底クラスは書き出し処理を実装していないため、インスタンスを作成できない
+    with pytest.raises(TypeError):
+        TableWriter(column_names)
@@ -0,0 +1,108 @@
+"""
+処理ごとの所要時間とカウンターの計測（instrument）のテスト。
+"""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from md_test_case_to_excel import instrument
+from md_test_case_to_excel.config_loader import load_config
+from md_test_case_to_excel.converter import convert_markdown
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """time.perf_counter を、advance で進める時計に差し替えます。"""
+    now = [0.0]
+
+    def advance(seconds: float):
+        now[0] += seconds
+
+    monkeypatch.setattr(instrument.time, "perf_counter", lambda: now[0])
+    return advance
+
+
+def test_nested_phases_are_exclusive(clock):
+    with instrument.recording() as report:
+        with instrument.phase("write"):
+            clock(1.0)
+            with instrument.phase("measure"):
+                clock(0.25)
+            clock(0.5)
+        with instrument.phase("write"):
+            clock(2.0)
+        with instrument.phase("save"):
+            clock(0.75)
+    # 入れ子の処理の時間は外側の処理に含めないため、合計は全体の時間と一致する
+    assert report.phases == {"write": 3.5, "measure": 0.25, "save": 0.75}
+    assert sum(report.phases.values()) == 4.5
+
+
+def test_counters_hooks_and_outer_report(clock):
+    events = []
+    with instrument.recording() as outer:
+        with instrument.recording(instrument.Report([lambda *event: events.append(event)])) as inner:
+            instrument.count("rows_written", 3)
+            instrument.count("rows_written")
+            with instrument.phase("parse"):
+                clock(1.0)
+        instrument.count("files_skipped")
+    assert inner.to_dict() == {"phases": {"parse": 1.0}, "counters": {"rows_written": 4}}
+    assert events == [("counter", "rows_written", 3), ("counter", "rows_written", 1), ("phase", "parse", 1.0)]
+    # 内側で記録した内容は外側のレポートにも加算する
+    assert outer.to_dict() == {"phases": {"parse": 1.0}, "counters": {"rows_written": 4, "files_skipped": 1}}
+    assert inner.parent is None
+
+
+def test_not_recording_is_noop():
+    assert instrument.current() is None
+    with instrument.phase("parse"):
+        instrument.count("rows_written")
+    assert instrument.current() is None
+
+
+def test_reports_are_independent_per_thread():
+    reports = {}
+
+    def run(name: str, n: int):
+        with instrument.recording() as report:
+            for _ in range(n):
+                instrument.count(name)
+        reports[name] = report
+
+    threads = [threading.Thread(target=run, args=(f"thread{i}", i + 1)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert {name: report.counters for name, report in reports.items()} == {
+        f"thread{i}": {f"thread{i}": i + 1} for i in range(4)}
+
+
+def test_summarize_merges_file_reports(clock):
+    with instrument.recording() as first:
+        instrument.count("rows_written", 2)
+        with instrument.phase("write"):
+            clock(1.0)
+    second = {"phases": {"write": 0.5, "parse": 0.25}, "counters": {"rows_written": 3}}
+    files = [instrument.file_entry("a.md", "a.xlsx", "converted", 1.0, first),
+             instrument.file_entry("b.md", None, "failed", 0.75, second, error="ValueError")]
+    report = instrument.summarize(files, 1.5)
+    assert report["files"][1] == {"file": "b.md", "output": None, "status": "failed", "elapsed": 0.75,
+                                  "error": "ValueError", **second}
+    assert report["totals"] == {"files": 2, "status": {"converted": 1, "failed": 1}, "elapsed": 1.5,
+                                "phases": {"write": 1.5, "parse": 0.25}, "counters": {"rows_written": 5}}
+
+
+def test_conversion_report():
+    config = load_config(CONFIG_PATH, use_snapshot=False)
+    markdown = "## 機能\n### 画面\n#### ケース1\n1. 手順\n* [ ] 確認\n#### ケース2\n1. 手順\n* [ ] 確認\n"
+    with instrument.recording() as report:
+        content = convert_markdown(markdown, config=config, engine="raw")
+    assert {"parse", "measure", "write", "save"} <= report.phases.keys()
+    assert report.counters["rows_written"] == 2
+    assert report.counters["bytes_saved"] == len(content)
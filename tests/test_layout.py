@@ -0,0 +1,103 @@
+"""
+列のレイアウトとスタイル（LayoutPlan・CellStyle）のテスト。
+
+登録済みのスタイルは openpyxl の内部構造を使ってセルに適用しているため、
+公開属性（cell.font など）に代入した場合と同じ結果になることを確認します。
+"""
+
+from copy import copy
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from md_test_case_to_excel.config_loader import load_config
+from md_test_case_to_excel.excel import ExcelWriter
+from md_test_case_to_excel.layout import LayoutPlan
+from md_test_case_to_excel.records import RecordStore
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+
+
+@pytest.fixture(scope="module")
+def config():
+    return load_config(CONFIG_PATH, use_snapshot=False)
+
+
+@pytest.fixture(scope="module")
+def layout(config):
+    return LayoutPlan(config)
+
+
+def cell_styles(cell) -> tuple:
+    # cell.font などはプロキシ同士では比較できないため、複製して比較する
+    return (copy(cell.font), copy(cell.fill), copy(cell.alignment), copy(cell.border), cell.number_format,
+            copy(cell.protection))
+
+
+def all_styles(layout: LayoutPlan) -> list:
+    return [layout.header_style, layout.additional_style, layout.merged_style, layout.merged_last_style,
+            *(column.style for column in layout.columns)]
+
+
+def test_bound_style_matches_public_attributes(layout, tmp_path):
+    workbook = Workbook()
+    worksheet = workbook.active
+    for row_idx, style in enumerate(all_styles(layout), 1):
+        style.bind(workbook).apply(worksheet.cell(row=row_idx, column=1))
+        cell = worksheet.cell(row=row_idx, column=2)
+        for name in ("font", "fill", "alignment", "border"):
+            if getattr(style, name) is not None:
+                setattr(cell, name, getattr(style, name))
+
+    # 保存して読み直した結果も一致する
+    workbook.save(tmp_path / "styles.xlsx")
+    for worksheet in (worksheet, load_workbook(tmp_path / "styles.xlsx").active):
+        for bound, public in worksheet.iter_rows(max_col=2):
+            assert cell_styles(bound) == cell_styles(public)
+
+
+def test_apply_keeps_unspecified_styles(layout):
+    # テンプレートのセルの表示形式・保護・塗りつぶしは、指定のない限りそのまま残す
+    workbook = Workbook()
+    cell = workbook.active.cell(row=1, column=1)
+    cell.number_format = "yyyy/mm/dd"
+    cell.protection = cell.protection.copy(locked=False)
+    fill = cell.fill.copy(patternType="solid", fgColor="ffff00")
+    cell.fill = fill
+
+    layout.additional_style.bind(workbook).apply(cell)
+    assert cell.number_format == "yyyy/mm/dd"
+    assert cell.protection.locked is False
+    assert cell.fill == fill
+    assert cell.font == layout.additional_style.font
+    assert cell.border == layout.additional_style.border
+
+
+def test_written_sheet_styles(config, layout, tmp_path):
+    records = RecordStore([
+        ("1-1-1", "機能", "画面", "ケース1", "1. 手順1", "・確認1"),
+        ("1-1-2", "機能", "画面", "ケース2", "1. 手順2", "・確認2"),
+    ])
+    output_path = tmp_path / "spec.xlsx"
+    ExcelWriter(records, config)(output_path)
+    worksheet = load_workbook(output_path)[config.excel_settings.sheet_name.test]
+
+    header = worksheet["A1"]
+    assert header.font.b and header.font.color.rgb == "00ffffff"
+    assert header.fill.fgColor.rgb == "004f81bd"
+    assert cell_styles(worksheet["M1"]) == cell_styles(header)
+
+    for column in layout.columns:
+        cell = worksheet.cell(row=2, column=column.index)
+        assert cell.font.name == config.excel_settings.font_name
+        assert cell.alignment.horizontal == column.style.alignment.horizontal
+        assert cell.alignment.vertical == column.style.alignment.vertical
+        assert cell.alignment.wrap_text
+        assert {cell.border.left.style, cell.border.right.style, cell.border.top.style,
+                cell.border.bottom.style} == {"thin"}
+
+    # マージされたセル（大分類・中分類）の最終行は下側の枠線を引き継ぐ
+    assert worksheet["B3"].border.left.style == "thin"
+    assert worksheet["B3"].border.bottom.style == "thin"
+    assert copy(worksheet["G2"].border) == copy(worksheet["M3"].border) == layout.additional_style.border
@@ -0,0 +1,178 @@
+"""
+MarkdownTestParser（1回の走査で解析する iter_records）の回帰テスト。
+
+期待値は変更前の解析器（テストケースごとに後続行を読み直す実装）の出力に合わせて固定しています。
+"""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from md_test_case_to_excel import instrument
+from md_test_case_to_excel.config_loader import load_config
+from md_test_case_to_excel.markdown import MarkdownTestParser
+
+ROOT = Path(__file__).resolve().parent.parent
+CONFIG_PATH = ROOT / "md_test_case_to_excel" / "config.yaml"
+SAMPLE_PATH = ROOT / "example" / "sample.md"
+
+SAMPLE_ROWS = [
+    ("1-1-1", "ユーザ情報変更機能", "プロフィール画像変更", "プロフィール画像変更",
+     "1. アプリを立ち上げるしんよー\n2. メイン画面でプロフィール画像変更ボタンをクリック\n3. 画像を選択\n4. 画像変更ボタンをクリック",
+     "・アプリでエラーが表示されないこと\n画像が変更されていることを見るしんよー"),
+    ("1-2-1", "ユーザ情報変更機能", "ユーザ名変更", "最小長ユーザ名設定",
+     '1. アプリを立ち上げる\n2. メイン画面でユーザ名を"a" と設定する\n3. OKをタップする',
+     '・アプリでエラーが表示されないこと\n・アプリを再起動し、メイン画面でユーザ名が "a" となっていること'),
+    ("1-2-2", "ユーザ情報変更機能", "ユーザ名変更", "最大長ユーザ名設定",
+     '1. アプリを立ち上げる\n2. メイン画面でユーザ名を"12345678" と設定する\n3. OKをタップする',
+     '・アプリでエラーが表示されないこと\n・アプリを再起動し、メイン画面でユーザ名が "12345678" となっていること'),
+    ("1-2-3", "ユーザ情報変更機能", "ユーザ名変更", "最小長以下のユーザ名設定",
+     '1. アプリを立ち上げる\n2. メイン画面でユーザ名を "" と設定する\n3. OKをタップする',
+     '・エラーダイアログ表示 "名前は1文字以上8文字以下で入力してください"'),
+    ("1-2-4", "ユーザ情報変更機能", "ユーザ名変更", "最大長以上のユーザ名設定",
+     '1. アプリを立ち上げる\n2. メイン画面でユーザ名を"123456789" と設定する\n3. OKをタップする',
+     '・エラーダイアログ表示 "名前は1文字以上8文字以下で入力してください"'),
+    ("1-3-1", "ユーザ情報変更機能", "パスワード変更", "最小長パスワード設定",
+     '1. アプリを立ち上げる\n2. メイン画面でパスワードを"a" と設定する\n3. OKをタップする',
+     "・アプリでエラーが表示されないこと"),
+    ("1-3-2", "ユーザ情報変更機能", "パスワード変更", "最大長パスワード設定",
+     '1. アプリを立ち上げる\n2. メイン画面でパスワードを"12345678" と設定する\n3. OKをタップする',
+     "・アプリでエラーが表示されないこと"),
+    ("1-3-3", "ユーザ情報変更機能", "パスワード変更", "最小長以下のパスワード設定",
+     '1. アプリを立ち上げる\n2. メイン画面でパスワードを "123" と設定する\n3. OKをタップする',
+     '・エラーダイアログ表示 "パスワードは4文字以上20文字以下で入力してください"'),
+    ("1-3-4", "ユーザ情報変更機能", "パスワード変更", "最大長以上のパスワード設定",
+     '1. アプリを立ち上げる\n2. メイン画面でパスワードを"123456789abcdefghijkl" と設定する\n3. OKをタップする',
+     '・エラーダイアログ表示 "パスワードは4文字以上20文字以下で入力してください"'),
+    ("2-1-1", "ログイン機能", "ログイン", "ログイン",
+     "1. アプリを立ち上げる\n2. メイン画面でログインボタンをクリック\n3. ユーザ名とパスワードを入力\n"
+     "4. ログインボタンをクリック\n5. ログイン成功画面が表示される",
+     "・ログイン成功画面が表示されること\n・ログイン成功画面にユーザ名が表示されること"),
+    ("2-1-2", "ログイン機能", "ログイン", "存在しないユーザ名",
+     "1. アプリを立ち上げる\n2. メイン画面でログインボタンをクリック\n3. 存在しないユーザ名と存在しないパスワードとを入力\n"
+     "4. ログインボタンをクリック\n5. ログイン失敗画面が表示される",
+     "・ログイン失敗画面が表示されること\n・ログイン失敗画面にエラーメッセージが表示されること"),
+]
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return MarkdownTestParser(None, load_config(CONFIG_PATH, use_snapshot=False))
+
+
+def rows(parser, markdown) -> list[tuple]:
+    return [tuple(record) for record in parser.parse_records(markdown)]
+
+
+def synthetic_spec(cases: int) -> tuple[str, list[tuple]]:
+    """規則的な内容の大きなテスト仕様書と、その期待値を作成します。
+
+    試験内容は0〜3件、確認事項は0〜2件で、一部の確認事項には継続行（字下げあり）を付けます。
+    """
+    lines = ["# 合成テスト仕様書", ""]
+    expected = []
+    for n in range(cases):
+        section, subsection, testcase = n // 50, n // 10 % 5, n % 10
+        if n % 50 == 0:
+            lines += [f"## 機能{section}", ""]
+        if n % 10 == 0:
+            lines += [f"### 画面{section}-{subsection}", ""]
+        lines.append(f"#### [正常] [--] ケース{n}")
+        steps = [f"手順{n}-{k}" for k in range(n % 4)]
+        lines += [f"{k + 1}. {step}" for k, step in enumerate(steps)]
+        expectations = []
+        for k in range(n % 3):
+            lines.append(f"* [ ] 確認{n}-{k}")
+            if (n + k) % 5 == 0:
+                lines.append(f"  補足{n}-{k}")
+                expectations.append(f"確認{n}-{k}\n補足{n}-{k}")
+            else:
+                expectations.append(f"確認{n}-{k}")
+        lines.append("")
+        expected.append((f"{section + 1}-{subsection + 1}-{testcase + 1}", f"機能{section}",
+                         f"画面{section}-{subsection}", f"[正常] [--] ケース{n}",
+                         "\n".join(f"{k + 1}. {step}" for k, step in enumerate(steps)),
+                         "\n".join(f"・{expectation}" for expectation in expectations)))
+    return "\n".join(lines) + "\n", expected
+
+
+def test_sample(parser):
+    assert rows(parser, SAMPLE_PATH.read_text(encoding="utf-8")) == SAMPLE_ROWS
+
+
+def test_sample_file_object(parser):
+    # ファイルオブジェクトを1行ずつ読み込んだ場合も、文字列を渡した場合と同じ結果になる
+    with open(SAMPLE_PATH, "r", encoding="utf-8") as f:
+        assert rows(parser, f) == SAMPLE_ROWS
+
+
+def test_large_synthetic_spec(parser):
+    text, expected = synthetic_spec(10000)
+    with instrument.recording() as report:
+        actual = rows(parser, text)
+    assert actual == expected
+    # 各行は一度だけ走査する
+    assert report.counters["lines_scanned"] == len(text.split("\n"))
+    assert rows(parser, io.StringIO(text)) == expected
+
+
+def test_heading_after_expectation_is_continuation(parser):
+    # 空行を挟まずに見出しが続く場合、見出し行は直前の確認事項の継続行として取り込まれる
+    markdown = (
+        "## 画面\n"
+        "### 入力\n"
+        "#### ケース1\n"
+        "1. 手順1\n"
+        "* [ ] 確認1\n"
+        "#### ケース2\n"
+        "1. 手順2\n"
+        "* [ ] 確認2\n"
+        "\n"
+    )
+    assert rows(parser, markdown) == [
+        ("1-1-1", "画面", "入力", "ケース1", "1. 手順1\n2. 手順2", "・確認2"),
+        ("1-1-2", "画面", "入力", "ケース2", "1. 手順2", "・確認2"),
+    ]
+
+
+def test_test_case_without_steps_or_expectations(parser):
+    markdown = (
+        "## 画面\n"
+        "### 入力\n"
+        "#### 手順なし\n"
+        "* [ ] 確認のみ\n"
+        "\n"
+        "#### 確認なし\n"
+        "1. 手順のみ\n"
+        "\n"
+        "#### 空のケース\n"
+        "\n"
+    )
+    assert rows(parser, markdown) == [
+        ("1-1-1", "画面", "入力", "手順なし", "", "・確認のみ"),
+        ("1-1-2", "画面", "入力", "確認なし", "1. 手順のみ", ""),
+        ("1-1-3", "画面", "入力", "空のケース", "", ""),
+    ]
+
+
+def test_nested_open_test_cases(parser):
+    # 確認事項の継続中に見出しが続くと、複数のテストケースが同時に開いた状態になる
+    markdown = (
+        "## 画面\n"
+        "### 入力\n"
+        "#### A\n"
+        "* [ ] 確認A\n"
+        "#### B\n"
+        "* [ ] 確認B\n"
+        "#### C\n"
+        "1. 手順C\n"
+        "* [ ] 確認C\n"
+        "\n"
+        "## 次の画面\n"
+    )
+    assert rows(parser, markdown) == [
+        ("1-1-1", "画面", "入力", "A", "1. 手順C", "・確認A\n#### B\n・確認C"),
+        ("1-1-2", "画面", "入力", "B", "1. 手順C", "・確認C"),
+        ("1-1-3", "画面", "入力", "C", "1. 手順C", "・確認C"),
+    ]
@@ -0,0 +1,101 @@
+"""
+マージ範囲の計算（plan_merges）と設定（apply_merges）のテスト。
+"""
+
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+
+from md_test_case_to_excel.config_loader import load_config
+from md_test_case_to_excel.layout import LayoutPlan
+from md_test_case_to_excel.merges import apply_merges, plan_merges
+from md_test_case_to_excel.records import RecordStore
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+
+
+@pytest.fixture(scope="module")
+def layout():
+    return LayoutPlan(load_config(CONFIG_PATH, use_snapshot=False))
+
+
+def make_records(rows) -> RecordStore:
+    """(大分類, 中分類, 小分類) の並びからテストケースを作成します。"""
+    return RecordStore((f"{i + 1}", section, subsection, testcase, "", "")
+                       for i, (section, subsection, testcase) in enumerate(rows))
+
+
+def planned(records: RecordStore, layout: LayoutPlan) -> list[tuple[str, int, int]]:
+    return [(merge_range.column.letter, merge_range.start, merge_range.end)
+            for merge_range in plan_merges(records.columns, layout.multi_idx_columns)]
+
+
+def test_subsection_does_not_cross_section_boundary(layout):
+    # 中分類・小分類の名称が同じでも、大分類が変わる位置で範囲を区切る
+    records = make_records([
+        ("機能A", "画面", "ケース"),
+        ("機能A", "画面", "ケース"),
+        ("機能B", "画面", "ケース"),
+        ("機能B", "画面", "ケース"),
+        ("機能B", "画面", "ケース"),
+    ])
+    assert planned(records, layout) == [
+        ("B", 0, 1), ("B", 2, 4),
+        ("C", 0, 1), ("C", 2, 4),
+        ("D", 0, 1), ("D", 2, 4),
+    ]
+
+
+def test_nested_ranges_stay_within_parent(layout):
+    records = make_records([
+        ("機能A", "画面1", "ケース1"),
+        ("機能A", "画面1", "ケース2"),
+        ("機能A", "画面2", "ケース2"),
+        ("機能A", "画面2", "ケース2"),
+        ("機能B", "画面2", "ケース3"),
+    ])
+    ranges = planned(records, layout)
+    assert ranges == [("B", 0, 3), ("C", 0, 1), ("C", 2, 3), ("D", 2, 3)]
+
+    # 下位の列の範囲は、必ず上位の列のいずれかの範囲に収まる
+    parents = {"C": "B", "D": "C"}
+    for letter, start, end in ranges:
+        if letter in parents:
+            assert any(parent == parents[letter] and parent_start <= start and end <= parent_end
+                       for parent, parent_start, parent_end in ranges)
+
+
+def test_none_rows_are_not_merged(layout):
+    # 中分類のないテストケースが続いても、中分類の列はマージしない
+    records = make_records([
+        ("機能A", None, "ケース1"),
+        ("機能A", None, "ケース2"),
+        ("機能A", None, "ケース3"),
+        ("機能A", "画面", "ケース4"),
+    ])
+    assert planned(records, layout) == [("B", 0, 3)]
+
+
+def test_single_rows_are_not_merged(layout):
+    records = make_records([("機能A", "画面1", "ケース1"), ("機能B", "画面2", "ケース2")])
+    assert planned(records, layout) == []
+
+
+def test_trailing_two_row_run_is_merged(layout):
+    records = make_records([
+        ("機能A", "画面1", "ケース1"),
+        ("機能A", "画面1", "ケース2"),
+        ("機能A", "画面1", "ケース2"),
+    ])
+    assert planned(records, layout) == [("B", 0, 2), ("C", 0, 2), ("D", 1, 2)]
+
+
+def test_apply_merges_skips_existing_ranges(layout):
+    records = make_records([("機能A", "画面1", "ケース1")] * 3)
+    ranges = plan_merges(records.columns, layout.multi_idx_columns)
+    worksheet = Workbook().active
+    worksheet.merge_cells("B1:B10")  # テンプレートのマージ範囲（計算した範囲を含む）
+
+    apply_merges(worksheet, ranges, 2)
+    assert sorted(str(cell_range) for cell_range in worksheet.merged_cells.ranges) == ["B1:B10", "C2:C4", "D2:D4"]
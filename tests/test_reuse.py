@@ -0,0 +1,124 @@
+"""
+MarkdownTestParser / ExcelWriter の使い回しのテスト。
+
+conversion_engines が返す1つのインスタンスを、複数のスレッドから同時に使った場合と、
+同じインスタンスで何度も解析・書き込みした場合に、1件ずつ新しいインスタンスで処理した結果と一致することを確認します。
+"""
+
+import io
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+from md_test_case_to_excel.config_loader import load_config
+from md_test_case_to_excel.converter import conversion_engines
+from md_test_case_to_excel.excel import ExcelWriter
+from md_test_case_to_excel.markdown import MarkdownTestParser
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+THREADS = 8
+
+
+@pytest.fixture(scope="module")
+def config():
+    return load_config(CONFIG_PATH, use_snapshot=False)
+
+
+def make_document(index: int) -> str:
+    """文書ごとにテストケース数・分類名・継続行の有無が異なるテスト仕様書を作成します。"""
+    lines = [f"# 仕様書{index}", ""]
+    for n in range(5 + index % 7):
+        if n % 4 == 0:
+            lines += [f"## 機能{index}-{n // 4}", "", f"### 画面{index}-{n // 4}", ""]
+        lines += [f"#### [正常] [--] ケース{index}-{n}", "", "1. アプリを立ち上げる", f"2. 操作{index}-{n}"]
+        lines.append(f"* [ ] 結果{index}-{n}")
+        if (index + n) % 3 == 0:
+            lines.append(f"補足{index}-{n}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def sheet_contents(content: bytes) -> tuple:
+    """比較用に、エクセルファイルのシート名・セルの値・マージ範囲・列幅・行高を取り出します。"""
+    workbook = load_workbook(io.BytesIO(content))
+    sheets = []
+    for worksheet in workbook.worksheets:
+        sheets.append((
+            worksheet.title,
+            list(worksheet.iter_rows(values_only=True)),
+            sorted(str(merged) for merged in worksheet.merged_cells.ranges),
+            {key: dimension.width for key, dimension in worksheet.column_dimensions.items()},
+            {key: dimension.height for key, dimension in worksheet.row_dimensions.items() if dimension.height},
+        ))
+    return tuple(sheets)
+
+
+def write(writer: ExcelWriter, engine: str = "openpyxl") -> bytes:
+    output = io.BytesIO()
+    ExcelWriter.write_sheets(output, {"test": writer}, engine=engine)
+    return output.getvalue()
+
+
+@pytest.fixture(scope="module")
+def documents():
+    return [make_document(index) for index in range(40)]
+
+
+def test_shared_parser_across_threads(config, documents):
+    expected = [list(MarkdownTestParser(None, config).parse_records(text)) for text in documents]
+    parser, _ = conversion_engines(config)
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        actual = list(executor.map(lambda text: list(parser.parse_records(text)), documents))
+    assert actual == expected
+
+
+@pytest.mark.parametrize("engine", ["openpyxl", "write_only", "raw"])
+def test_shared_writer_across_threads(config, documents, engine):
+    documents = documents[:16]
+    expected = [sheet_contents(write(ExcelWriter(MarkdownTestParser(None, config).parse_records(text), config), engine))
+                for text in documents]
+    parser, excel_writer = conversion_engines(config)
+
+    def convert(text):
+        return sheet_contents(write(excel_writer.bind(parser.parse_records(text)), engine))
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        actual = list(executor.map(convert, documents))
+    assert actual == expected
+
+
+def test_repeated_parse_does_not_duplicate_rows(config, documents):
+    parser = MarkdownTestParser(documents[3], config)
+    first = list(parser.parse_records())
+    second = list(parser.parse_records())
+    assert first == second
+    assert [record[0] for record in first] == ["1-1-1", "1-1-2", "1-1-3", "1-1-4", "2-1-1", "2-1-2", "2-1-3", "2-1-4"]
+    # DataFrame を作る parse でも、呼び出しごとに NO を1から採番し、前回の行を含まない
+    assert parser.parse().values.tolist() == parser.parse().values.tolist() == [list(record) for record in first]
+    # 別の文書を解析しても、前の文書の分類や採番を引き継がない
+    assert list(parser.parse_records(documents[0])) == list(MarkdownTestParser(None, config).parse_records(documents[0]))
+
+
+def test_repeated_write_does_not_leak_state(config, documents, tmp_path):
+    parser, excel_writer = conversion_engines(config)
+    records = parser.parse_records(documents[5])
+    writer = excel_writer.bind(records)
+    first = write(writer)
+    second = write(writer)
+    assert sheet_contents(first) == sheet_contents(second)
+    # ヘッダー1行とテストケースの行のみ（前回の書き込みの行が残らない）
+    assert len(sheet_contents(second)[0][1]) == len(records) + 1
+
+    # bind は共有のインスタンスを変更しない
+    assert excel_writer.records is None
+    assert excel_writer.upsert_result is None
+
+    # 同じインスタンスで同じファイルに書き込み直しても、行は重複しない
+    output_path = tmp_path / "spec.xlsx"
+    writer(output_path)
+    writer(output_path)
+    rows = list(load_workbook(output_path).active.iter_rows(values_only=True))
+    assert len(rows) == len(records) + 1
+    assert [row[0] for row in rows[1:]] == [record[0] for record in records]
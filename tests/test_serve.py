@@ -0,0 +1,154 @@
+"""
+変換サーバー（md2excel serve）のテスト。
+"""
+
+import http.client
+import io
+import json
+import threading
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from md_test_case_to_excel.excel import ExcelWriter
+from md_test_case_to_excel.serve import ConversionService, _Server
+
+MARKDOWN = "## 機能\n### 画面\n#### ケース1\n1. 手順1\n* [ ] 確認1\n".encode("utf-8")
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """空いているポートでサーバーを起動し、(サービス, ポート) を返します。"""
+    monkeypatch.setenv("MD2EXCEL_CACHE_DIR", str(tmp_path / "cache"))
+    service = ConversionService(workers=1, queue_size=1, timeout=5)
+    server = _Server(0, service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield service, server.server_port
+    server.shutdown()
+    server.server_close()
+    service.shutdown()
+
+
+def request(port: int, method: str, path: str, body: bytes | None = None, headers: dict | None = None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def multipart(fields: dict[str, bytes]) -> tuple[bytes, str]:
+    boundary = "md2excel-test-boundary"
+    body = b""
+    for name, content in fields.items():
+        body += (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"; filename=\"{name}\"\r\n"
+                 f"Content-Type: application/octet-stream\r\n\r\n").encode("utf-8") + content + b"\r\n"
+    body += f"--{boundary}--\r\n".encode("utf-8")
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def block_worker(service: ConversionService) -> threading.Event:
+    """変換用のスレッドを、返したイベントが設定されるまで使用中にします。"""
+    release = threading.Event()
+    started = threading.Event()
+    service.pool.submit(lambda: (started.set(), release.wait(10)))
+    started.wait(5)
+    return release
+
+
+def test_healthz(server):
+    _, port = server
+    status, _, body = request(port, "GET", "/healthz")
+    assert status == 200
+    assert json.loads(body) == {"status": "ok"}
+
+
+def test_convert_and_metrics(server):
+    _, port = server
+    status, headers, body = request(port, "POST", "/convert?test_type=ut", MARKDOWN)
+    assert status == 200
+    assert headers["Content-Type"].startswith("application/vnd.openxmlformats")
+    worksheet = load_workbook(io.BytesIO(body)).active
+    assert worksheet["D2"].value == "ケース1"
+
+    request(port, "POST", "/convert?test_type=unknown", MARKDOWN)
+    status, _, body = request(port, "GET", "/metrics")
+    metrics = json.loads(body)
+    assert status == 200
+    assert metrics["status"] == {"200": 1, "400": 1}
+    assert metrics["samples"] == 1 and "p50" in metrics["latency_ms"]
+    assert metrics["pool"]["workers"] == 1
+
+
+def test_multipart_with_template(server):
+    _, port = server
+    template = Workbook()
+    template.active.title = "既存のシート"
+    template.create_sheet("テスト仕様書").append(["NO", "大分類", "中分類", "小分類", "試験内容", "確認事項"])
+    buffer = io.BytesIO()
+    template.save(buffer)
+
+    body, content_type = multipart({"markdown": MARKDOWN, "template": buffer.getvalue()})
+    status, _, content = request(port, "POST", "/convert", body, {"Content-Type": content_type})
+    assert status == 200
+    workbook = load_workbook(io.BytesIO(content))
+    assert "既存のシート" in workbook.sheetnames
+    assert workbook["テスト仕様書"]["D2"].value == "ケース1"
+
+
+@pytest.mark.parametrize("fields", [{"template": b"xlsx"}, {"markdown": MARKDOWN, "template": b"not a zip"}],
+                         ids=["no_markdown", "invalid_template"])
+def test_invalid_multipart_is_bad_request(server, fields):
+    _, port = server
+    body, content_type = multipart(fields)
+    status, _, _ = request(port, "POST", "/convert", body, {"Content-Type": content_type})
+    assert status == 400
+
+
+@pytest.mark.parametrize("body", ["#### ケース\n1. 手順\x01\n".encode("utf-8"), b"## \xff\xfe\n"],
+                         ids=["control_character", "not_utf8"])
+def test_invalid_markdown_is_bad_request(server, body):
+    _, port = server
+    status, _, _ = request(port, "POST", "/convert", body)
+    assert status == 400
+
+
+def test_unexpected_writer_error_is_server_error(server, monkeypatch):
+    _, port = server
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("書き込みに失敗")
+
+    monkeypatch.setattr(ExcelWriter, "_ExcelWriter__write_test_specification_sheet", fail)
+    status, _, body = request(port, "POST", "/convert", MARKDOWN)
+    assert status == 500
+    assert "書き込みに失敗" in json.loads(body)["error"]
+
+
+def test_queue_full_is_service_unavailable(server):
+    service, port = server
+    release = block_worker(service)
+    try:
+        # 変換中1件・変換待ち1件で上限に達する
+        service.pool.submit(lambda: None)
+        status, headers, _ = request(port, "POST", "/convert", MARKDOWN)
+        assert status == 503
+        assert headers["Retry-After"] == "1"
+    finally:
+        release.set()
+
+
+def test_timeout_is_gateway_timeout(server):
+    service, port = server
+    service.timeout = 0.2
+    release = block_worker(service)
+    try:
+        status, _, _ = request(port, "POST", "/convert", MARKDOWN)
+        assert status == 504
+    finally:
+        release.set()
+    # 開始していなかった変換は取り消され、枠が空く
+    assert service.pool.stats()["queued"] == 0
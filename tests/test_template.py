@@ -0,0 +1,95 @@
+"""
+テンプレートのキャッシュ（TemplateCache）のテスト。
+"""
+
+import io
+import os
+
+import openpyxl
+import pytest
+from openpyxl import Workbook
+
+from md_test_case_to_excel.template import TemplateCache
+
+
+def save_template(path, value: str):
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet["A1"] = value
+    worksheet["A1"].font = worksheet["A1"].font.copy(bold=True)
+    worksheet.row_dimensions[1].height = 30
+    worksheet.merge_cells("B1:C1")
+    workbook.save(path)
+
+
+def set_mtime(path, mtime_ns: int):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_clones_are_independent(tmp_path):
+    path = tmp_path / "template.xlsx"
+    save_template(path, "テンプレート")
+    cache = TemplateCache()
+
+    first = cache.load(path)
+    first.active["A1"] = "変更"
+    second, third = cache.load(path), cache.load(path)
+    assert second is not third
+    assert second.active["A1"].value == "テンプレート"
+
+    # 複製も書式・行高・マージ範囲を保ち、行を追加できる
+    worksheet = second.active
+    assert worksheet["A1"].font.b
+    assert worksheet.row_dimensions[1].height == 30
+    assert [str(cell_range) for cell_range in worksheet.merged_cells.ranges] == ["B1:C1"]
+    worksheet.row_dimensions[5].height = 20
+    worksheet.append(["追加"])
+    second.save(io.BytesIO())
+    assert third.active.max_row == 1
+
+
+def test_reloads_only_when_content_changes(tmp_path, monkeypatch):
+    path = tmp_path / "template.xlsx"
+    save_template(path, "v1")
+    cache = TemplateCache()
+    assert cache.load(path).active["A1"].value == "v1"
+
+    # 読み込んだ回数を数える
+    loads = []
+    original = openpyxl.load_workbook
+
+    def load_workbook(*args, **kwargs):
+        loads.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(openpyxl, "load_workbook", load_workbook)
+
+    # 更新日時のみ変わった場合は内容のハッシュ値を確認し、読み込み直さない
+    set_mtime(path, path.stat().st_mtime_ns + 1_000_000_000)
+    assert cache.load(path).active["A1"].value == "v1"
+    assert loads == []
+
+    # 内容が変わった場合は読み込み直す
+    mtime = path.stat().st_mtime_ns
+    save_template(path, "v2")
+    set_mtime(path, mtime + 1_000_000_000)
+    assert cache.load(path).active["A1"].value == "v2"
+    assert len(loads) == 1
+
+
+def test_load_bytes(tmp_path):
+    path = tmp_path / "template.xlsx"
+    save_template(path, "メモリ上")
+    content = path.read_bytes()
+    cache = TemplateCache(max_entries=1)
+
+    first = cache.load_bytes(content)
+    first.active["A1"] = "変更"
+    assert cache.load_bytes(content).active["A1"].value == "メモリ上"
+
+    # 上限を超えた分は古いものから破棄する
+    cache.load(path)
+    assert list(cache._entries) == [path.resolve()]
+
+    with pytest.raises(ValueError):
+        cache.load_bytes(b"not a workbook")
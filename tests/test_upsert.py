@@ -0,0 +1,182 @@
+"""
+差分更新（upsert）のテスト。
+
+既存のエクセルファイルを差分更新した結果が、同じテスト仕様書から新しく作成したファイルと一致すること
+（値・セルの種類・枠線・マージ範囲・行高）と、試験結果の列（G列以降）が行ごと移動することを確認します。
+openpyxl のセルの内部の辞書を直接書き換えているため、openpyxl の更新で動作が変わった場合にここで検出します。
+"""
+
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+from md_test_case_to_excel.config_loader import load_config
+from md_test_case_to_excel.excel import ExcelWriter
+from md_test_case_to_excel.markdown import MarkdownTestParser
+from md_test_case_to_excel.upsert import case_key
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+
+
+@pytest.fixture(scope="module")
+def config():
+    return load_config(CONFIG_PATH, use_snapshot=False)
+
+
+def make_cases() -> list[tuple[str, str, str, list[str]]]:
+    """(大分類, 中分類, テストケース名, 本文の行) の一覧を作成します。"""
+    cases = []
+    for section in range(3):
+        for subsection in range(3):
+            for n in range(3):
+                name = f"ケース{section}-{subsection}-{n}"
+                body = [f"1. 手順{name}", f"* [ ] 確認{name}"]
+                if n == 1:
+                    body.insert(1, "2. 続きの手順")  # 行高の異なる行
+                cases.append((f"機能{section}", f"画面{subsection}", name, body))
+    return cases
+
+
+def to_markdown(cases) -> str:
+    lines = []
+    section = subsection = None
+    for case_section, case_subsection, name, body in cases:
+        if case_section != section:
+            lines += [f"## {case_section}", ""]
+            section, subsection = case_section, None
+        if case_subsection != subsection:
+            lines += [f"### {case_subsection}", ""]
+            subsection = case_subsection
+        lines += [f"#### {name}", *body, ""]
+    return "\n".join(lines) + "\n"
+
+
+def edit_text(cases):
+    cases[4] = cases[4][:3] + (["1. 書き換えた手順", "2. 追加した手順", "3. さらに追加した手順", "* [ ] 確認"],)
+    return cases
+
+
+def insert_case(cases):
+    cases.insert(10, ("機能1", "画面0", "追加したケース", ["1. 手順", "* [ ] 確認"]))
+    return cases
+
+
+def delete_cases(cases):
+    del cases[3:6]  # 中分類1つ分を削除
+    return cases
+
+
+def swap_cases(cases):
+    cases[0], cases[1] = cases[1], cases[0]
+    cases[12], cases[20] = cases[20], cases[12]
+    return cases
+
+
+def move_to_other_subsection(cases):
+    # 別の中分類に移動すると、マージ範囲が変わる
+    case = cases.pop(7)
+    cases.insert(0, ("機能0", "画面0", case[2], case[3]))
+    return cases
+
+
+def rename_subsection(cases):
+    return [(section, "画面X" if subsection == "画面1" else subsection, name, body)
+            for section, subsection, name, body in cases]
+
+
+EDITS = [edit_text, insert_case, delete_cases, swap_cases, move_to_other_subsection, rename_subsection]
+
+
+def convert(config, cases, output_path: Path, **options):
+    records = MarkdownTestParser(None, config).parse_records(to_markdown(cases))
+    writer = ExcelWriter(records, config)
+    writer(output_path, **options)
+    return writer
+
+
+def cell_state(cell) -> tuple:
+    border = cell.border
+    return (type(cell).__name__, cell.value, border.left.style, border.right.style, border.top.style,
+            border.bottom.style, cell.font.name, cell.alignment.wrap_text)
+
+
+def sheet_state(worksheet, rows: int) -> dict:
+    """比較用に、A列からF列のセル・マージ範囲・行高を取り出します。"""
+    return {
+        "cells": [[cell_state(cell) for cell in row]
+                  for row in worksheet.iter_rows(min_row=1, max_row=rows + 1, max_col=6)],
+        "merged": sorted(str(cell_range) for cell_range in worksheet.merged_cells.ranges),
+        "heights": [worksheet.row_dimensions[row].height for row in range(2, rows + 2)],
+        "max_row": worksheet.max_row,
+    }
+
+
+def row_keys(worksheet, rows: int) -> list[str]:
+    """各行の識別キー（結合されたセルは上の行の値を補う）を返します。"""
+    keys = []
+    current = [None, None, None]
+    for row in worksheet.iter_rows(min_row=2, max_row=rows + 1, min_col=2, max_col=4, values_only=True):
+        current = [value if value is not None else previous for value, previous in zip(row, current)]
+        keys.append(case_key(*current))
+    return keys
+
+
+@pytest.mark.parametrize("edit", EDITS, ids=lambda edit: edit.__name__)
+def test_upsert_matches_fresh_build(config, tmp_path, edit):
+    cases = make_cases()
+    output_path = tmp_path / "spec.xlsx"
+    convert(config, cases, output_path)
+
+    # 試験結果の列に、行のテストケースを記入しておく
+    workbook = load_workbook(output_path)
+    worksheet = workbook.active
+    for row_idx, key in enumerate(row_keys(worksheet, len(cases)), 2):
+        worksheet.cell(row=row_idx, column=7, value=f"結果:{key}")
+    workbook.save(output_path)
+
+    edited = edit(list(cases))
+    writer = convert(config, edited, output_path, template_path=output_path, upsert=True)
+    assert writer.upsert_result is not None
+
+    fresh_path = tmp_path / "fresh.xlsx"
+    convert(config, edited, fresh_path)
+
+    actual = load_workbook(output_path).active
+    expected = load_workbook(fresh_path).active
+    assert sheet_state(actual, len(edited)) == sheet_state(expected, len(edited))
+
+    # 試験結果はテストケースとともに移動し、削除したテストケースの結果は残らない
+    keys = row_keys(actual, len(edited))
+    results = [actual.cell(row=row_idx, column=7).value for row_idx in range(2, len(edited) + 2)]
+    original_keys = {case_key(*case[:3]) for case in cases}
+    for key, result in zip(keys, results):
+        if key in original_keys:
+            assert result == f"結果:{key}"
+        else:
+            assert result is None
+
+
+def test_upsert_result_counts(config, tmp_path):
+    cases = make_cases()
+    output_path = tmp_path / "spec.xlsx"
+    convert(config, cases, output_path)
+
+    writer = convert(config, edit_text(list(cases)), output_path, template_path=output_path, upsert=True)
+    result = writer.upsert_result
+    assert (result.updated, result.inserted, result.deleted, result.moved) == (1, 0, 0, 0)
+    assert result.unchanged == len(cases) - 1
+
+    writer = convert(config, delete_cases(edit_text(list(cases))), output_path, template_path=output_path, upsert=True)
+    assert (writer.upsert_result.deleted, writer.upsert_result.inserted) == (3, 0)
+
+
+def test_upsert_without_changes_keeps_sheet(config, tmp_path):
+    cases = make_cases()
+    output_path = tmp_path / "spec.xlsx"
+    convert(config, cases, output_path)
+    before = sheet_state(load_workbook(output_path).active, len(cases))
+
+    writer = convert(config, cases, output_path, template_path=output_path, upsert=True)
+    assert writer.upsert_result.unchanged == len(cases)
+    assert sheet_state(load_workbook(output_path).active, len(cases)) == before
@@ -0,0 +1,106 @@
+"""
+変更の監視（Watcher）のテスト。
+
+ファイルの状態の確認（poll）には現在時刻を渡し、待ち時間に依存せずに確認します。
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+from md_test_case_to_excel.watch import Watcher
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "md_test_case_to_excel" / "config.yaml"
+
+SPEC = "## 機能\n### 画面\n#### ケース1\n1. 手順\n* [ ] 確認\n"
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    """設定ファイルを複製したパッケージのルートを用意します。"""
+    root = tmp_path / "root"
+    root.mkdir()
+    shutil.copy(CONFIG_PATH, root / "config.yaml")
+    monkeypatch.setenv("MD_TEST_CASE_TO_EXCEL_ROOT", str(root))
+    return root
+
+
+@pytest.fixture
+def specs(tmp_path):
+    specs = tmp_path / "specs"
+    (specs / "sub").mkdir(parents=True)
+    (specs / ".hidden").mkdir()
+    for path in (specs / "a.md", specs / "sub" / "b.md", specs / ".hidden" / "c.md"):
+        path.write_text(SPEC, encoding="utf-8")
+    return specs
+
+
+def touch(path: Path, text: str | None = None):
+    """ファイルを変更し、更新日時も確実に変えます。"""
+    if text is not None:
+        path.write_text(text, encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_scan_skips_hidden_directories(root, specs):
+    watcher = Watcher([specs], use_cache=False)
+    assert sorted(path.relative_to(specs).as_posix() for path in watcher.scan()) == ["a.md", "sub/b.md"]
+
+
+def test_poll_waits_for_debounce(root, specs):
+    watcher = Watcher([specs], debounce=2, use_cache=False)
+    watcher.signatures = watcher.scan()
+    assert watcher.poll(now=100) == []
+
+    touch(specs / "a.md")
+    assert watcher.poll(now=100) == []
+    assert watcher.poll(now=101) == []
+    # 保存が続いている間は、最後の変更から待ち直す
+    touch(specs / "a.md")
+    assert watcher.poll(now=101.5) == []
+    assert watcher.poll(now=103) == []
+    assert watcher.poll(now=103.5) == [specs / "a.md"]
+    assert watcher.poll(now=110) == []
+
+    # 再変換する前に削除されたファイルは対象から外す
+    new_path = specs / "new.md"
+    new_path.write_text(SPEC, encoding="utf-8")
+    assert watcher.poll(now=120) == []
+    new_path.unlink()
+    assert watcher.poll(now=130) == []
+
+
+def test_config_change_reloads_and_regenerates_all(root, specs):
+    watcher = Watcher([specs], debounce=2, use_cache=False)
+    watcher.signatures = watcher.scan()
+    config = watcher.config
+
+    config_path = root / "config.yaml"
+    touch(config_path, config_path.read_text(encoding="utf-8").replace("Meiryo UI", "MS Gothic"))
+    assert watcher.poll(now=100) == []
+    assert watcher.config is not config
+    assert watcher.config.excel_settings.font_name == "MS Gothic"
+    assert watcher.poll(now=102) == [specs / "a.md", specs / "sub" / "b.md"]
+
+
+def test_regenerate_updates_in_place(root, specs, capsys):
+    watcher = Watcher([specs / "a.md"], use_cache=False)
+    assert watcher.regenerate(specs / "a.md")
+    output_path = specs / "a.xlsx"
+    assert load_workbook(output_path).active.max_row == 2
+
+    # 既存のExcelファイルは差分更新するため、再変換しても行は追記されない
+    touch(specs / "a.md", SPEC.replace("1. 手順", "1. 変更した手順"))
+    assert watcher.regenerate(specs / "a.md")
+    worksheet = load_workbook(output_path).active
+    assert worksheet.max_row == 2
+    assert worksheet["E2"].value == "1. 変更した手順"
+    assert "更新" in capsys.readouterr().out
+
+    # 変換に失敗しても監視は続けられる
+    (specs / "a.md").unlink()
+    assert not watcher.regenerate(specs / "a.md")